@@ -0,0 +1,82 @@
+# Checks that the booking list endpoints issue a constant number of SQL statements
+# regardless of how many bookings they return.
+# Runs against DATABASE_URL inside a transaction that is rolled back at the end.
+# usage (from the fast-api-server directory): python -m benchmarks.booking_queries
+import asyncio
+import time
+from datetime import datetime, timedelta
+from uuid import uuid4
+from sqlalchemy import event
+from sqlmodel.ext.asyncio.session import AsyncSession
+from src.db.main import async_engine
+from src.db.models import Booking, Payment, User, Venue
+from src.bookings.service import BookingService
+from src.bookings.schemas import BookingFilterModel
+from src.pagination import PageParams
+
+ROW_COUNTS = [1, 10, 100, 500]
+
+booking_service = BookingService()
+
+
+class StatementCounter:
+    def __init__(self):
+        self.count = 0
+
+    def __call__(self, *args, **kwargs):
+        self.count += 1
+
+
+async def seed(session: AsyncSession, user: User, venue: Venue, start: int, count: int):
+    tomorrow = datetime.now() + timedelta(days=1)
+    for i in range(start, start + count):
+        booking = Booking(booking_id=uuid4(), booking_event_date=tomorrow + timedelta(days=i),
+                          booking_guest_count=1, user_id=user.user_id, venue_id=venue.venue_id)
+        session.add(booking)
+        session.add(Payment(amount_payed=0, total_amount=0, discount=0,
+                    booking_id=booking.booking_id))
+    await session.flush()
+
+
+async def main():
+    counter = StatementCounter()
+    async with async_engine.connect() as conn:
+        transaction = await conn.begin()
+        session = AsyncSession(bind=conn, expire_on_commit=False)
+        user = User(username="bench", email=f"{uuid4()}@bench",
+                    password_hash="x", is_admin=False)
+        venue = Venue(venue_name="bench", venue_address="bench",
+                      venue_capacity=1, venue_price_per_day=0)
+        session.add_all([user, venue])
+        await session.flush()
+
+        seeded = 0
+        statements: list[int] = []
+        event.listen(async_engine.sync_engine,
+                     "before_cursor_execute", counter)
+        try:
+            for rows in ROW_COUNTS:
+                await seed(session, user, venue, seeded, rows - seeded)
+                seeded = rows
+                session.expunge_all()
+                counter.count = 0
+                started = time.perf_counter()
+                page = PageParams(limit=rows, cursor=None,
+                                  sort=None, fields=None)
+                bookings, _ = await booking_service.get_my_bookings(user.user_id, page, BookingFilterModel(), session)
+                elapsed = (time.perf_counter() - started) * 1000
+                assert len(bookings) == rows
+                statements.append(counter.count)
+                print(f"{rows:>5} bookings: {counter.count} statements, {elapsed:.1f} ms")
+        finally:
+            event.remove(async_engine.sync_engine,
+                         "before_cursor_execute", counter)
+            await session.close()
+            await transaction.rollback()
+
+    assert len(set(statements)) == 1, f"statement count grows with row count: {statements}"
+    print("OK: constant number of statements")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,85 @@
+# Concurrency check of booking creation against the dataset of benchmarks/seed.py: --attempts customers
+# (seeded users, each logged in on its own connection) all POST /bookings/ the same venue on the same day
+# at once. Exactly one must get 201 and the others 409, with one booking row and one payment row for that
+# venue and day. The booking is deleted again afterwards. Exits with an AssertionError otherwise.
+# Runs the app in this process (httpx ASGI transport, its own lifespan), DB_POOL_SIZE defaults to 20 here.
+# usage (from the fast-api-server directory): python -m benchmarks.booking_race [--attempts 100]
+import argparse
+import asyncio
+import os
+import random
+from collections import Counter
+from contextlib import AsyncExitStack
+from datetime import datetime, timedelta
+import httpx
+from benchmarks.seed import BENCH_PASSWORD, user_email
+
+
+async def race(args: argparse.Namespace):
+    os.environ.setdefault("DB_POOL_SIZE", "20")
+    from sqlalchemy import func
+    from sqlmodel import select
+    from src import app
+    from src.db.main import async_session_factory
+    from src.db.models import Booking, Payment, Venue
+
+    rng = random.Random(args.seed)
+    async with async_session_factory() as session:
+        venue_id = (await session.exec(select(Venue.venue_id).order_by(Venue.venue_id).limit(1))).first()
+        if venue_id is None:
+            raise SystemExit("No venues, run python -m benchmarks.seed first")
+        # a day far past the seeded bookings, free for this venue
+        day = (datetime.now() + timedelta(days=3650 + rng.randrange(3650))).replace(
+            hour=12, minute=0, second=0, microsecond=0)
+
+        async def counts():
+            on_day = [Booking.venue_id == venue_id, func.date(Booking.booking_event_date) == day.date()]
+            bookings = (await session.exec(select(func.count()).select_from(Booking).where(*on_day))).one()
+            payments = (await session.exec(select(func.count()).select_from(Payment).join(
+                Booking, Payment.booking_id == Booking.booking_id).where(*on_day))).one()  # type: ignore
+            return bookings, payments
+        assert await counts() == (0, 0), f"{day.date()} is already booked, use another --seed"
+        await session.commit()
+
+    async with AsyncExitStack() as stack:
+        await stack.enter_async_context(app.router.lifespan_context(app))
+        transport = httpx.ASGITransport(app=app)
+        clients = [await stack.enter_async_context(httpx.AsyncClient(
+            base_url="http://bench", transport=transport, timeout=args.timeout)) for _ in range(args.attempts)]
+        for i, client in enumerate(clients):
+            response = await client.post("/users/login", json={"email": user_email(i % args.users), "password": BENCH_PASSWORD})
+            response.raise_for_status()
+        users = [(await client.get("/users/me")).json()["user_id"] for client in clients]
+
+        def book(client: httpx.AsyncClient, user_id: str):
+            return client.post("/bookings/", json={
+                "booking": {"booking_event_date": day.isoformat(), "booking_guest_count": 1,
+                            "user_id": user_id, "venue_id": str(venue_id)},
+                "payment": {"amount_payed": 0, "payment_method": "debit_card"}})
+        responses = await asyncio.gather(*(book(client, user_id) for client, user_id in zip(clients, users)))
+        statuses = Counter(response.status_code for response in responses)
+        print(f"{args.attempts} concurrent bookings of venue {venue_id} on {day.date()}: {dict(statuses)}")
+
+        async with async_session_factory() as session:
+            rows = await counts()
+        created = [response.json() for response in responses if response.status_code == 201]
+        if created:
+            # delete it whatever the outcome, the check can run again
+            (await clients[0].delete(f"/bookings/{created[0]['booking_id']}")).raise_for_status()
+        assert statuses == {201: 1, 409: args.attempts - 1}, {
+            response.text[:200] for response in responses if response.status_code not in (201, 409)}
+        assert rows == (1, 1), f"(bookings, payments) of that venue and day: {rows}"
+        print("one 201, the others 409, one booking and one payment row: ok")
+
+
+def main():
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.booking_race")
+    parser.add_argument("--attempts", type=int, default=100, help="concurrent POST /bookings/ of one venue and day")
+    parser.add_argument("--users", type=int, default=100, help="the seeded users booking, reused past that")
+    parser.add_argument("--timeout", type=float, default=120)
+    parser.add_argument("--seed", type=int, default=42)
+    asyncio.run(race(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,54 @@
+# Check of the streaming CSV reader of the catalog imports (src/catalog_io/formats.py): every body is read
+# from chunks of a few sizes (so records and UTF-8 characters are split across chunks) and has to give the
+# rows Python's csv module reads from the whole text, stray quotes in unquoted values and quoted values with
+# line breaks included. Exits with an AssertionError otherwise. Needs no database.
+# usage (from the fast-api-server directory): python -m benchmarks.catalog_csv
+import asyncio
+import csv
+import io
+from src.catalog_io.formats import read_records
+from src.catalog_io.schemas import CatalogFormat
+
+BODIES = {
+    "stray quote": 'name,note\nCake,12" three tier\nSoup,plain\nBread,fresh\n',
+    "quotes inside values": 'name,note\nCake,"12"" tier"\nSoup,say "hi" twice\n"Bread"y,x\n',
+    "line breaks in quoted values": 'name,description\n"Cake","three\ntier, ""wedding""\n\ncake"\nSoup,plain\n',
+    "quote closing at a line end": 'name,description\nCake,"two\nlines"\nSoup,"a "" and\n"""\nBread,fresh',
+    "BOM, CRLF and blank lines": '\ufeffname,note\r\nCafé,crème\r\n\r\nSoup,plain\r\n',
+}
+
+
+async def chunked(data: bytes, size: int):
+    for start in range(0, len(data), size):
+        yield data[start:start + size]
+
+
+def expected_records(body: str):
+    header, *rows = [values for values in csv.reader(io.StringIO(body.removeprefix("\ufeff"))) if values]
+    return [(row, {name: value if value != "" else None for name, value in zip(header, values)}, None)
+            for row, values in enumerate(rows, 1)]
+
+
+async def read_all(data: bytes, size: int):
+    return [record async for record in read_records(chunked(data, size), CatalogFormat.csv)]
+
+
+async def check():
+    for name, body in BODIES.items():
+        expected = expected_records(body)
+        for size in (1, 3, 64):
+            records = await read_all(body.encode(), size)
+            assert records == expected, (name, size, records, expected)
+        print(f"{name}: {len(expected)} rows ok")
+
+    records = await read_all(b'name,note\nCake,"open\nSoup,plain\n', 64)
+    assert records == [(1, None, "Invalid CSV: unterminated quoted field")], records
+    print("unterminated quoted field reported: ok")
+
+
+def main():
+    asyncio.run(check())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+# Diffs two reports of benchmarks/load.py, scenario by scenario, and exits with 1 when the second one regressed:
+# throughput down or p50/p95/p99 latency up by more than --threshold percent, or more queries per request.
+# usage (from the fast-api-server directory):
+#   python -m benchmarks.compare benchmarks/results/old.json benchmarks/results/new.json [--threshold 10]
+import argparse
+import json
+import sys
+
+# (name, the value in a scenario's result, True when higher is better)
+METRICS = [
+    ("throughput_rps", lambda result: result["throughput_rps"], True),
+    ("p50_ms", lambda result: result["latency_ms"]["p50"], False),
+    ("p95_ms", lambda result: result["latency_ms"]["p95"], False),
+    ("p99_ms", lambda result: result["latency_ms"]["p99"], False),
+    ("queries_per_request", lambda result: result["queries_per_request"], False),
+    ("db_ms_per_request", lambda result: result["db_ms_per_request"], False),
+]
+EXACT = {"queries_per_request"}  # any increase is a regression, the count doesn't depend on the machine's load
+
+
+def change(old: float | None, new: float | None):
+    if old is None or new is None:
+        return None
+    if old == 0:
+        return 0.0 if new == 0 else float("inf")
+    return (new - old) / old * 100
+
+
+def compare(old: dict, new: dict, threshold: float):
+    regressions = []
+    print(f"old: {old.get('commit')} ({old.get('created_at')})\nnew: {new.get('commit')} ({new.get('created_at')})")
+    if old.get("config") != new.get("config") or old.get("dataset") != new.get("dataset"):
+        print("warning: the reports were made with different settings or datasets")
+    for scenario in sorted(set(old["scenarios"]) | set(new["scenarios"])):
+        if scenario not in old["scenarios"] or scenario not in new["scenarios"]:
+            print(f"\n{scenario}: only in the {'new' if scenario in new['scenarios'] else 'old'} report")
+            continue
+        print(f"\n{scenario}")
+        for name, value, higher_is_better in METRICS:
+            before, after = value(old["scenarios"][scenario]), value(new["scenarios"][scenario])
+            percent = change(before, after)
+            worse = False
+            if percent is not None:
+                if name in EXACT:
+                    worse = after > before
+                elif name != "db_ms_per_request":  # informational, DB time follows the latency
+                    worse = -percent > threshold if higher_is_better else percent > threshold
+            if worse:
+                regressions.append(f"{scenario} {name}")
+            shown = "n/a" if percent is None else f"{percent:+.1f}%"
+            print(f"  {name:<22}{before!s:>12}{after!s:>12}{shown:>10}{'  REGRESSION' if worse else ''}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.compare")
+    parser.add_argument("old")
+    parser.add_argument("new")
+    parser.add_argument("--threshold", type=float, default=10, help="percent, for throughput and latency")
+    args = parser.parse_args()
+    with open(args.old) as old, open(args.new) as new:
+        regressions = compare(json.load(old), json.load(new), args.threshold)
+    if regressions:
+        print(f"\n{len(regressions)} regressions: {', '.join(regressions)}")
+        sys.exit(1)
+    print("\nno regressions")
+
+
+if __name__ == "__main__":
+    main()
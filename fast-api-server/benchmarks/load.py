@@ -0,0 +1,219 @@
+# Load test of the real routers against the dataset of benchmarks/seed.py: every virtual user logs in as one
+# of the seeded users and then keeps requesting the scenario's endpoint for --duration seconds, one scenario
+# after the other. Reports throughput, p50/p95/p99 latency and the SQL statements and DB time per request
+# (from the server's GET /metrics, read before and after each scenario) and writes them as JSON,
+# for benchmarks/compare.py to diff the results of two commits.
+# Without --url the app runs in this process (httpx ASGI transport, its own lifespan, no network),
+# with --url the requests go to a running server. CATALOG_CACHE_BACKEND=none measures the uncached lists.
+# usage (from the fast-api-server directory):
+#   python -m benchmarks.load [--url http://localhost:8000] [--concurrency 32] [--duration 20] [--output result.json]
+import argparse
+import asyncio
+import json
+import os
+import random
+import re
+import subprocess
+import time
+from contextlib import AsyncExitStack
+from datetime import datetime, timezone
+from typing import Callable, NamedTuple
+import httpx
+from benchmarks.seed import ADMIN_EMAIL, BENCH_PASSWORD, user_email
+
+RESULTS_DIR = os.path.join(os.path.dirname(__file__), "results")
+METRIC_LINE = re.compile(r'^(\w+)\{method="(\w+)",route="([^"]*)"\} (\S+)$', re.MULTILINE)
+
+
+class Scenario(NamedTuple):
+    method: str
+    route: str  # the route template, as labelled in /metrics
+    request: Callable[[httpx.AsyncClient, random.Random], object]  # -> the request's awaitable
+
+
+def login(client: httpx.AsyncClient, rng: random.Random, users: int):
+    return client.post("/users/login", json={"email": user_email(rng.randrange(users)), "password": BENCH_PASSWORD})
+
+
+def scenarios(users: int):
+    return {
+        "login": Scenario("POST", "/users/login", lambda client, rng: login(client, rng, users)),
+        "venues": Scenario("GET", "/venues/", lambda client, rng: client.get("/venues/", params={
+            "limit": 20, **({"sort": rng.choice(["venue_price_per_day", "-venue_capacity"])} if rng.random() < 0.5 else {})})),
+        "bookings_me": Scenario("GET", "/bookings/me", lambda client, rng: client.get("/bookings/me", params={"limit": 20})),
+        "caterings": Scenario("GET", "/caterings/", lambda client, rng: client.get("/caterings/", params={"limit": 20})),
+    }
+
+
+def percentile(ordered: list[float], p: float):
+    # nearest rank
+    if not ordered:
+        return None
+    return ordered[min(len(ordered) - 1, max(0, round(p / 100 * len(ordered)) - 1))]
+
+
+async def scrape(client: httpx.AsyncClient, token: str | None):
+    # {(metric, method, route): value} of the per route series
+    headers = {"Authorization": f"Bearer {token}"} if token else {}
+    response = await client.get("/metrics", headers=headers)
+    response.raise_for_status()
+    return {(name, method, route): float(value) for name, method, route, value in METRIC_LINE.findall(response.text)}
+
+
+def per_request(before: dict, after: dict, scenario: Scenario, metric: str):
+    key = (scenario.method, scenario.route)
+    count = after.get(("http_request_db_statements_count", *key), 0) - before.get(("http_request_db_statements_count", *key), 0)
+    if not count:
+        return None
+    return (after.get((metric, *key), 0) - before.get((metric, *key), 0)) / count
+
+
+async def run_scenario(name: str, scenario: Scenario, clients: list[httpx.AsyncClient], duration: float, seed: int):
+    latencies: list[float] = []
+    errors: dict[str, int] = {}
+    deadline = time.perf_counter() + duration
+
+    async def virtual_user(i: int, client: httpx.AsyncClient):
+        rng = random.Random(seed * 1000 + i)
+        while time.perf_counter() < deadline:
+            started = time.perf_counter()
+            try:
+                response = await scenario.request(client, rng)
+                outcome = None if response.status_code < 400 else str(response.status_code)
+            except httpx.HTTPError as e:
+                outcome = type(e).__name__
+            latencies.append(time.perf_counter() - started)
+            if outcome:
+                errors[outcome] = errors.get(outcome, 0) + 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(virtual_user(i, client) for i, client in enumerate(clients)))
+    elapsed = time.perf_counter() - started
+    latencies.sort()
+    ms = [latency * 1000 for latency in latencies]
+    return {
+        "requests": len(ms),
+        "errors": errors,
+        "throughput_rps": round(len(ms) / elapsed, 1),
+        "latency_ms": {
+            "p50": round(percentile(ms, 50) or 0, 2),
+            "p95": round(percentile(ms, 95) or 0, 2),
+            "p99": round(percentile(ms, 99) or 0, 2),
+            "mean": round(sum(ms) / len(ms), 2) if ms else 0,
+            "max": round(ms[-1], 2) if ms else 0,
+        },
+    }
+
+
+def git_commit():
+    try:
+        commit = subprocess.run(["git", "rev-parse", "HEAD"], capture_output=True, text=True, check=True).stdout.strip()
+        dirty = bool(subprocess.run(["git", "status", "--porcelain", "--untracked-files=no"],
+                                    capture_output=True, text=True, check=True).stdout.strip())
+        return commit, dirty
+    except (OSError, subprocess.CalledProcessError):
+        return None, None
+
+
+async def dataset_size():
+    # the planner's row estimates (exact after the seed's ANALYZE), only when the database is reachable from here
+    try:
+        from sqlalchemy import text
+        from src.db.main import async_engine
+        async with async_engine.connect() as conn:
+            rows = await conn.execute(text(
+                "SELECT relname, reltuples::bigint FROM pg_class WHERE relname = ANY(:tables) AND relkind = 'r'"),
+                {"tables": ["user", "venue", "dish", "catering", "catering_menu_item", "car", "decoration", "booking",
+                            "payment"]})
+            return dict(sorted(rows.all()))  # type: ignore
+    except Exception:
+        return None
+
+
+async def load(args: argparse.Namespace):
+    selected = scenarios(args.users)
+    names = args.scenarios.split(",") if args.scenarios else list(selected)
+    unknown = [name for name in names if name not in selected]
+    if unknown:
+        raise SystemExit(f"Unknown scenarios: {', '.join(unknown)}, known: {', '.join(selected)}")
+    token = args.metrics_token or os.environ.get("METRICS_TOKEN") or None
+
+    async with AsyncExitStack() as stack:
+        if args.url:
+            base_url, transport = args.url, None
+        else:
+            from src import app
+            await stack.enter_async_context(app.router.lifespan_context(app))
+            base_url, transport = "http://bench", httpx.ASGITransport(app=app)
+        limits = httpx.Limits(max_connections=1)
+
+        def client():
+            return httpx.AsyncClient(base_url=base_url, transport=transport, limits=limits, timeout=args.timeout)
+
+        admin = await stack.enter_async_context(client())
+        if not token:
+            response = await admin.post("/users/login", json={"email": ADMIN_EMAIL, "password": BENCH_PASSWORD})
+            response.raise_for_status()
+        clients = [await stack.enter_async_context(client()) for _ in range(args.concurrency)]
+        rng = random.Random(args.seed)
+        for response in await asyncio.gather(*(login(c, rng, args.users) for c in clients)):
+            response.raise_for_status()
+
+        results = {}
+        for name in names:
+            scenario = selected[name]
+            if args.warmup:
+                await run_scenario(name, scenario, clients, args.warmup, args.seed)
+            before = await scrape(admin, token)
+            result = await run_scenario(name, scenario, clients, args.duration, args.seed)
+            after = await scrape(admin, token)
+            queries = per_request(before, after, scenario, "http_request_db_statements_sum")
+            db_seconds = per_request(before, after, scenario, "http_request_db_seconds_total")
+            result["queries_per_request"] = round(queries, 2) if queries is not None else None
+            result["db_ms_per_request"] = round(db_seconds * 1000, 2) if db_seconds is not None else None
+            results[name] = result
+            latency = result["latency_ms"]
+            print(f"{name:<12}{result['throughput_rps']:>9} req/s  p50 {latency['p50']:>8} ms  p95 {latency['p95']:>8} ms  "
+                  f"p99 {latency['p99']:>8} ms  {result['queries_per_request']} queries/req  "
+                  f"{sum(result['errors'].values())} errors")
+
+    commit, dirty = git_commit()
+    report = {
+        "commit": commit,
+        "dirty": dirty,
+        "created_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "target": args.url or "in-process",
+        "config": {"concurrency": args.concurrency, "duration_s": args.duration, "warmup_s": args.warmup,
+                   "users": args.users, "seed": args.seed,
+                   "catalog_cache": os.environ.get("CATALOG_CACHE_BACKEND", "default")},
+        "dataset": await dataset_size(),
+        "scenarios": results,
+    }
+    output = args.output
+    if not output:
+        os.makedirs(RESULTS_DIR, exist_ok=True)
+        stamp = datetime.now().strftime("%Y%m%d-%H%M%S")
+        output = os.path.join(RESULTS_DIR, f"{stamp}-{(commit or 'unknown')[:8]}.json")
+    with open(output, "w") as file:
+        json.dump(report, file, indent=2)
+        file.write("\n")
+    print(f"written to {output}")
+
+
+def main():
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.load")
+    parser.add_argument("--url", help="a running server, the app runs in this process without it")
+    parser.add_argument("--concurrency", type=int, default=32, help="virtual users, each with its own connection")
+    parser.add_argument("--duration", type=float, default=20, help="seconds per scenario")
+    parser.add_argument("--warmup", type=float, default=2, help="seconds per scenario before measuring")
+    parser.add_argument("--scenarios", help="comma separated, default: login,venues,bookings_me,caterings")
+    parser.add_argument("--users", type=int, default=10_000, help="the seeded users to log in as")
+    parser.add_argument("--metrics-token", help="METRICS_TOKEN of the server, the seeded admin logs in without it")
+    parser.add_argument("--timeout", type=float, default=30)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", help=f"the JSON report, default: {RESULTS_DIR}/<time>-<commit>.json")
+    asyncio.run(load(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+# Checks the S3 image storage backend (src/images/storage.py) against a local moto server:
+# write/exists/stat/read/delete of S3ImageStorage, and store_upload (content addressed, deduplicated) on top of it.
+# Needs boto3 and moto[server], no AWS account. No database access (DATABASE_URL only has to parse).
+# usage (from the fast-api-server directory): python -m benchmarks.s3_storage
+import io
+import logging
+import os
+import socket
+import boto3
+from moto.server import ThreadedMotoServer
+
+BUCKET = "images-check"
+PNG = b"\x89PNG\r\n\x1a\n" + bytes(range(256)) * 64
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def main():
+    logging.getLogger("werkzeug").setLevel(logging.WARNING)  # the moto server's request log
+    port = free_port()
+    server = ThreadedMotoServer(ip_address="127.0.0.1", port=port)
+    server.start()
+    try:
+        endpoint_url = f"http://127.0.0.1:{port}"
+        # set before anything from src is imported, the app (src/__init__.py) creates the module level storages
+        os.environ.update({"IMAGE_STORAGE_BACKEND": "s3", "IMAGE_S3_BUCKET": BUCKET, "IMAGE_S3_ENDPOINT_URL": endpoint_url,
+                           "IMAGE_S3_REGION": "us-east-1", "IMAGE_S3_ACCESS_KEY_ID": "testing",
+                           "IMAGE_S3_SECRET_ACCESS_KEY": "testing"})
+        boto3.client("s3", endpoint_url=endpoint_url, region_name="us-east-1",
+                     aws_access_key_id="testing", aws_secret_access_key="testing").create_bucket(Bucket=BUCKET)
+
+        from src.images.storage import S3ImageStorage, image_storage
+        from src.utils import store_upload
+
+        storage = S3ImageStorage(BUCKET, "check/")
+        assert not storage.exists("a.png")
+        storage.write("a.png", io.BytesIO(PNG), "image/png")
+        assert storage.exists("a.png")
+        assert storage.stat("a.png").size == len(PNG)
+        assert storage.read("a.png") == PNG
+        assert storage.read("a.png", 8, 15) == PNG[8:16]
+        assert storage.read("a.png", 100) == PNG[100:]
+        assert storage.location("a.png") == f"s3://{BUCKET}/check/a.png"
+        storage.delete("a.png")
+        assert not storage.exists("a.png")
+        storage.delete("a.png")  # missing blobs are ignored
+        for missing in (lambda: storage.stat("a.png"), lambda: storage.read("a.png")):
+            try:
+                missing()
+                raise AssertionError("expected FileNotFoundError")
+            except FileNotFoundError:
+                pass
+        print("S3ImageStorage ok")
+
+        assert isinstance(image_storage, S3ImageStorage)
+        name, created = store_upload(io.BytesIO(PNG))
+        assert created and name.endswith(".png") and image_storage.read(name) == PNG
+        assert store_upload(io.BytesIO(PNG)) == (name, False)  # same content, stored once
+        image_storage.delete(name)
+        assert not image_storage.exists(name)
+        print("store_upload on S3 ok")
+    finally:
+        server.stop()
+
+
+if __name__ == "__main__":
+    main()
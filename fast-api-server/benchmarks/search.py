@@ -0,0 +1,76 @@
+# Times /search queries against an in-memory index of a synthetic catalog (no database access,
+# DATABASE_URL only has to parse): exact terms, prefixes, typos, multi-term and facet filtered queries.
+# usage (from the fast-api-server directory): python -m benchmarks.search [rows]
+import random
+import sys
+import time
+from uuid import uuid4
+from src.db.models import DishType
+from src.search.index import CatalogSearchIndex, SearchDocument
+
+RUNS = 50
+WORDS = ("grand garden royal lakeside crystal golden palace vintage rustic modern sunset harbor meadow "
+         "orchid ivory emerald velvet summit riverside heritage terrace pavilion manor courtyard "
+         "banquet ballroom lounge chateau villa loft barn estate gallery conservatory").split()
+STREETS = "avenue street road lane boulevard square".split()
+MAKES = {"mercedes": ["sprinter", "sclass", "eclass"], "rolls": ["phantom", "ghost"],
+         "bentley": ["mulsanne", "continental"], "cadillac": ["escalade"], "tesla": ["model"]}
+QUERIES = [
+    ("exact", "garden", {}),
+    ("prefix", "chat", {}),
+    ("typo", "balroom", {}),
+    ("two terms", "golden ballroom", {}),
+    ("three terms", "rustic barn lakeside", {}),
+    ("faceted", "garden", {"kind": {"venue"}, "capacity": {"100-249"}}),
+    ("car", "mercedes sprinter", {"kind": {"car"}}),
+    ("facets only", "", {"kind": {"dish"}, "dish_type": {"dessert"}}),
+]
+
+
+def make_documents(count: int):
+    rng = random.Random(42)
+    kinds = ["venue", "catering", "dish", "car", "decoration"]
+    documents = []
+    for i in range(count):
+        kind = kinds[i % len(kinds)]
+        name = " ".join(rng.sample(WORDS, 2)).title()
+        description = " ".join(rng.choices(WORDS, k=6))
+        if kind == "venue":
+            documents.append(SearchDocument(kind, uuid4(), f"{name} {rng.choice(WORDS).title()}",
+                                            f"{rng.randint(1, 999)} {rng.choice(WORDS)} {rng.choice(STREETS)}",
+                                            None, rng.randint(100, 20000), capacity=rng.randint(20, 1000)))
+        elif kind == "car":
+            make = rng.choice(list(MAKES))
+            year = rng.randint(2000, 2024)
+            documents.append(SearchDocument(kind, uuid4(), f"{make} {rng.choice(MAKES[make])}", None, None,
+                                            rng.randint(50, 2000), car_year=year, text=str(year)))
+        elif kind == "dish":
+            documents.append(SearchDocument(kind, uuid4(), name, description, None, rng.randint(1, 100),
+                                            dish_type=rng.choice(list(DishType)).value))
+        else:
+            documents.append(SearchDocument(kind, uuid4(), name, description, None,
+                                            None if kind == "catering" else rng.randint(10, 5000)))
+    return documents
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    documents = make_documents(count)
+    start = time.perf_counter()
+    snapshot = CatalogSearchIndex._build([(documents, lambda document: document)])
+    print(f"indexed {count} documents in {time.perf_counter() - start:.2f}s, "
+          f"{len(snapshot.vocabulary)} terms")
+    index = CatalogSearchIndex()
+    index._snapshot = snapshot
+    print(f"{'query':<14}{'q':<24}{'total':>8}{'ms':>8}")
+    for label, query, filters in QUERIES:
+        index.search(query, filters, 20, 0)  # warm up
+        start = time.perf_counter()
+        for _ in range(RUNS):
+            total, _, _ = index.search(query, filters, 20, 0)
+        elapsed = (time.perf_counter() - start) / RUNS * 1000
+        print(f"{label:<14}{query:<24}{total:>8}{elapsed:>8.2f}")
+
+
+if __name__ == "__main__":
+    main()
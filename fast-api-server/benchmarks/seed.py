@@ -0,0 +1,158 @@
+# Seeds DATABASE_URL with a synthetic, reproducible dataset for the load test (benchmarks/load.py):
+# users, venues (with rating summaries), dishes, caterings with menus, cars, decorations, bookings and payments.
+# Rows are generated from a fixed random seed and written with COPY, 50k rows at a time.
+# Every user's password is BENCH_PASSWORD, bench-admin@bench.local is an admin.
+# usage (from the fast-api-server directory):
+#   python -m benchmarks.seed --venues 5000 --bookings 1000000 --dishes 100000 [--reset]
+# --reset empties the catalog, user and booking tables first (everything in them is deleted)
+import argparse
+import asyncio
+import random
+import time
+from datetime import datetime, timedelta
+from uuid import UUID
+from src.db.main import async_engine, init_db
+from src.db.models import BookingStatus, DishType, PaymentMethod
+from src.users.utils import generate_passwd_hash
+
+BENCH_PASSWORD = "bench-password"
+ADMIN_EMAIL = "bench-admin@bench.local"
+CHUNK_SIZE = 50_000
+MENU_SIZE = 10  # dishes per catering
+WORDS = ("grand garden royal lakeside crystal golden palace vintage rustic modern sunset harbor meadow "
+         "orchid ivory emerald velvet summit riverside heritage terrace pavilion manor courtyard "
+         "banquet ballroom lounge chateau villa loft barn estate gallery conservatory").split()
+RESET_TABLES = ["car_reservation_day", "car_reservation", "payment", "booking", "catering_menu_item", "venue_review",
+                "venue_rating_summary", "venue", "catering", "dish", "car", "decoration", "promo", "user_contact", '"user"']
+
+
+def user_email(i: int):
+    return f"bench{i}@bench.local"
+
+
+class Dataset:
+    def __init__(self, args: argparse.Namespace):
+        self.args = args
+        self.rng = random.Random(args.seed)
+        self.tomorrow = datetime.now().replace(hour=12, minute=0, second=0, microsecond=0) + timedelta(days=1)
+
+    def uuid(self):
+        return UUID(int=self.rng.getrandbits(128), version=4)
+
+    def name(self, words: int = 2):
+        return " ".join(self.rng.sample(WORDS, words)).title()
+
+    def ids(self, count: int):
+        return [self.uuid() for _ in range(count)]
+
+
+async def copy(driver, table: str, columns: list[str], records):
+    # records is an iterator, written CHUNK_SIZE rows per COPY
+    total = 0
+    chunk = []
+    for record in records:
+        chunk.append(record)
+        if len(chunk) >= CHUNK_SIZE:
+            await driver.copy_records_to_table(table, records=chunk, columns=columns)
+            total += len(chunk)
+            chunk = []
+    if chunk:
+        await driver.copy_records_to_table(table, records=chunk, columns=columns)
+        total += len(chunk)
+    return total
+
+
+async def seed(args: argparse.Namespace):
+    data = Dataset(args)
+    await init_db()  # the tables, if the database is still empty
+    password_hash = await generate_passwd_hash(BENCH_PASSWORD)
+    users, venues = data.ids(args.users), data.ids(args.venues)
+    dishes, caterings = data.ids(args.dishes), data.ids(args.caterings)
+    if args.bookings > args.venues * args.days:
+        raise SystemExit(f"{args.bookings} bookings need more than {args.days} days per venue, raise --days")
+
+    async with async_engine.connect() as conn:
+        raw = await conn.get_raw_connection()
+        driver = raw.driver_connection  # asyncpg, each COPY commits on its own
+        if args.reset:
+            await driver.execute(f"TRUNCATE {', '.join(RESET_TABLES)} CASCADE")
+
+        started = time.perf_counter()
+        counts = {}
+        counts["user"] = await copy(driver, "user", ["user_id", "username", "email", "password_hash", "is_admin"], (
+            (user_id, f"bench{i}", user_email(i), password_hash, False) for i, user_id in enumerate(users)))
+        await copy(driver, "user", ["user_id", "username", "email", "password_hash", "is_admin"],
+                   [(data.uuid(), "bench-admin", ADMIN_EMAIL, password_hash, True)])
+        counts["venue"] = await copy(driver, "venue", [
+            "venue_id", "venue_name", "venue_address", "venue_capacity", "venue_price_per_day"], (
+            (venue_id, data.name(3), f"{data.rng.randint(1, 999)} {data.name(1)} Street",
+             data.rng.randint(20, 1000), data.rng.randint(100, 20000)) for venue_id in venues))
+        await copy(driver, "venue_rating_summary", [
+            "venue_id", "rating_count", "rating_sum", "rating_1", "rating_2", "rating_3", "rating_4", "rating_5"],
+            ((venue_id, 0, 0.0, 0, 0, 0, 0, 0) for venue_id in venues))
+        dish_types = [dish_type.value for dish_type in DishType]
+        counts["dish"] = await copy(driver, "dish", [
+            "dish_id", "dish_name", "dish_description", "dish_type", "dish_cost_per_serving"], (
+            (dish_id, data.name(), " ".join(data.rng.choices(WORDS, k=8)), data.rng.choice(dish_types),
+             data.rng.randint(1, 100)) for dish_id in dishes))
+        counts["catering"] = await copy(driver, "catering", ["catering_id", "catering_name", "catering_description"], (
+            (catering_id, data.name(), " ".join(data.rng.choices(WORDS, k=12))) for catering_id in caterings))
+        counts["catering_menu_item"] = await copy(driver, "catering_menu_item", ["catering_id", "dish_id"], (
+            (catering_id, dish_id) for catering_id in caterings
+            for dish_id in data.rng.sample(dishes, min(MENU_SIZE, len(dishes)))))
+        counts["car"] = await copy(driver, "car", [
+            "car_id", "car_make", "car_model", "car_year", "car_rental_price", "car_quantity"], (
+            (data.uuid(), data.name(1), data.name(1), data.rng.randint(2000, 2024), data.rng.randint(50, 2000),
+             data.rng.randint(1, 10)) for _ in range(args.cars)))
+        counts["decoration"] = await copy(driver, "decoration", [
+            "decoration_id", "decoration_name", "decoration_price", "decoration_description"], (
+            (data.uuid(), data.name(), data.rng.randint(10, 5000), " ".join(data.rng.choices(WORDS, k=6)))
+            for _ in range(args.decorations)))
+
+        # booking k is at venue k % venues on day k // venues, so (venue, day) stays unique
+        statuses = [status.value for status in BookingStatus]
+        methods = [method.value for method in PaymentMethod]
+        booking_ids = []
+
+        def bookings():
+            for k in range(args.bookings):
+                booking_id = data.uuid()
+                booking_ids.append(booking_id)
+                catering_id = data.rng.choice(caterings) if caterings and data.rng.random() < 0.5 else None
+                yield (booking_id, data.tomorrow, data.tomorrow + timedelta(days=k // args.venues),
+                       data.rng.randint(1, 500), data.rng.choice(statuses), data.rng.choice(users),
+                       venues[k % args.venues], catering_id)
+        counts["booking"] = await copy(driver, "booking", [
+            "booking_id", "booking_date", "booking_event_date", "booking_guest_count", "booking_status", "user_id",
+            "venue_id", "catering_id"], bookings())
+
+        def payments():
+            for booking_id in booking_ids:
+                total = data.rng.randint(1000, 50000)
+                yield (data.uuid(), data.rng.randint(0, total), 0.0, total, data.rng.choice(methods), booking_id)
+        counts["payment"] = await copy(driver, "payment", [
+            "payment_id", "amount_payed", "discount", "total_amount", "payment_method", "booking_id"], payments())
+
+        await driver.execute("ANALYZE")
+    for table, count in counts.items():
+        print(f"{table:<20}{count:>10}")
+    print(f"seeded in {time.perf_counter() - started:.1f}s, password of every user: {BENCH_PASSWORD}")
+
+
+def main():
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.seed")
+    parser.add_argument("--users", type=int, default=10_000)
+    parser.add_argument("--venues", type=int, default=5_000)
+    parser.add_argument("--dishes", type=int, default=100_000)
+    parser.add_argument("--caterings", type=int, default=2_000)
+    parser.add_argument("--cars", type=int, default=200)
+    parser.add_argument("--decorations", type=int, default=500)
+    parser.add_argument("--bookings", type=int, default=1_000_000)
+    parser.add_argument("--days", type=int, default=365, help="booking days per venue, from tomorrow on")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--reset", action="store_true", help="delete the existing rows first")
+    asyncio.run(seed(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+# Compares the two list response serialization paths (src/serialization.py) on in-memory rows:
+# "validate" runs every row through its response model, "fast" uses the compiled serializers.
+# Also checks both produce the same JSON. No database access (DATABASE_URL only has to parse).
+# usage (from the fast-api-server directory): python -m benchmarks.serialization
+import json
+import time
+from datetime import datetime, timedelta
+from uuid import uuid4
+from src.db.models import Booking, BookingStatus, CarReservation, Payment, PaymentMethod, User, Venue, VenueRatingSummary, VenueReview
+from src.bookings.schemas import BookingModel
+from src.venues.schemas import VenueModel, VenueReviewModel
+from src.serialization import compile_serializer, dump_rows, dump_rows_validated
+from src.config import Config
+
+ROW_COUNTS = [10, 100, 500]
+RUNS = 20
+
+
+def make_user():
+    return User(user_id=uuid4(), username="bench", email="bench@bench", password_hash="x", is_admin=False)
+
+
+def make_venues(count: int):
+    venues = []
+    for _ in range(count):
+        venue = Venue(venue_id=uuid4(), venue_name="bench", venue_address="bench",
+                      venue_capacity=100, venue_price_per_day=1000, venue_image=None)
+        venue.venue_rating_summary = VenueRatingSummary(venue_id=venue.venue_id, rating_count=5, rating_sum=20.0,
+                                                        rating_1=0, rating_2=0, rating_3=1, rating_4=3, rating_5=1,
+                                                        latest_review_at=datetime.now())
+        venues.append(venue)
+    return venues
+
+
+def make_reviews(count: int):
+    user = make_user()
+    venue_id = uuid4()
+    reviews = []
+    for _ in range(count):
+        review = VenueReview(venue_review_id=uuid4(), venue_id=venue_id, user_id=user.user_id,
+                             venue_review_text="bench", venue_rating=4, venue_review_created_at=datetime.now())
+        review.user = user
+        reviews.append(review)
+    return reviews
+
+
+def make_bookings(count: int):
+    user = make_user()
+    venue = Venue(venue_id=uuid4(), venue_name="bench", venue_address="bench",
+                  venue_capacity=100, venue_price_per_day=1000, venue_image=None)
+    bookings = []
+    for i in range(count):
+        booking = Booking(booking_id=uuid4(), booking_date=datetime.now(),
+                          booking_event_date=datetime.now() + timedelta(days=i + 1), booking_guest_count=10,
+                          booking_status=BookingStatus.pending, user_id=user.user_id, venue_id=venue.venue_id)
+        booking.user = user
+        booking.venue = venue
+        booking.payment = Payment(payment_id=uuid4(), amount_payed=0, total_amount=1000, payment_method=PaymentMethod.other,
+                                  discount=0, booking_id=booking.booking_id)
+        booking.catering = None
+        booking.decoration = None
+        booking.promo = None
+        booking.car_reservations = [CarReservation(car_reservation_id=uuid4(), car_id=uuid4(),
+                                                   booking_id=booking.booking_id,
+                                                   reservation_day=booking.booking_event_date.date())]
+        bookings.append(booking)
+    return bookings
+
+
+def timed(dump, rows, model):
+    dump(rows, model)  # warm up
+    start = time.perf_counter()
+    for _ in range(RUNS):
+        body = dump(rows, model)
+    return (time.perf_counter() - start) / RUNS * 1000, body
+
+
+def main():
+    Config.RESPONSE_SERIALIZATION = "fast"
+    print(f"{'model':<18}{'rows':>6}{'validate ms':>14}{'fast ms':>10}{'speedup':>10}")
+    for model, make_rows in [(VenueModel, make_venues), (VenueReviewModel, make_reviews), (BookingModel, make_bookings)]:
+        compile_serializer(model)
+        for count in ROW_COUNTS:
+            rows = make_rows(count)
+            validate_ms, expected = timed(dump_rows_validated, rows, model)
+            fast_ms, body = timed(dump_rows, rows, model)
+            assert json.loads(body) == json.loads(expected), f"{model.__name__}: paths disagree"
+            print(f"{model.__name__:<18}{count:>6}{validate_ms:>14.2f}{fast_ms:>10.2f}{validate_ms / fast_ms:>9.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,48 @@
+"""Add image_blob reference counts
+
+Revision ID: 5f3c1a9e7b42
+Revises: ddb4b5b461ce
+Create Date: 2026-10-17 12:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5f3c1a9e7b42'
+down_revision: Union[str, None] = 'ddb4b5b461ce'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('image_blob',
+    sa.Column('image_name', sa.VARCHAR(length=255), nullable=False),
+    sa.Column('ref_count', sa.INTEGER(), nullable=False),
+    sa.Column('created_at', sa.TIMESTAMP(), nullable=False),
+    sa.CheckConstraint('ref_count >= 0', name='check_image_blob_ref_count'),
+    sa.PrimaryKeyConstraint('image_name')
+    )
+
+    # count the references of the images already stored, image columns hold "<SERVER_BASE_URL>images/<name>"
+    op.execute("""
+    INSERT INTO image_blob (image_name, ref_count, created_at)
+    SELECT substring(image FROM '[^/]+$'), count(*), now()
+    FROM (
+        SELECT venue_image AS image FROM venue
+        UNION ALL SELECT car_image FROM car
+        UNION ALL SELECT dish_image FROM dish
+        UNION ALL SELECT catering_image FROM catering
+        UNION ALL SELECT decoration_image FROM decoration
+    ) images
+    WHERE image IS NOT NULL
+    GROUP BY 1;
+    """)
+
+
+def downgrade() -> None:
+    op.drop_table('image_blob')
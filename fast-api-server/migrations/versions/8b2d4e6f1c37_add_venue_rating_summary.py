@@ -0,0 +1,58 @@
+"""Add venue_rating_summary
+
+Revision ID: 8b2d4e6f1c37
+Revises: 5f3c1a9e7b42
+Create Date: 2026-10-17 14:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8b2d4e6f1c37'
+down_revision: Union[str, None] = '5f3c1a9e7b42'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('venue_rating_summary',
+    sa.Column('venue_id', sa.UUID(), nullable=False),
+    sa.Column('rating_count', sa.INTEGER(), nullable=False),
+    sa.Column('rating_sum', sa.FLOAT(), nullable=False),
+    sa.Column('rating_1', sa.INTEGER(), nullable=False),
+    sa.Column('rating_2', sa.INTEGER(), nullable=False),
+    sa.Column('rating_3', sa.INTEGER(), nullable=False),
+    sa.Column('rating_4', sa.INTEGER(), nullable=False),
+    sa.Column('rating_5', sa.INTEGER(), nullable=False),
+    sa.Column('latest_review_at', sa.TIMESTAMP(), nullable=True),
+    sa.CheckConstraint('rating_count >= 0', name='check_venue_rating_summary_count'),
+    sa.ForeignKeyConstraint(['venue_id'], ['venue.venue_id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('venue_id')
+    )
+    op.create_index('ix_venue_review_venue_created', 'venue_review', ['venue_id', 'venue_review_created_at'], unique=False)
+
+    # summaries of the existing venues, stars are the ratings rounded to 1..5
+    op.execute("""
+    INSERT INTO venue_rating_summary (venue_id, rating_count, rating_sum, rating_1, rating_2, rating_3, rating_4, rating_5, latest_review_at)
+    SELECT venue.venue_id,
+        count(review.venue_review_id),
+        coalesce(sum(review.venue_rating), 0),
+        count(review.venue_review_id) FILTER (WHERE least(5, greatest(1, round(review.venue_rating))) = 1),
+        count(review.venue_review_id) FILTER (WHERE least(5, greatest(1, round(review.venue_rating))) = 2),
+        count(review.venue_review_id) FILTER (WHERE least(5, greatest(1, round(review.venue_rating))) = 3),
+        count(review.venue_review_id) FILTER (WHERE least(5, greatest(1, round(review.venue_rating))) = 4),
+        count(review.venue_review_id) FILTER (WHERE least(5, greatest(1, round(review.venue_rating))) = 5),
+        max(review.venue_review_created_at)
+    FROM venue LEFT JOIN venue_review review ON review.venue_id = venue.venue_id
+    GROUP BY venue.venue_id;
+    """)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_venue_review_venue_created', table_name='venue_review')
+    op.drop_table('venue_rating_summary')
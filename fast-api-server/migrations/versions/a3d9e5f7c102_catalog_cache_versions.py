@@ -0,0 +1,31 @@
+"""Shared catalog cache versions
+
+Revision ID: a3d9e5f7c102
+Revises: f2a6c8d1b934
+Create Date: 2026-10-18 11:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a3d9e5f7c102'
+down_revision: Union[str, None] = 'f2a6c8d1b934'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('catalog_cache_version',
+    sa.Column('namespace', sa.VARCHAR(length=64), nullable=False),
+    sa.Column('version', sa.BIGINT(), nullable=False),
+    sa.PrimaryKeyConstraint('namespace')
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('catalog_cache_version')
@@ -0,0 +1,31 @@
+"""Index bookings by user, payments and car reservations by booking
+
+Revision ID: b8e1f4a2d756
+Revises: a3d9e5f7c102
+Create Date: 2026-10-18 12:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b8e1f4a2d756'
+down_revision: Union[str, None] = 'a3d9e5f7c102'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index('ix_booking_user', 'booking', ['user_id', 'booking_id'], unique=False)
+    op.create_index('ix_payment_booking', 'payment', ['booking_id'], unique=False)
+    op.create_index('ix_car_reservation_booking', 'car_reservation', ['booking_id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_car_reservation_booking', table_name='car_reservation')
+    op.drop_index('ix_payment_booking', table_name='payment')
+    op.drop_index('ix_booking_user', table_name='booking')
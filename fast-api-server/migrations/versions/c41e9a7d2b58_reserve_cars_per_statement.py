@@ -0,0 +1,80 @@
+"""Reserve car quantities once per insert statement
+
+Revision ID: c41e9a7d2b58
+Revises: 8b2d4e6f1c37
+Create Date: 2026-10-17 18:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c41e9a7d2b58'
+down_revision: Union[str, None] = '8b2d4e6f1c37'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # The row level trigger read and decremented car_quantity once per reservation row,
+    # this one decrements every car of an insert statement in a single conditional update
+    # and rejects the whole statement if any car doesn't have enough left
+    op.execute("DROP TRIGGER IF EXISTS car_reservation_trigger ON car_reservation;")
+    op.execute("DROP FUNCTION IF EXISTS check_and_update_car_quantity;")
+    op.execute("""
+    CREATE OR REPLACE FUNCTION reserve_car_quantity()
+    RETURNS TRIGGER AS $$
+    DECLARE
+        requested INTEGER;
+        reserved INTEGER;
+    BEGIN
+        SELECT count(DISTINCT car_id) INTO requested FROM new_reservations;
+        UPDATE car
+        SET car_quantity = car.car_quantity - wanted.quantity
+        FROM (SELECT car_id, count(*) AS quantity FROM new_reservations GROUP BY car_id) AS wanted
+        WHERE car.car_id = wanted.car_id AND car.car_quantity >= wanted.quantity;
+        GET DIAGNOSTICS reserved = ROW_COUNT;
+        IF reserved < requested THEN
+            RAISE EXCEPTION 'Cannot reserve car: insufficient quantity';
+        END IF;
+        RETURN NULL;
+    END;
+    $$ LANGUAGE plpgsql;
+    """)
+    op.execute("""
+    CREATE TRIGGER car_reservation_trigger
+    AFTER INSERT ON car_reservation
+    REFERENCING NEW TABLE AS new_reservations
+    FOR EACH STATEMENT
+    EXECUTE FUNCTION reserve_car_quantity();
+    """)
+
+
+def downgrade() -> None:
+    op.execute("DROP TRIGGER IF EXISTS car_reservation_trigger ON car_reservation;")
+    op.execute("DROP FUNCTION IF EXISTS reserve_car_quantity;")
+    op.execute("""
+    CREATE OR REPLACE FUNCTION check_and_update_car_quantity()
+    RETURNS TRIGGER AS $$
+    BEGIN
+        IF (SELECT car_quantity FROM car WHERE car_id = NEW.car_id) > 0 THEN
+            UPDATE car
+            SET car_quantity = car_quantity - 1
+            WHERE car_id = NEW.car_id;
+            RETURN NEW;
+        ELSE
+            RAISE EXCEPTION 'Cannot reserve car: insufficient quantity';
+        END IF;
+    END;
+    $$ LANGUAGE plpgsql;
+    """)
+    op.execute("""
+    CREATE TRIGGER car_reservation_trigger
+    BEFORE INSERT ON car_reservation
+    FOR EACH ROW
+    EXECUTE FUNCTION check_and_update_car_quantity();
+    """)
@@ -0,0 +1,181 @@
+"""Count car reservations per event day
+
+Revision ID: d5e8f2a14c69
+Revises: c41e9a7d2b58
+Create Date: 2026-10-17 20:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd5e8f2a14c69'
+down_revision: Union[str, None] = 'c41e9a7d2b58'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # car_quantity stops being a global counter: it is the number of cars owned again,
+    # reservations are counted per car and event day in car_reservation_day
+    op.execute("DROP TRIGGER IF EXISTS car_reservation_trigger ON car_reservation;")
+    op.execute("DROP FUNCTION IF EXISTS reserve_car_quantity;")
+
+    op.add_column('car_reservation', sa.Column('reservation_day', sa.DATE(), nullable=True))
+    op.execute("""
+    UPDATE car_reservation SET reservation_day = DATE(booking.booking_event_date)
+    FROM booking WHERE booking.booking_id = car_reservation.booking_id;
+    """)
+    op.alter_column('car_reservation', 'reservation_day', nullable=False)
+
+    op.create_table('car_reservation_day',
+    sa.Column('reservation_day', sa.DATE(), nullable=False),
+    sa.Column('car_id', sa.UUID(), nullable=False),
+    sa.Column('reserved', sa.INTEGER(), nullable=False),
+    sa.CheckConstraint('reserved >= 0', name='check_car_reservation_day_reserved'),
+    sa.ForeignKeyConstraint(['car_id'], ['car.car_id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('reservation_day', 'car_id')
+    )
+    op.create_index('ix_car_reservation_day_car', 'car_reservation_day', ['car_id', 'reservation_day'], unique=False)
+    op.execute("""
+    INSERT INTO car_reservation_day (reservation_day, car_id, reserved)
+    SELECT reservation_day, car_id, count(*) FROM car_reservation GROUP BY reservation_day, car_id;
+    """)
+    # give back what the old triggers took off car_quantity
+    op.execute("""
+    UPDATE car SET car_quantity = car.car_quantity + reserved.quantity
+    FROM (SELECT car_id, count(*) AS quantity FROM car_reservation GROUP BY car_id) AS reserved
+    WHERE car.car_id = reserved.car_id;
+    """)
+
+    # One function for the three statement level triggers: the days a statement removed reservations from
+    # are counted down, the days it added reservations to are counted up (an upsert, which row locks the
+    # (day, car) counters so concurrent reservations of the same car and day queue up) and checked against
+    # car_quantity, rejecting the whole statement if any car is short that day
+    op.execute("""
+    CREATE OR REPLACE FUNCTION count_car_reservations()
+    RETURNS TRIGGER AS $$
+    DECLARE
+        short INTEGER;
+    BEGIN
+        IF TG_OP IN ('UPDATE', 'DELETE') THEN
+            UPDATE car_reservation_day
+            SET reserved = car_reservation_day.reserved - gone.quantity
+            FROM (SELECT reservation_day, car_id, count(*) AS quantity FROM old_reservations
+                  GROUP BY reservation_day, car_id) AS gone
+            WHERE car_reservation_day.reservation_day = gone.reservation_day
+                AND car_reservation_day.car_id = gone.car_id;
+            DELETE FROM car_reservation_day
+            USING (SELECT DISTINCT reservation_day, car_id FROM old_reservations) AS gone
+            WHERE car_reservation_day.reservation_day = gone.reservation_day
+                AND car_reservation_day.car_id = gone.car_id AND car_reservation_day.reserved = 0;
+        END IF;
+        IF TG_OP IN ('INSERT', 'UPDATE') THEN
+            WITH counted AS (
+                INSERT INTO car_reservation_day (reservation_day, car_id, reserved)
+                SELECT reservation_day, car_id, count(*) FROM new_reservations GROUP BY reservation_day, car_id
+                ON CONFLICT (reservation_day, car_id)
+                DO UPDATE SET reserved = car_reservation_day.reserved + EXCLUDED.reserved
+                RETURNING car_id, reserved
+            )
+            SELECT count(*) INTO short FROM counted JOIN car ON car.car_id = counted.car_id
+            WHERE counted.reserved > car.car_quantity;
+            IF short > 0 THEN
+                RAISE EXCEPTION 'Cannot reserve car: insufficient quantity';
+            END IF;
+        END IF;
+        RETURN NULL;
+    END;
+    $$ LANGUAGE plpgsql;
+    """)
+    op.execute("""
+    CREATE TRIGGER car_reservation_insert_trigger
+    AFTER INSERT ON car_reservation
+    REFERENCING NEW TABLE AS new_reservations
+    FOR EACH STATEMENT
+    EXECUTE FUNCTION count_car_reservations();
+    """)
+    op.execute("""
+    CREATE TRIGGER car_reservation_update_trigger
+    AFTER UPDATE ON car_reservation
+    REFERENCING OLD TABLE AS old_reservations NEW TABLE AS new_reservations
+    FOR EACH STATEMENT
+    EXECUTE FUNCTION count_car_reservations();
+    """)
+    op.execute("""
+    CREATE TRIGGER car_reservation_delete_trigger
+    AFTER DELETE ON car_reservation
+    REFERENCING OLD TABLE AS old_reservations
+    FOR EACH STATEMENT
+    EXECUTE FUNCTION count_car_reservations();
+    """)
+
+    # moving a booking to another day moves its car reservations along (and is rejected if the cars are taken)
+    op.execute("""
+    CREATE OR REPLACE FUNCTION move_car_reservation_day()
+    RETURNS TRIGGER AS $$
+    BEGIN
+        UPDATE car_reservation SET reservation_day = DATE(NEW.booking_event_date)
+        WHERE booking_id = NEW.booking_id;
+        RETURN NULL;
+    END;
+    $$ LANGUAGE plpgsql;
+    """)
+    op.execute("""
+    CREATE TRIGGER booking_event_day_trigger
+    AFTER UPDATE OF booking_event_date ON booking
+    FOR EACH ROW
+    WHEN (DATE(OLD.booking_event_date) IS DISTINCT FROM DATE(NEW.booking_event_date))
+    EXECUTE FUNCTION move_car_reservation_day();
+    """)
+
+
+def downgrade() -> None:
+    op.execute("DROP TRIGGER IF EXISTS booking_event_day_trigger ON booking;")
+    op.execute("DROP FUNCTION IF EXISTS move_car_reservation_day;")
+    op.execute("DROP TRIGGER IF EXISTS car_reservation_insert_trigger ON car_reservation;")
+    op.execute("DROP TRIGGER IF EXISTS car_reservation_update_trigger ON car_reservation;")
+    op.execute("DROP TRIGGER IF EXISTS car_reservation_delete_trigger ON car_reservation;")
+    op.execute("DROP FUNCTION IF EXISTS count_car_reservations;")
+
+    # back to a single counter: every reservation is taken off car_quantity
+    op.execute("""
+    UPDATE car SET car_quantity = greatest(0, car.car_quantity - reserved.quantity)
+    FROM (SELECT car_id, count(*) AS quantity FROM car_reservation GROUP BY car_id) AS reserved
+    WHERE car.car_id = reserved.car_id;
+    """)
+    op.drop_index('ix_car_reservation_day_car', table_name='car_reservation_day')
+    op.drop_table('car_reservation_day')
+    op.drop_column('car_reservation', 'reservation_day')
+
+    op.execute("""
+    CREATE OR REPLACE FUNCTION reserve_car_quantity()
+    RETURNS TRIGGER AS $$
+    DECLARE
+        requested INTEGER;
+        reserved INTEGER;
+    BEGIN
+        SELECT count(DISTINCT car_id) INTO requested FROM new_reservations;
+        UPDATE car
+        SET car_quantity = car.car_quantity - wanted.quantity
+        FROM (SELECT car_id, count(*) AS quantity FROM new_reservations GROUP BY car_id) AS wanted
+        WHERE car.car_id = wanted.car_id AND car.car_quantity >= wanted.quantity;
+        GET DIAGNOSTICS reserved = ROW_COUNT;
+        IF reserved < requested THEN
+            RAISE EXCEPTION 'Cannot reserve car: insufficient quantity';
+        END IF;
+        RETURN NULL;
+    END;
+    $$ LANGUAGE plpgsql;
+    """)
+    op.execute("""
+    CREATE TRIGGER car_reservation_trigger
+    AFTER INSERT ON car_reservation
+    REFERENCING NEW TABLE AS new_reservations
+    FOR EACH STATEMENT
+    EXECUTE FUNCTION reserve_car_quantity();
+    """)
@@ -0,0 +1,89 @@
+"""Venue and car holds with expiry
+
+Revision ID: e7b4d2c9a310
+Revises: d5e8f2a14c69
+Create Date: 2026-10-17 22:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e7b4d2c9a310'
+down_revision: Union[str, None] = 'd5e8f2a14c69'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('venue_hold',
+    sa.Column('hold_id', sa.UUID(), nullable=False),
+    sa.Column('venue_id', sa.UUID(), nullable=False),
+    sa.Column('hold_day', sa.DATE(), nullable=False),
+    sa.Column('user_id', sa.UUID(), nullable=False),
+    sa.Column('created_at', sa.TIMESTAMP(), nullable=False),
+    sa.Column('expires_at', sa.TIMESTAMP(), nullable=False),
+    sa.Column('booking_id', sa.UUID(), nullable=True),
+    sa.ForeignKeyConstraint(['venue_id'], ['venue.venue_id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['user_id'], ['user.user_id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['booking_id'], ['booking.booking_id'], ondelete='SET NULL'),
+    sa.PrimaryKeyConstraint('hold_id'),
+    sa.UniqueConstraint('venue_id', 'hold_day', name='unique_venue_hold_day')
+    )
+    op.create_index('ix_venue_hold_expires_at', 'venue_hold', ['expires_at'], unique=False)
+    op.create_index('ix_venue_hold_user', 'venue_hold', ['user_id'], unique=False)
+
+    op.create_table('car_hold',
+    sa.Column('car_hold_id', sa.UUID(), nullable=False),
+    sa.Column('hold_id', sa.UUID(), nullable=False),
+    sa.Column('car_id', sa.UUID(), nullable=False),
+    sa.Column('reservation_day', sa.DATE(), nullable=False),
+    sa.ForeignKeyConstraint(['hold_id'], ['venue_hold.hold_id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['car_id'], ['car.car_id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('car_hold_id')
+    )
+    op.create_index('ix_car_hold_hold', 'car_hold', ['hold_id'], unique=False)
+    op.create_index('ix_car_hold_car_day', 'car_hold', ['car_id', 'reservation_day'], unique=False)
+
+    # held cars are counted per day like reservations, by the function of the car_reservation triggers
+    # (its transition tables are named the same here), so a hold is rejected when the cars are short that day
+    # and the cars of a deleted hold (released, expired and swept, cascaded) are counted as free again
+    op.execute("""
+    CREATE TRIGGER car_hold_insert_trigger
+    AFTER INSERT ON car_hold
+    REFERENCING NEW TABLE AS new_reservations
+    FOR EACH STATEMENT
+    EXECUTE FUNCTION count_car_reservations();
+    """)
+    op.execute("""
+    CREATE TRIGGER car_hold_update_trigger
+    AFTER UPDATE ON car_hold
+    REFERENCING OLD TABLE AS old_reservations NEW TABLE AS new_reservations
+    FOR EACH STATEMENT
+    EXECUTE FUNCTION count_car_reservations();
+    """)
+    op.execute("""
+    CREATE TRIGGER car_hold_delete_trigger
+    AFTER DELETE ON car_hold
+    REFERENCING OLD TABLE AS old_reservations
+    FOR EACH STATEMENT
+    EXECUTE FUNCTION count_car_reservations();
+    """)
+
+
+def downgrade() -> None:
+    # the held cars are taken off the day counters before the triggers go
+    op.execute("DELETE FROM car_hold;")
+    op.execute("DROP TRIGGER IF EXISTS car_hold_insert_trigger ON car_hold;")
+    op.execute("DROP TRIGGER IF EXISTS car_hold_update_trigger ON car_hold;")
+    op.execute("DROP TRIGGER IF EXISTS car_hold_delete_trigger ON car_hold;")
+    op.drop_index('ix_car_hold_car_day', table_name='car_hold')
+    op.drop_index('ix_car_hold_hold', table_name='car_hold')
+    op.drop_table('car_hold')
+    op.drop_index('ix_venue_hold_user', table_name='venue_hold')
+    op.drop_index('ix_venue_hold_expires_at', table_name='venue_hold')
+    op.drop_table('venue_hold')
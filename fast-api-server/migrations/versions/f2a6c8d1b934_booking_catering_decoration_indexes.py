@@ -0,0 +1,29 @@
+"""Index bookings by catering and decoration
+
+Revision ID: f2a6c8d1b934
+Revises: e7b4d2c9a310
+Create Date: 2026-10-18 10:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f2a6c8d1b934'
+down_revision: Union[str, None] = 'e7b4d2c9a310'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index('ix_booking_catering', 'booking', ['catering_id', 'booking_id'], unique=False)
+    op.create_index('ix_booking_decoration', 'booking', ['decoration_id', 'booking_id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_booking_decoration', table_name='booking')
+    op.drop_index('ix_booking_catering', table_name='booking')
@@ -1,8 +1,8 @@
+import asyncio
 from contextlib import asynccontextmanager
-from pathlib import Path
-from fastapi import FastAPI, HTTPException, Request
+from fastapi import FastAPI, Request
 from fastapi.responses import JSONResponse
-from src.db.main import init_db
+from src.db.main import async_engine, async_session_factory, init_db
 from fastapi.middleware.cors import CORSMiddleware
 from src.users.routes import user_router
 from src.caterings.routes import catering_router
@@ -11,22 +11,48 @@ from src.decorations.routes import decoration_router
 from src.promos.routes import promo_router
 from src.cars.routes import car_router
 from src.bookings.routes import booking_router
+from src.internal.routes import internal_router, metrics_router
+from src.internal.metrics import MetricsMiddleware, instrument_engine
+from src.internal.profiler import ProfilerMiddleware
+from src.images.upload_limit import UploadLimitMiddleware
+from src.images.routes import image_router
+from src.search.routes import search_router
+from src.quotes.routes import quote_router
+from src.catalog_io.routes import catalog_io_router
+from src.holds.routes import hold_router
+from src.holds.service import sweep_expired_holds
+from src.catalog_cache import catalog_cache, refresh_catalog_cache_versions
 import logging
-from fastapi.responses import FileResponse
 from src.config import Config
+from src.venues.availability import venue_availability_index
+from src.search.index import catalog_search_index
+from src.users.utils import hashing_executor
 
 
 @asynccontextmanager
 async def life_span(app: FastAPI):
     print(f"Server starting up...")
     await init_db()  # creates the tables
+    async with async_session_factory() as session:
+        await venue_availability_index.load(session)  # seed the venue/day occupancy index
+        await catalog_search_index.load(session)
+    await catalog_cache.refresh_versions()
+    hold_sweeper = asyncio.create_task(sweep_expired_holds())  # deletes expired venue/car holds
+    # the other workers' catalog changes, for the memory cache
+    cache_version_refresher = asyncio.create_task(refresh_catalog_cache_versions())
     yield
     print(f"Stopping server...")
+    hold_sweeper.cancel()
+    cache_version_refresher.cancel()
+    hashing_executor.shutdown(wait=False)
 
 
 app = FastAPI(lifespan=life_span)
 
 
+# image uploads over MAX_IMAGE_UPLOAD_BYTES are refused before their body is received (inside CORS so
+# the browser can read the 413)
+app.add_middleware(UploadLimitMiddleware)
 app.add_middleware(
     CORSMiddleware,
     # Replace with your React app's URL
@@ -34,7 +60,13 @@ app.add_middleware(
     allow_credentials=True,  # allow client to send cookies
     allow_methods=["*"],  # Allows all HTTP methods (GET, POST, etc.)
     allow_headers=["*"],  # Allows all headers
+    expose_headers=["X-Next-Cursor"],  # pagination cursor of list endpoints
 )
+# per route latency, SQL statement counts and DB time, see GET /metrics
+app.add_middleware(MetricsMiddleware)
+instrument_engine(async_engine.sync_engine)
+# the requests GET /internal/profile/requests is waiting for (PROFILER_ENABLED)
+app.add_middleware(ProfilerMiddleware)
 
 
 app.include_router(user_router)
@@ -44,17 +76,13 @@ app.include_router(decoration_router)
 app.include_router(promo_router)
 app.include_router(car_router)
 app.include_router(booking_router)
-
-
-# Serve images from the "images" directory
-
-
-@app.get("/images/{image_name}", response_class=FileResponse)
-async def serve_image(image_name: str):
-    file_path = Path("images") / image_name
-    if not file_path.exists():
-        raise HTTPException(status_code=404, detail="Image not found")
-    return FileResponse(file_path)
+app.include_router(internal_router)
+app.include_router(metrics_router)
+app.include_router(image_router)
+app.include_router(search_router)
+app.include_router(quote_router)
+app.include_router(catalog_io_router)
+app.include_router(hold_router)
 
 # Global exception handler
 
@@ -1,30 +1,31 @@
 from fastapi import APIRouter, Depends, HTTPException, status
 from sqlmodel.ext.asyncio.session import AsyncSession
-from src.db.main import get_session
+from src.db.main import get_session, get_unit_of_work
 from src.users.schemas import UserModel
 from src.bookings.service import BookingService
-from src.bookings.schemas import CreateBookingWithPaymentModel, UpdateBookingWithPaymentModel, BookingModel
+from src.bookings.schemas import CreateBookingWithPaymentModel, UpdateBookingWithPaymentModel, BookingModel, BookingFilterModel
 from uuid import UUID
 from src.users.JWTAuthMiddleware import JWTAuthMiddleware
+from src.pagination import PageParams, page_response
 
 booking_router = APIRouter(prefix="/bookings")
 booking_service = BookingService()
 
 
 @booking_router.get("/", response_model=list[BookingModel], status_code=status.HTTP_200_OK)
-async def get_all_bookings(user: UserModel = Depends(JWTAuthMiddleware), session: AsyncSession = Depends(get_session)):
+async def get_all_bookings(page: PageParams = Depends(), filters: BookingFilterModel = Depends(), user: UserModel = Depends(JWTAuthMiddleware), session: AsyncSession = Depends(get_session)):
     if not user.is_admin:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN, detail="Admin access required"
         )
-    bookings = await booking_service.get_all_bookings(session)
-    return bookings
+    bookings, next_cursor = await booking_service.get_all_bookings(page, filters, session)
+    return page_response(bookings, next_cursor, BookingModel, page)
 
 
 @booking_router.get("/me", response_model=list[BookingModel], status_code=status.HTTP_200_OK)
-async def get_my_bookings(user: UserModel = Depends(JWTAuthMiddleware), session: AsyncSession = Depends(get_session)):
-    bookings = await booking_service.get_my_bookings(user.user_id, session)
-    return bookings
+async def get_my_bookings(page: PageParams = Depends(), filters: BookingFilterModel = Depends(), user: UserModel = Depends(JWTAuthMiddleware), session: AsyncSession = Depends(get_session)):
+    bookings, next_cursor = await booking_service.get_my_bookings(user.user_id, page, filters, session)
+    return page_response(bookings, next_cursor, BookingModel, page)
 
 
 @booking_router.get("/{booking_id}", response_model=BookingModel, status_code=status.HTTP_200_OK)
@@ -40,13 +41,13 @@ async def get_booking(booking_id: UUID, session: AsyncSession = Depends(get_sess
 async def create_booking_with_payment(
     booking_and_payment_data: CreateBookingWithPaymentModel,
     user: UserModel = Depends(JWTAuthMiddleware),
-    session: AsyncSession = Depends(get_session),
+    session: AsyncSession = Depends(get_unit_of_work),
 ):
 
-    booking = await booking_service.create_booking_with_payment(booking_and_payment_data, session)
+    booking = await booking_service.create_booking_with_payment(booking_and_payment_data, user.user_id, session)
     if not booking:
         raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST, detail="The chosen Venue is already reserved for another booking on the provided date"
+            status_code=status.HTTP_409_CONFLICT, detail="The chosen Venue is already reserved for another booking on the provided date"
         )
     return booking
 
@@ -54,7 +55,7 @@ async def create_booking_with_payment(
 @booking_router.delete("/{booking_id}", status_code=status.HTTP_204_NO_CONTENT)
 async def delete_booking(
     booking_id: UUID,
-    session: AsyncSession = Depends(get_session),
+    session: AsyncSession = Depends(get_unit_of_work),
 ):
   
 
@@ -70,7 +71,7 @@ async def delete_booking(
 async def update_booking_with_payment(
     booking_id: UUID,
     booking_and_payment_data: UpdateBookingWithPaymentModel,
-    session: AsyncSession = Depends(get_session),
+    session: AsyncSession = Depends(get_unit_of_work),
 ):
 
     booking = await booking_service.update_booking_with_payment(booking_id, booking_and_payment_data, session)
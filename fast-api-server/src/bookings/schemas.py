@@ -22,6 +22,16 @@ class BookingModel(BaseModel):
     promo: Promo | None = None
 
 
+class BookingFilterModel(BaseModel):
+    # range of booking_event_date
+    from_date: datetime | None = None
+    to_date: datetime | None = None
+    booking_status: BookingStatus | None = None
+    # bookings of one catering / decoration (they no longer come with the catering and decoration cards)
+    catering_id: UUID | None = None
+    decoration_id: UUID | None = None
+
+
 class PaymentModel(BaseModel):
     payment_id: UUID
     amount_payed: int = Field(ge=0)
@@ -51,9 +61,10 @@ class CreateBookingModel(BaseModel):
 
 class CreatePaymentModel(BaseModel):
     amount_payed: int = Field(ge=0)
-    total_amount: int = Field(ge=0)
+    # total_amount and discount are priced by the server (see quotes), values sent here are ignored
+    total_amount: int = Field(ge=0, default=0)
     payment_method: PaymentMethod
-    discount: float = Field(ge=0)
+    discount: float = Field(ge=0, default=0)
 
 
 class UpdateBookingModel(BaseModel):
@@ -77,6 +88,7 @@ class UpdateBookingModel(BaseModel):
 
 class UpdatePaymentModel(BaseModel):
     amount_payed: int | None = Field(ge=0, default=None)
+    # ignored like in CreatePaymentModel, the booking is priced again on every update
     total_amount: int | None = Field(ge=0, default=None)
     payment_method: PaymentMethod | None = None
     discount: float | None = Field(ge=0, default=None)
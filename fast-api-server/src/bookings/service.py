@@ -1,98 +1,139 @@
+from datetime import date
 from fastapi import HTTPException, status
 from sqlalchemy import func
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.exc import DBAPIError
 from sqlmodel import select
 from sqlmodel.ext.asyncio.session import AsyncSession
-from src.db.models import Booking, Payment, Car, Venue
-from uuid import UUID
-from src.bookings.schemas import CreateBookingWithPaymentModel, UpdateBookingWithPaymentModel
+from src.catalog_cache import BOOKING_NAMESPACES, catalog_cache
+from src.db.main import after_commit, commit
+from src.db.models import Booking, Payment, Venue
+from uuid import UUID, uuid4
+from src.bookings.schemas import CreateBookingWithPaymentModel, UpdateBookingWithPaymentModel, BookingFilterModel
+from src.pagination import PageParams, paginate
+from src.venues.availability import venue_availability_index
+from src.db.loading import load_profile
+from src.quotes.service import QuoteService, apply_quote
+from src.cars.service import is_car_shortage
+from src.holds.service import HoldService
+
+
+def booking_query():
+    # Every booking read path goes through this, so the number of statements is fixed
+    # (one joined select + one selectin for car_reservations) no matter how many bookings are returned
+    return select(Booking).options(*load_profile("booking.full"))
+
+
+def filter_bookings(query, filters: BookingFilterModel):
+    if filters.from_date is not None:
+        query = query.where(Booking.booking_event_date >= filters.from_date)
+    if filters.to_date is not None:
+        query = query.where(Booking.booking_event_date <= filters.to_date)
+    if filters.booking_status is not None:
+        query = query.where(Booking.booking_status == filters.booking_status)
+    if filters.catering_id is not None:
+        query = query.where(Booking.catering_id == filters.catering_id)
+    if filters.decoration_id is not None:
+        query = query.where(Booking.decoration_id == filters.decoration_id)
+    return query
+
+
+BOOKING_SORT_COLUMNS = {
+    "booking_date": Booking.booking_date,
+    "booking_event_date": Booking.booking_event_date,
+}
+
+quote_service = QuoteService()
+hold_service = HoldService()
 
 
 class BookingService:
-    async def get_all_bookings(self, session: AsyncSession):
-        query = select(Booking)
-        result = await session.exec(query)
-        bookings = result.all()
-        new_bookings = []
-        for booking in bookings:
-            # need to add array
-            await session.refresh(booking, ["user", "venue", "car_reservations", "decoration", "catering", "payment", "promo"])
-            new_bookings.append(booking)
-        return new_bookings
-
-    async def get_my_bookings(self, user_id: UUID, session: AsyncSession):
-        query = select(Booking).where(Booking.user_id == user_id)
-        result = await session.exec(query)
-        bookings = result.all()
-        new_bookings = []
-        for booking in bookings:
-            # need to add array
-            await session.refresh(booking, ["user", "venue", "car_reservations", "decoration", "catering", "payment", "promo"])
-            new_bookings.append(booking)
-        return new_bookings
-
-    async def get_booking(self, booking_id: UUID, session: AsyncSession):
-        query = select(Booking).where(Booking.booking_id == booking_id)
+    async def get_all_bookings(self, page: PageParams, filters: BookingFilterModel, session: AsyncSession):
+        query = filter_bookings(booking_query(), filters)
+        return await paginate(query, page, session, Booking.booking_id, BOOKING_SORT_COLUMNS)
+
+    async def get_my_bookings(self, user_id: UUID, page: PageParams, filters: BookingFilterModel, session: AsyncSession):
+        query = filter_bookings(booking_query().where(
+            Booking.user_id == user_id), filters)
+        return await paginate(query, page, session, Booking.booking_id, BOOKING_SORT_COLUMNS)
+
+    async def get_booking(self, booking_id: UUID, session: AsyncSession, reload: bool = False):
+        query = booking_query().where(Booking.booking_id == booking_id)
+        if reload:
+            # overwrite the already loaded instance (and its relationships) after a write
+            query = query.execution_options(populate_existing=True)
         result = await session.exec(query)
         booking = result.first()
-
-        await session.refresh(booking, ["user", "venue", "car_reservations", "decoration", "catering", "payment", "promo"])
         return booking if booking else None
 
-    async def create_booking_with_payment(self, booking_and_payment_data: CreateBookingWithPaymentModel, session: AsyncSession):
-        query = select(Booking).where(func.date(Booking.booking_event_date) == booking_and_payment_data.booking.booking_event_date.date(),
-                                      Booking.venue_id == booking_and_payment_data.booking.venue_id)
+    async def check_hold(self, venue_id: UUID, day: date, user_id: UUID, session: AsyncSession):
+        # a day held for another customer is theirs until the hold expires, returns the customer's own hold
+        # (user_id is who books: the logged in user, or the booking's owner when a booking is moved)
+        hold = await hold_service.get_active_hold(venue_id, day, session)
+        if hold and hold.user_id != user_id:
+            raise HTTPException(status_code=status.HTTP_409_CONFLICT,
+                                detail="The chosen Venue is held for another customer on the provided date")
+        return hold
+
+    async def create_booking_with_payment(self, booking_and_payment_data: CreateBookingWithPaymentModel, user_id: UUID, session: AsyncSession):
+        query = select(Venue).where(Venue.venue_id ==
+                                    booking_and_payment_data.booking.venue_id)
         result = await session.exec(query)
-        booking = result.first()
-        if booking:
-            return None
-
-        query2 = select(Venue).where(Venue.venue_id ==
-                                     booking_and_payment_data.booking.venue_id)
-        result2 = await session.exec(query2)
-        venue = result2.first()
+        venue = result.first()
         if venue and booking_and_payment_data.booking.booking_guest_count > venue.venue_capacity:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST, detail="Guest count exceeds venue capacity"
             )
 
-        # Create the Booking object
-        new_booking = Booking(
-            **booking_and_payment_data.booking.model_dump()
-        )
-        session.add(new_booking)
-        await session.commit()
-        await session.refresh(new_booking, ["user", "venue", "car_reservations", "decoration", "catering", "payment", "promo"])
+        # checked against the logged in user, not the body's user_id, the holder books on their hold
+        booking_data = booking_and_payment_data.booking
+        hold = await self.check_hold(booking_data.venue_id, booking_data.booking_event_date.date(), user_id, session)
+
+        # priced before it is inserted: from the insert on, a concurrent booking of the same venue and day
+        # waits for this transaction, so that should end soon after (the booking has no cars yet)
+        booking_values = {**booking_data.model_dump(), "booking_id": uuid4()}
+        new_booking = Booking(**booking_values)
+        quote = await quote_service.price_booking(new_booking, session, check_promo_expiry=True)
+
+        # the unique_venue_reservation_day index decides who gets the day, races included:
+        # when the day is taken the insert does nothing and returns no row
+        statement = insert(Booking).values(**booking_values).on_conflict_do_nothing(
+            index_elements=[Booking.venue_id, func.date(Booking.booking_event_date)]).returning(Booking.booking_id)
+        result = await session.exec(statement)  # type: ignore
+        if result.scalar_one_or_none() is None:
+            return None
+        if hold:
+            hold.booking_id = new_booking.booking_id  # its cars are given over when the booking reserves them
 
         # Create the Payment object and associate it with the Booking
         new_payment = Payment(
             **booking_and_payment_data.payment.model_dump(),
-            booking=new_booking  # Link the payment to the booking
+            booking_id=new_booking.booking_id  # Link the payment to the booking
         )
+        apply_quote(new_payment, quote)  # the stored total is the server's, not the client's
 
         session.add(new_payment)
-        await session.commit()
-        # refersh booking again to get payment data also
-        await session.refresh(new_booking, ["user", "venue", "car_reservations", "decoration", "catering", "payment", "promo"])
+        after_commit(session, lambda: venue_availability_index.add(
+            new_booking.venue_id, new_booking.booking_event_date.date()))
+        catalog_cache.invalidate_after_commit(session, *BOOKING_NAMESPACES)
+        await commit(session)  # booking and payment are committed together
 
-        return new_booking
+        # load the booking again to get payment and the other relationships also
+        return await self.get_booking(new_booking.booking_id, session, reload=True)
 
     async def delete_booking(self, booking_id: UUID, session: AsyncSession):
         booking = await self.get_booking(booking_id, session)
         if not booking:
             return None
 
-        # increment the car quantity of each car used in this booking's car reservations
-        for car_reservation in booking.car_reservations:
-            query = select(Car).where(Car.car_id == car_reservation.car_id)
-            result = await session.exec(query)
-            car = result.first()
-            if car:
-                setattr(car, "car_quantity", car.car_quantity + 1)
-
         print("\n\n", "awda", "\n\n")
         # all car reservations will be deleted because of on delete cascade relationship set in db/models
+        # and their cars counted as free again that day by car_reservation_delete_trigger
         await session.delete(booking)
-        await session.commit()
+        after_commit(session, lambda: venue_availability_index.remove(
+            booking.venue_id, booking.booking_event_date.date()))
+        catalog_cache.invalidate_after_commit(session, *BOOKING_NAMESPACES)
+        await commit(session)
         # await session.refresh(booking, ["user", "venue", "car_reservations", "decoration", "catering", "payment", "promo"])
         return booking
 
@@ -103,15 +144,49 @@ class BookingService:
         booking = await self.get_booking(booking_id, session)
         if not booking:
             return None
+        old_venue_id, old_event_day = booking.venue_id, booking.booking_event_date.date()
+        old_promo_id = booking.promo_id
+        updates = booking_and_payment_data.booking.model_dump(exclude_unset=True)
+
+        # moving to another venue or day: that day may be held, by another customer (409) or the booking's owner,
+        # and the hold the booking was made on lets go of the old day
+        # (before the fields are set, the queries would flush the move ahead of its car check below)
+        hold = None
+        new_venue_id = updates.get("venue_id") or old_venue_id
+        new_event_day = (updates.get("booking_event_date") or booking.booking_event_date).date()
+        if (new_venue_id, new_event_day) != (old_venue_id, old_event_day):
+            hold = await self.check_hold(new_venue_id, new_event_day, booking.user_id, session)
+            await hold_service.release_booked_hold(booking.booking_id, old_venue_id, old_event_day, session)
 
         # Update the booking fields
-        for field, value in booking_and_payment_data.booking.model_dump(exclude_unset=True).items():
+        for field, value in updates.items():
             setattr(booking, field, value)
+        if booking.booking_event_date.date() != old_event_day:
+            # booking_event_day_trigger moves the car reservations along, the cars have to be free on the new day
+            try:
+                await session.flush()
+            except DBAPIError as e:
+                if is_car_shortage(e):
+                    raise HTTPException(status_code=status.HTTP_409_CONFLICT,
+                                        detail="Reserved cars are not available on the new event date")
+                raise
             # Update the payment fields
         if booking.payment:
             for field, value in booking_and_payment_data.payment.model_dump(exclude_unset=True).items():
                 setattr(booking.payment, field, value)
-
-        await session.commit()
-        await session.refresh(booking, ["user", "venue", "car_reservations", "decoration", "catering", "payment", "promo"])
-        return booking
+            # a newly chosen promo has to be active, a kept one was checked when it was chosen
+            quote = await quote_service.price_booking(
+                booking, session, check_promo_expiry=booking.promo_id != old_promo_id)
+            apply_quote(booking.payment, quote)
+        if hold:
+            hold.booking_id = booking.booking_id
+
+        new_venue_id, new_event_day = booking.venue_id, booking.booking_event_date.date()
+        if (new_venue_id, new_event_day) != (old_venue_id, old_event_day):
+            def move_reserved_day():
+                venue_availability_index.remove(old_venue_id, old_event_day)
+                venue_availability_index.add(new_venue_id, new_event_day)
+            after_commit(session, move_reserved_day)
+        catalog_cache.invalidate_after_commit(session, *BOOKING_NAMESPACES)
+        await commit(session)
+        return await self.get_booking(booking_id, session, reload=True)
@@ -1,34 +1,46 @@
-from fastapi import APIRouter, Depends, HTTPException, status, File, Form, UploadFile
+from fastapi import APIRouter, Depends, HTTPException, status, File, Form, UploadFile, Request
 from sqlmodel.ext.asyncio.session import AsyncSession
-from src.db.main import get_session
+from src.db.main import get_session, get_unit_of_work
 from src.users.schemas import UserModel
 from src.cars.service import CarService
-from src.cars.schemas import CarModel, CreateCarModel, CarReservationModel
+from src.cars.schemas import CarModel, CreateCarModel, CarReservationModel, CarFilterModel, CreateCarReservationsModel, CarAvailabilityFilterModel, CarAvailabilityModel
 from uuid import UUID
 from src.users.JWTAuthMiddleware import JWTAuthMiddleware
 from src.config import Config
 from src.utils import upload_image
+from src.pagination import PageParams, page_response
+from src.catalog_cache import catalog_cache
 
 car_router = APIRouter(prefix="/cars")
 car_service = CarService()
 
 
 @car_router.get("/", response_model=list[CarModel], status_code=status.HTTP_200_OK)
-async def get_all_cars(session: AsyncSession = Depends(get_session)):
-    cars = await car_service.get_all_cars(session)
-    return cars
+async def get_all_cars(request: Request, page: PageParams = Depends(), filters: CarFilterModel = Depends(), session: AsyncSession = Depends(get_session)):
+    async def build():
+        cars, next_cursor = await car_service.get_all_cars(page, filters, session)
+        return page_response(cars, next_cursor, CarModel, page)
+    return await catalog_cache.respond(request, "cars", build)
 
 
 @car_router.get("/reservations",  response_model=list[CarReservationModel], status_code=status.HTTP_200_OK)
-async def get_all_reservations(session: AsyncSession = Depends(get_session), user: UserModel = Depends(JWTAuthMiddleware)):
+async def get_all_reservations(page: PageParams = Depends(), session: AsyncSession = Depends(get_session), user: UserModel = Depends(JWTAuthMiddleware)):
     print("hey")
     if not user.is_admin:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN, detail="Admin access required"
         )
     # Fetch all car reservations
-    car_reservations = await car_service.get_all_car_reservations(session)
-    return car_reservations
+    car_reservations, next_cursor = await car_service.get_all_car_reservations(page, session)
+    return page_response(car_reservations, next_cursor, CarReservationModel, page)
+
+
+# How many of every car are still free on an event day, eg: /cars/availability?date=2026-06-20&available_only=true
+# must stay above /{car_id} so "availability" isn't parsed as a car id
+@car_router.get("/availability", response_model=list[CarAvailabilityModel], status_code=status.HTTP_200_OK)
+async def get_car_availability(page: PageParams = Depends(), filters: CarAvailabilityFilterModel = Depends(), session: AsyncSession = Depends(get_session)):
+    cars, next_cursor = await car_service.get_car_availability(page, filters, session)
+    return page_response(cars, next_cursor, CarAvailabilityModel, page)
 
 
 @car_router.get("/{car_id}", response_model=CarModel, status_code=status.HTTP_200_OK)
@@ -49,7 +61,7 @@ async def create_car(
     car_image: UploadFile | None = File(None),
     car_quantity: int | None = Form(None),
     user: UserModel = Depends(JWTAuthMiddleware),
-    session: AsyncSession = Depends(get_session),
+    session: AsyncSession = Depends(get_unit_of_work),
 ):
     if not user.is_admin:
         raise HTTPException(
@@ -75,7 +87,7 @@ async def create_car(
 async def delete_car(
     car_id: UUID,
     user: UserModel = Depends(JWTAuthMiddleware),
-    session: AsyncSession = Depends(get_session),
+    session: AsyncSession = Depends(get_unit_of_work),
 ):
     if not user.is_admin:
         raise HTTPException(
@@ -89,12 +101,29 @@ async def delete_car(
     return deleted
 
 
+# Reserve several cars (and several of the same car) for a booking at once, either all of them or none
+# must stay above /{car_id}/{booking_id} so "reservations" isn't parsed as a car id
+@car_router.post("/reservations/{booking_id}", response_model=list[CarReservationModel], status_code=status.HTTP_201_CREATED)
+async def add_car_reservations(
+    booking_id: UUID,
+    reservations: CreateCarReservationsModel,
+    user: UserModel = Depends(JWTAuthMiddleware),
+    session: AsyncSession = Depends(get_unit_of_work),
+):
+    car_reservations = await car_service.add_car_reservations(booking_id, reservations.cars, session)
+    if car_reservations is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="Booking not found"
+        )
+    return car_reservations
+
+
 @car_router.post("/{car_id}/{booking_id}", response_model=CarReservationModel, status_code=status.HTTP_201_CREATED)
 async def add_car_reservation(
     car_id: UUID,
     booking_id: UUID,
     user: UserModel = Depends(JWTAuthMiddleware),
-    session: AsyncSession = Depends(get_session),
+    session: AsyncSession = Depends(get_unit_of_work),
 ):
 
     # Add car reservation using path parameters
@@ -109,7 +138,7 @@ async def add_car_reservation(
 @car_router.delete("/reservations/{car_reservation_id}", status_code=status.HTTP_204_NO_CONTENT)
 async def remove_car_reservation(
     car_reservation_id: UUID,
-    session: AsyncSession = Depends(get_session),
+    session: AsyncSession = Depends(get_unit_of_work),
 ):
 
     # Remove car reservation using car_reservation_id
@@ -127,7 +156,7 @@ async def remove_car_reservation(
 #     car_id: UUID,
 #     car_quantity: int,
 #     user: UserModel = Depends(JWTAuthMiddleware),
-#     session: AsyncSession = Depends(get_session),
+#     session: AsyncSession = Depends(get_unit_of_work),
 # ):
 #     if not user.is_admin:
 #         raise HTTPException(
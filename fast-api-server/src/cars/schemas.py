@@ -1,7 +1,7 @@
 from pydantic import BaseModel, Field, field_validator
 from uuid import UUID
 from src.db.models import CarReservation
-from datetime import datetime
+from datetime import date, datetime
 
 
 class CarModel(BaseModel):
@@ -24,6 +24,13 @@ class CarModel(BaseModel):
         return value
 
 
+class CarFilterModel(BaseModel):
+    min_price: int | None = None
+    max_price: int | None = None
+    min_year: int | None = None
+    max_year: int | None = None
+
+
 class CreateCarModel(BaseModel):
     car_make: str
     car_model: str
@@ -40,7 +47,35 @@ class CreateCarModel(BaseModel):
         return value
 
 
+class CarQuantityModel(BaseModel):
+    car_id: UUID
+    quantity: int = Field(ge=1, default=1)
+
+
+class CreateCarReservationsModel(BaseModel):
+    cars: list[CarQuantityModel] = Field(min_length=1)
+
+
 class CarReservationModel(BaseModel):
     car_reservation_id: UUID
     car_id: UUID
     booking_id: UUID
+    reservation_day: date
+
+
+class CarAvailabilityFilterModel(BaseModel):
+    date: date
+    # leave out the cars that are all taken that day
+    available_only: bool = False
+
+
+class CarAvailabilityModel(BaseModel):
+    car_id: UUID
+    car_make: str
+    car_model: str
+    car_year: int
+    car_rental_price: int
+    car_quantity: int
+    # reserved and still available on the requested day
+    reserved: int
+    available: int
@@ -1,20 +1,62 @@
+from fastapi import HTTPException, status
+from datetime import date, datetime
+from typing import Iterable
+from sqlalchemy import and_, delete, func, insert, or_
+from sqlalchemy.exc import DBAPIError
 from sqlmodel import select
 from sqlmodel.ext.asyncio.session import AsyncSession
-from src.db.models import Car, CarReservation
+from src.catalog_cache import catalog_cache
+from src.db.main import after_commit, commit
+from src.config import Config
+from src.db.models import Booking, Car, CarHold, CarReservation, CarReservationDay, VenueHold
 from uuid import UUID, uuid4
-from src.utils import delete_image
-from src.cars.schemas import CreateCarModel
+from src.utils import acquire_image, delete_image
+from src.cars.schemas import CreateCarModel, CarFilterModel, CarQuantityModel, CarAvailabilityFilterModel
+from src.db.loading import load_profile
+from src.search.index import car_document, catalog_search_index
+from src.quotes.prices import component_prices
+from src.quotes.service import QuoteService
+from src.pagination import PageParams, paginate
+
+quote_service = QuoteService()
+
+
+def is_car_shortage(error: DBAPIError):
+    # raised by the car_reservation triggers when a car has no more left on a day
+    return "insufficient quantity" in str(error.orig)
+
+
+async def release_car_holds(car_ids: Iterable[UUID], day: date, session: AsyncSession, booking_id: UUID | None = None):
+    # held cars count in car_reservation_day until their car_hold rows are gone (car_hold triggers): the cars of
+    # expired holds are given back now instead of at the next sweep, and the cars held for a booking
+    # make way for the booking's own reservations
+    released = and_(VenueHold.expires_at <= datetime.now(), CarHold.car_id.in_(car_ids),  # type: ignore
+                    CarHold.reservation_day == day)
+    if booking_id is not None:
+        released = or_(VenueHold.booking_id == booking_id, released)
+    await session.exec(delete(CarHold).where(CarHold.hold_id == VenueHold.hold_id, released))  # type: ignore
 
 
 class CarService:
-    async def get_all_cars(self, session: AsyncSession):
-        query = select(Car)
-        result = await session.exec(query)
-        cars = result.all()
-        return cars
+    async def get_all_cars(self, page: PageParams, filters: CarFilterModel, session: AsyncSession):
+        query = select(Car).options(*load_profile("car.card"))
+        if filters.min_price is not None:
+            query = query.where(Car.car_rental_price >= filters.min_price)
+        if filters.max_price is not None:
+            query = query.where(Car.car_rental_price <= filters.max_price)
+        if filters.min_year is not None:
+            query = query.where(Car.car_year >= filters.min_year)
+        if filters.max_year is not None:
+            query = query.where(Car.car_year <= filters.max_year)
+        return await paginate(query, page, session, Car.car_id, {
+            "car_make": Car.car_make,
+            "car_year": Car.car_year,
+            "car_rental_price": Car.car_rental_price,
+        })
 
     async def get_car(self, car_id: UUID, session: AsyncSession):
-        query = select(Car).where(Car.car_id == car_id)
+        query = select(Car).where(Car.car_id == car_id).options(
+            *load_profile("car.card"))
         result = await session.exec(query)
         car = result.first()
         return car if car else None
@@ -22,10 +64,11 @@ class CarService:
     async def create_car(self, car_data: CreateCarModel, session: AsyncSession):
         new_car = Car(**car_data.model_dump())
         session.add(new_car)
-        await session.commit()
-        await session.refresh(new_car)
-
-        return new_car
+        await acquire_image(new_car.car_image, session)
+        after_commit(session, lambda: catalog_search_index.put(car_document(new_car)))
+        catalog_cache.invalidate_after_commit(session, "cars")
+        await commit(session)
+        return await self.get_car(new_car.car_id, session)
 
     async def delete_car(self, car_id: UUID, session: AsyncSession):
         query = select(Car).where(Car.car_id == car_id)
@@ -34,30 +77,80 @@ class CarService:
         if not car:
             return None
         # Extract and delete the associated image file, if it exists
-        await delete_image(car.car_image)
+        await delete_image(car.car_image, session)
+        # its reservations go with it (on delete cascade), the bookings that had them are priced again
+        result = await session.exec(select(CarReservation.booking_id).where(
+            CarReservation.car_id == car_id).distinct())
+        booking_ids = result.all()
         await session.delete(car)
-        await session.commit()
+        await session.flush()
+        for booking_id in booking_ids:
+            await quote_service.reprice_booking(booking_id, session)
+        after_commit(session, lambda: catalog_search_index.remove("car", car_id))
+        after_commit(session, lambda: component_prices.invalidate("car", car_id))
+        catalog_cache.invalidate_after_commit(session, "cars")
+        await commit(session)
         return car
 
-    async def get_all_car_reservations(self, session: AsyncSession):
+    async def get_all_car_reservations(self, page: PageParams, session: AsyncSession):
         # Query to get all car reservations
         query = select(CarReservation)
-        result = await session.exec(query)
-        car_reservations = result.all()
-        return car_reservations
+        return await paginate(query, page, session, CarReservation.car_reservation_id)
+
+    async def get_car_availability(self, page: PageParams, filters: CarAvailabilityFilterModel, session: AsyncSession):
+        # every car with what is reserved of it on that day, one lookup of car_reservation_day per car
+        # (primary key (reservation_day, car_id)), the reservations themselves aren't read
+        reserved = func.coalesce(CarReservationDay.reserved, 0)
+        query = select(Car.car_id, Car.car_make, Car.car_model, Car.car_year, Car.car_rental_price, Car.car_quantity,
+                       reserved.label("reserved"), (Car.car_quantity - reserved).label("available")).outerjoin(
+            CarReservationDay, and_(CarReservationDay.car_id == Car.car_id,
+                                    CarReservationDay.reservation_day == filters.date))
+        if filters.available_only:
+            query = query.where(Car.car_quantity > reserved)
+        return await paginate(query, page, session, Car.car_id, {
+            "car_make": Car.car_make,
+            "car_year": Car.car_year,
+            "car_rental_price": Car.car_rental_price,
+        })
 
     async def add_car_reservation(self, car_id: UUID, booking_id: UUID, session: AsyncSession):
-        query = select(Car).where(Car.car_id == car_id)
-        result = await session.exec(query)
-        car = result.first()
-        if (car and car.car_quantity > 0):
-            new_car_reservation = CarReservation(
-                car_id=car_id, booking_id=booking_id, car_reservation_id=uuid4())
-            session.add(new_car_reservation)
-            await session.commit()
-            await session.refresh(new_car_reservation)
-            return new_car_reservation
-        return None
+        reservations = await self.add_car_reservations(booking_id, [CarQuantityModel(car_id=car_id)], session)
+        return reservations[0] if reservations else None
+
+    async def add_car_reservations(self, booking_id: UUID, cars: list[CarQuantityModel], session: AsyncSession):
+        # all or nothing: the reservations go in with one INSERT, car_reservation_insert_trigger then counts them
+        # on the booking's event day and rejects the statement if any car is short that day
+        quantities: dict[UUID, int] = {}
+        for car in cars:
+            quantities[car.car_id] = quantities.get(car.car_id, 0) + car.quantity
+        if sum(quantities.values()) > Config.CAR_RESERVATION_MAX_BATCH:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST,
+                                detail=f"Cannot reserve more than {Config.CAR_RESERVATION_MAX_BATCH} cars at once")
+        result = await session.exec(select(Booking.booking_event_date).where(Booking.booking_id == booking_id))
+        event_date = result.first()
+        if not event_date:
+            return None
+        result = await session.exec(select(Car.car_id).where(Car.car_id.in_(quantities)))  # type: ignore
+        missing = set(quantities) - set(result.all())
+        if missing:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND,
+                                detail=f"Car not found: {', '.join(sorted(map(str, missing)))}")
+
+        reservations = [CarReservation(car_reservation_id=uuid4(), car_id=car_id, booking_id=booking_id,
+                                       reservation_day=event_date.date())
+                        for car_id, quantity in quantities.items() for _ in range(quantity)]
+        await release_car_holds(quantities, event_date.date(), session, booking_id=booking_id)
+        try:
+            await session.exec(insert(CarReservation).values([  # type: ignore
+                reservation.model_dump() for reservation in reservations]))
+        except DBAPIError as e:
+            if is_car_shortage(e):
+                raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="Not enough cars available")
+            raise
+        await quote_service.reprice_booking(booking_id, session)
+        catalog_cache.invalidate_after_commit(session, "cars")
+        await commit(session)
+        return reservations
 
     async def remove_car_reservation(self, car_reservation_id: UUID, session: AsyncSession):
         query = select(CarReservation).where(
@@ -66,17 +159,18 @@ class CarService:
         car_reservation = result.first()
         if not car_reservation:
             return None
+        # the car is counted as free again that day by car_reservation_delete_trigger
         await session.delete(car_reservation)
-        # Increment car quantity
-        car = await self.get_car(car_reservation.car_id, session)
-        if car:
-            await self.update_car_quantity(car.car_id, car.car_quantity + 1, session)
-        await session.commit()
+        await session.flush()
+        await quote_service.reprice_booking(car_reservation.booking_id, session)
+        catalog_cache.invalidate_after_commit(session, "cars")
+        await commit(session)
         return car_reservation
 
     async def update_car_quantity(self, car_id: UUID, car_quantity: int, session: AsyncSession):
         car = await self.get_car(car_id, session)
         setattr(car, "car_quantity", car_quantity)
-        await session.commit()
+        catalog_cache.invalidate_after_commit(session, "cars")
+        await commit(session)
         await session.refresh(car)
         return car if car else None
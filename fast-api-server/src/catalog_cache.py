@@ -0,0 +1,208 @@
+import asyncio
+import hashlib
+import logging
+from abc import ABC, abstractmethod
+from typing import Awaitable, Callable
+from urllib.parse import urlencode
+from cachetools import TTLCache
+from fastapi import Request, Response
+from sqlalchemy.dialects.postgresql import insert
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+from src.config import Config
+from src.db.main import after_commit_async, async_session_factory
+from src.db.models import CatalogCacheVersion
+
+# Response cache of the public catalog list endpoints (venues, caterings, dishes, cars, decorations, promos)
+# Stores the serialized JSON body of each page, keyed by namespace + query string, so a cached read
+# needs no database access at all
+# Every namespace has a version that is part of the key, the services bump it after committing a change
+# (invalidate_after_commit) which orphans all of the namespace's pages at once, orphans expire with the TTL
+# The versions are shared by all workers. With the redis backend they are read from Redis, so a change made
+# through one worker is seen by the next read of every worker. The memory backend keeps a copy of the
+# catalog_cache_version rows in every worker, reloaded every CATALOG_CACHE_VERSION_REFRESH seconds so cached
+# reads don't check out a database connection: a change is seen at once by the worker that made it and
+# within that interval by the others
+# The TTL also bounds staleness for changes made outside the app and for time based filters (active promos)
+
+# namespaces whose responses embed car reservations, changed by anything adding/removing bookings
+# (caterings and decorations don't embed their bookings, GET /bookings/ pages them)
+BOOKING_NAMESPACES = ("cars",)
+
+
+class CatalogCacheBackend(ABC):
+    @abstractmethod
+    async def get(self, key: str) -> bytes | None:
+        ...
+
+    @abstractmethod
+    async def set(self, key: str, value: bytes):
+        ...
+
+    @abstractmethod
+    async def get_version(self, namespace: str) -> int:
+        ...
+
+    @abstractmethod
+    async def bump_version(self, namespace: str):
+        ...
+
+    async def refresh_versions(self):
+        # for backends keeping a copy of the versions, the others read them on every get_version
+        pass
+
+
+class MemoryCacheBackend(CatalogCacheBackend):
+    # pages per process, every worker fills its own, the namespace versions are rows of catalog_cache_version
+    # copied into every worker by refresh_versions, so a change invalidates the pages of every worker
+    def __init__(self):
+        self._entries: TTLCache[str, bytes] = TTLCache(
+            maxsize=Config.CATALOG_CACHE_SIZE, ttl=Config.CATALOG_CACHE_TTL)
+        self._versions: dict[str, int] = {}
+
+    async def get(self, key: str):
+        return self._entries.get(key)
+
+    async def set(self, key: str, value: bytes):
+        self._entries[key] = value
+
+    async def get_version(self, namespace: str):
+        return self._versions.get(namespace, 0)
+
+    async def bump_version(self, namespace: str):
+        async with async_session_factory() as session:
+            statement = insert(CatalogCacheVersion).values(namespace=namespace, version=1).on_conflict_do_update(
+                index_elements=[CatalogCacheVersion.namespace],
+                set_={"version": CatalogCacheVersion.version + 1}).returning(CatalogCacheVersion.version)
+            version = (await session.exec(statement)).scalar_one()  # type: ignore
+            await session.commit()
+        self._set_version(namespace, version)
+
+    async def refresh_versions(self):
+        async with async_session_factory() as session:
+            result = await session.exec(select(CatalogCacheVersion.namespace, CatalogCacheVersion.version))
+            for namespace, version in result.all():
+                self._set_version(namespace, version)
+
+    def _set_version(self, namespace: str, version: int):
+        # a reload that started before this worker's own bump must not take it back
+        self._versions[namespace] = max(self._versions.get(namespace, 0), version)
+
+
+class RedisCacheBackend(CatalogCacheBackend):
+    # shared by all workers, any Redis protocol server (Redis, Valkey, KeyDB, ...)
+    def __init__(self, url: str):
+        import redis.asyncio  # only needed with CATALOG_CACHE_BACKEND=redis
+
+        self.redis = redis.asyncio.from_url(url)
+
+    async def get(self, key: str):
+        return await self.redis.get(f"catalog:{key}")
+
+    async def set(self, key: str, value: bytes):
+        await self.redis.set(f"catalog:{key}", value, ex=Config.CATALOG_CACHE_TTL)
+
+    async def get_version(self, namespace: str):
+        return int(await self.redis.get(f"catalog-version:{namespace}") or 0)
+
+    async def bump_version(self, namespace: str):
+        await self.redis.incr(f"catalog-version:{namespace}")
+
+
+def encode_entry(etag: str, next_cursor: str | None, body: bytes):
+    return f"{etag} {next_cursor or '-'}\n".encode() + body
+
+
+def decode_entry(entry: bytes):
+    head, _, body = entry.partition(b"\n")
+    etag, next_cursor = head.decode().split(" ")
+    return etag, None if next_cursor == "-" else next_cursor, body
+
+
+def etag_matches(header: str, etag: str):
+    tags = [tag.strip().removeprefix("W/") for tag in header.split(",")]
+    return "*" in tags or etag in tags
+
+
+class CatalogCache:
+    def __init__(self, backend: CatalogCacheBackend | None):
+        self.backend = backend
+
+    def request_key(self, request: Request):
+        query = urlencode(sorted(request.query_params.multi_items()))
+        return hashlib.sha1(query.encode(), usedforsecurity=False).hexdigest()
+
+    async def respond(self, request: Request, namespace: str, build: Callable[[], Awaitable[Response]]):
+        # build() makes the uncached response (a page_response), only 200 responses are stored
+        entry = None
+        key = None
+        if self.backend:
+            try:
+                version = await self.backend.get_version(namespace)
+                key = f"{namespace}:{version}:{self.request_key(request)}"
+                entry = await self.backend.get(key)
+            except Exception as e:
+                logging.warning(f"Catalog cache unavailable: {e}")
+                key = None
+
+        if entry is None:
+            response = await build()
+            if response.status_code != 200:
+                return response
+            body = bytes(response.body)
+            etag = f'"{hashlib.md5(body, usedforsecurity=False).hexdigest()}"'
+            entry = encode_entry(etag, response.headers.get("x-next-cursor"), body)
+            if self.backend and key:
+                try:
+                    await self.backend.set(key, entry)
+                except Exception as e:
+                    logging.warning(f"Catalog cache unavailable: {e}")
+
+        etag, next_cursor, body = decode_entry(entry)
+        # clients may keep the page but have to revalidate it, a 304 then costs no serialization at all
+        headers = {"etag": etag, "cache-control": "no-cache"}
+        if next_cursor:
+            headers["X-Next-Cursor"] = next_cursor
+        if_none_match = request.headers.get("if-none-match")
+        if if_none_match and etag_matches(if_none_match, etag):
+            return Response(status_code=304, headers=headers)
+        return Response(body, media_type="application/json", headers=headers)
+
+    async def refresh_versions(self):
+        if not self.backend:
+            return
+        try:
+            await self.backend.refresh_versions()
+        except Exception as e:
+            logging.warning(f"Catalog cache unavailable: {e}")
+
+    async def invalidate(self, *namespaces: str):
+        if not self.backend:
+            return
+        for namespace in namespaces:
+            try:
+                await self.backend.bump_version(namespace)
+            except Exception as e:
+                logging.warning(f"Catalog cache invalidation of {namespace} failed: {e}")
+
+    def invalidate_after_commit(self, session: AsyncSession, *namespaces: str):
+        # never before the commit, a read in between would cache the old rows under the new version
+        after_commit_async(session, lambda: self.invalidate(*namespaces))
+
+
+def create_backend():
+    if Config.CATALOG_CACHE_BACKEND == "redis":
+        return RedisCacheBackend(Config.CATALOG_CACHE_REDIS_URL)
+    if Config.CATALOG_CACHE_BACKEND == "memory":
+        return MemoryCacheBackend()
+    return None  # "none", caching disabled
+
+
+catalog_cache = CatalogCache(create_backend())
+
+
+async def refresh_catalog_cache_versions():
+    # background task of every worker, started with the app
+    while True:
+        await asyncio.sleep(Config.CATALOG_CACHE_VERSION_REFRESH)
+        await catalog_cache.refresh_versions()
@@ -0,0 +1,65 @@
+import argparse
+import asyncio
+import sys
+from pathlib import Path
+from src.catalog_io.formats import format_of, read_records
+from src.catalog_io.schemas import CatalogFormat, CatalogKind
+from src.catalog_io.service import CatalogIOService
+from src.db.main import async_session_factory, run_after_commit_async
+
+# Catalog import / export from the command line, straight against the database in DATABASE_URL
+# usage (from the fast-api-server directory):
+#   python -m src.catalog_io import dishes dishes.csv
+#   python -m src.catalog_io export caterings caterings.ndjson   (- writes to stdout)
+# running servers pick the imported rows up in their search index and price caches after the TTLs
+
+CHUNK_SIZE = 64 * 1024
+
+catalog_io_service = CatalogIOService()
+
+
+async def read_file(path: Path):
+    with path.open("rb") as file:
+        while chunk := file.read(CHUNK_SIZE):
+            yield chunk
+
+
+async def import_file(kind: CatalogKind, path: Path, format: CatalogFormat):
+    async with async_session_factory() as session:
+        result = await catalog_io_service.import_rows(kind, read_records(read_file(path), format), session)
+        await session.commit()
+        await run_after_commit_async(session)  # shared (redis) catalog cache
+    for error in result.errors:
+        print(f"row {error.row}: {'; '.join(error.errors)}", file=sys.stderr)
+    print(f"imported {result.imported} {kind.value}, {result.failed} failed")
+    return 1 if result.failed else 0
+
+
+async def export_file(kind: CatalogKind, path: str, format: CatalogFormat):
+    output = sys.stdout.buffer if path == "-" else open(path, "wb")
+    try:
+        async for chunk in catalog_io_service.export_rows(kind, format):
+            output.write(chunk)
+    finally:
+        if output is not sys.stdout.buffer:
+            output.close()
+    return 0
+
+
+def main():
+    parser = argparse.ArgumentParser(prog="python -m src.catalog_io")
+    parser.add_argument("command", choices=["import", "export"])
+    parser.add_argument("kind", choices=[kind.value for kind in CatalogKind])
+    parser.add_argument("file")
+    parser.add_argument("--format", choices=[format.value for format in CatalogFormat],
+                        help="defaults to the file extension (.ndjson/.jsonl or csv)")
+    args = parser.parse_args()
+    kind = CatalogKind(args.kind)
+    format = CatalogFormat(args.format) if args.format else format_of(None, args.file if args.file != "-" else None)
+    if args.command == "import":
+        return asyncio.run(import_file(kind, Path(args.file), format))
+    return asyncio.run(export_file(kind, args.file, format))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,155 @@
+import codecs
+import csv
+import io
+import json
+from datetime import date, datetime
+from enum import Enum
+from typing import Any, AsyncIterator, Sequence
+from uuid import UUID
+from fastapi import HTTPException, status
+from pydantic_core import to_json
+from src.catalog_io.schemas import CatalogFormat
+
+# Streaming CSV / NDJSON for the catalog imports and exports:
+# input is parsed record by record as the chunks arrive, output is encoded one batch of rows at a time,
+# so neither side ever holds the whole file
+
+MEDIA_TYPES = {CatalogFormat.csv: "text/csv", CatalogFormat.ndjson: "application/x-ndjson"}
+
+
+def bad_request(detail: str):
+    return HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=detail)
+
+
+def format_of(content_type: str | None, filename: str | None = None):
+    # the import format when none is given, from the file extension or the request's content type
+    if filename:
+        return CatalogFormat.ndjson if filename.endswith((".ndjson", ".jsonl", ".json")) else CatalogFormat.csv
+    return CatalogFormat.ndjson if content_type and "json" in content_type else CatalogFormat.csv
+
+
+async def read_lines(chunks: AsyncIterator[bytes]):
+    decoder = codecs.getincrementaldecoder("utf-8-sig")()  # spreadsheets like to start CSVs with a BOM
+    buffer = ""
+    try:
+        async for chunk in chunks:
+            buffer += decoder.decode(chunk)
+            *lines, buffer = buffer.split("\n")
+            for line in lines:
+                yield line.removesuffix("\r")
+        buffer += decoder.decode(b"", final=True)
+    except UnicodeDecodeError:
+        raise bad_request("The file has to be UTF-8 encoded")
+    if buffer:
+        yield buffer.removesuffix("\r")
+
+
+async def read_records(chunks: AsyncIterator[bytes], format: CatalogFormat):
+    # yields (row, record, error) for every non-empty row, exactly one of record and error is set
+    reader = read_csv if format == CatalogFormat.csv else read_ndjson
+    async for row in reader(read_lines(chunks)):
+        yield row
+
+
+async def read_ndjson(lines: AsyncIterator[str]):
+    row = 0
+    async for line in lines:
+        if not line.strip():
+            continue
+        row += 1
+        try:
+            record = json.loads(line)
+        except ValueError as e:
+            yield row, None, f"Invalid JSON: {e}"
+            continue
+        if isinstance(record, dict):
+            yield row, record, None
+        else:
+            yield row, None, "Expected a JSON object"
+
+
+def ends_in_quoted_field(line: str, quoted: bool):
+    # whether a CSV record goes on past this line, following the quotes the way the csv module reads them:
+    # a quote only opens a quoted field at the start of a field (elsewhere it is part of the value),
+    # inside one "" is a quote and any other " closes it
+    if not quoted and '"' not in line:
+        return False
+    state = "quoted" if quoted else "start"
+    for char in line:
+        if state == "quoted":
+            if char == '"':
+                state = "quote"  # the end of the field, or the first half of ""
+        elif char == ",":
+            state = "start"
+        elif char == '"' and state in ("start", "quote"):
+            state = "quoted"
+        else:
+            state = "field"
+    return state == "quoted"
+
+
+async def read_csv(lines: AsyncIterator[str]):
+    header: list[str] | None = None
+    row = 0
+    pending: list[str] = []
+    quoted = False
+    async for line in lines:
+        # a quoted field with line breaks goes on until it is closed
+        pending.append(line)
+        quoted = ends_in_quoted_field(line, quoted)
+        if quoted:
+            continue
+        text = "\n".join(pending)
+        pending = []
+        if not text.strip():
+            continue
+        try:
+            values = next(csv.reader([text]))
+        except csv.Error as e:
+            values, error = None, f"Invalid CSV: {e}"
+        if header is None:
+            if values is None:
+                raise bad_request(f"Invalid CSV header: {error}")
+            header = [name.strip() for name in values]
+            continue
+        row += 1
+        if values is None:
+            yield row, None, error
+        elif len(values) != len(header):
+            yield row, None, f"Expected {len(header)} columns, got {len(values)}"
+        else:
+            # empty cells are missing values
+            yield row, {name: value if value != "" else None for name, value in zip(header, values)}, None
+    if pending:
+        yield row + 1, None, "Invalid CSV: unterminated quoted field"
+
+
+def csv_value(value: Any):
+    if value is None:
+        return ""
+    if isinstance(value, Enum):
+        return value.value
+    if isinstance(value, (date, datetime)):
+        return value.isoformat()
+    if isinstance(value, (list, tuple)):
+        return ",".join(str(item) for item in value)
+    if isinstance(value, UUID):
+        return str(value)
+    return value
+
+
+def encode_header(names: Sequence[str], format: CatalogFormat):
+    if format != CatalogFormat.csv:
+        return b""
+    buffer = io.StringIO()
+    csv.writer(buffer, lineterminator="\n").writerow(names)
+    return buffer.getvalue().encode()
+
+
+def encode_rows(names: Sequence[str], rows: Sequence[Sequence[Any]], format: CatalogFormat):
+    if format == CatalogFormat.csv:
+        buffer = io.StringIO()
+        writer = csv.writer(buffer, lineterminator="\n")
+        writer.writerows([csv_value(value) for value in row] for row in rows)
+        return buffer.getvalue().encode()
+    return b"".join(to_json(dict(zip(names, row))) + b"\n" for row in rows)
@@ -0,0 +1,44 @@
+from fastapi import APIRouter, Depends, HTTPException, Request, status
+from fastapi.responses import StreamingResponse
+from sqlmodel.ext.asyncio.session import AsyncSession
+from src.db.main import get_unit_of_work
+from src.users.schemas import UserModel
+from src.users.JWTAuthMiddleware import JWTAuthMiddleware
+from src.catalog_io.formats import MEDIA_TYPES, format_of, read_records
+from src.catalog_io.schemas import CatalogFormat, CatalogKind, ImportResultModel
+from src.catalog_io.service import CatalogIOService
+
+catalog_io_router = APIRouter(prefix="/catalog")
+catalog_io_service = CatalogIOService()
+
+
+def require_admin(user: UserModel):
+    if not user.is_admin:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN, detail="Admin access required"
+        )
+
+
+# Import a CSV (header row first) or NDJSON file sent as the request body, parsed while it is uploaded
+# eg: curl --data-binary @dishes.csv -H "Content-Type: text/csv" /catalog/dishes/import
+# the valid rows are imported (all in one transaction), the invalid ones are reported by row number
+@catalog_io_router.post("/{kind}/import", response_model=ImportResultModel, status_code=status.HTTP_200_OK)
+async def import_catalog(
+    kind: CatalogKind,
+    request: Request,
+    format: CatalogFormat | None = None,
+    user: UserModel = Depends(JWTAuthMiddleware),
+    session: AsyncSession = Depends(get_unit_of_work),
+):
+    require_admin(user)
+    format = format or format_of(request.headers.get("content-type"))
+    return await catalog_io_service.import_rows(kind, read_records(request.stream(), format), session)
+
+
+# Stream a whole catalog table as CSV or NDJSON, in the columns the import takes
+@catalog_io_router.get("/{kind}/export", status_code=status.HTTP_200_OK)
+async def export_catalog(kind: CatalogKind, format: CatalogFormat = CatalogFormat.csv, user: UserModel = Depends(JWTAuthMiddleware)):
+    require_admin(user)
+    return StreamingResponse(
+        catalog_io_service.export_rows(kind, format), media_type=MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="{kind.value}.{format.value}"'})
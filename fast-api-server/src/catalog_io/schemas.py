@@ -0,0 +1,73 @@
+import uuid
+from enum import Enum
+from pydantic import BaseModel, Field, field_validator
+from src.venues.schemas import CreateVenueModel
+from src.caterings.schemas import CreateCateringModel, CreateDishModel
+from src.cars.schemas import CreateCarModel
+from src.decorations.schemas import CreateDecorationModel
+from src.promos.schemas import CreatePromoModel
+
+
+class CatalogKind(str, Enum):
+    venues = "venues"
+    caterings = "caterings"
+    dishes = "dishes"
+    cars = "cars"
+    decorations = "decorations"
+    promos = "promos"
+
+
+class CatalogFormat(str, Enum):
+    csv = "csv"
+    ndjson = "ndjson"
+
+
+# Imported rows are validated like the create forms, a row with an id updates that row
+# (so an export can be edited and imported again), a row without one is added
+
+class VenueImportModel(CreateVenueModel):
+    venue_id: uuid.UUID | None = None
+    venue_image: str | None = None
+
+
+class CateringImportModel(CreateCateringModel):
+    catering_id: uuid.UUID | None = None
+    # the catering's whole menu (comma separated in CSV), the menu is left as it is without it
+    dish_ids: list[uuid.UUID] | None = None
+
+    @field_validator("dish_ids", mode="before")
+    def split_dish_ids(cls, value):
+        if isinstance(value, str):
+            return [dish_id.strip() for dish_id in value.split(",") if dish_id.strip()]
+        return value
+
+
+class DishImportModel(CreateDishModel):
+    dish_id: uuid.UUID | None = None
+
+
+class CarImportModel(CreateCarModel):
+    car_id: uuid.UUID | None = None
+    car_image: str | None = None
+    car_quantity: int = Field(ge=0, default=0)
+
+
+class DecorationImportModel(CreateDecorationModel):
+    decoration_id: uuid.UUID | None = None
+    decoration_image: str | None = None
+
+
+class PromoImportModel(CreatePromoModel):
+    promo_id: uuid.UUID | None = None
+
+
+class ImportErrorModel(BaseModel):
+    row: int  # 1 based, not counting the CSV header
+    errors: list[str]
+
+
+class ImportResultModel(BaseModel):
+    imported: int
+    failed: int
+    # the first CATALOG_IMPORT_MAX_ERRORS failed rows, the others are only counted
+    errors: list[ImportErrorModel]
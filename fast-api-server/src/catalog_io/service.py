@@ -0,0 +1,202 @@
+from types import SimpleNamespace
+from typing import Any, AsyncIterator, Callable, NamedTuple
+from uuid import UUID, uuid4
+from pydantic import BaseModel, ValidationError
+from sqlalchemy import delete, func, text
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.exc import DBAPIError
+from sqlmodel import SQLModel, select
+from sqlmodel.ext.asyncio.session import AsyncSession
+from src.catalog_cache import catalog_cache
+from src.catalog_io.formats import encode_header, encode_rows
+from src.catalog_io.schemas import (CatalogFormat, CatalogKind, CarImportModel, CateringImportModel, DecorationImportModel,
+                                    DishImportModel, ImportErrorModel, ImportResultModel, PromoImportModel, VenueImportModel)
+from src.config import Config
+from src.db.main import after_commit, async_session_factory
+from src.db.models import Car, Catering, CateringMenuItem, Decoration, Dish, Promo, Venue, VenueRatingSummary
+from src.quotes.prices import component_prices
+from src.search.index import (SearchDocument, car_document, catalog_search_index, catering_document, decoration_document,
+                              dish_document, venue_document)
+from src.utils import acquire_image, delete_image
+
+# Bulk imports and streaming exports of the catalog tables
+# Imports validate every row like the create forms and write the valid ones CATALOG_IMPORT_BATCH_SIZE at a time,
+# each batch one executemany upsert inside a savepoint. When the database rejects a batch (a constraint the
+# validation can't see) it is written again row by row, so only the offending rows fail
+# Exports stream the table through a server side cursor, one batch of rows encoded at a time
+
+
+class CatalogTable(NamedTuple):
+    table: type[SQLModel]
+    row_model: type[BaseModel]
+    pk: str
+    image: str | None
+    document: Callable[[Any], SearchDocument] | None
+    price_kind: str | None  # quote prices that change with these rows
+    namespaces: tuple[str, ...]  # catalog cache namespaces listing these rows
+
+
+CATALOG_TABLES = {
+    CatalogKind.venues: CatalogTable(Venue, VenueImportModel, "venue_id", "venue_image", venue_document,
+                                     "venue", ("venues",)),
+    CatalogKind.caterings: CatalogTable(Catering, CateringImportModel, "catering_id", "catering_image", catering_document,
+                                        "catering", ("caterings",)),
+    CatalogKind.dishes: CatalogTable(Dish, DishImportModel, "dish_id", "dish_image", dish_document,
+                                     "catering", ("dishes", "caterings")),
+    CatalogKind.cars: CatalogTable(Car, CarImportModel, "car_id", "car_image", car_document, "car", ("cars",)),
+    CatalogKind.decorations: CatalogTable(Decoration, DecorationImportModel, "decoration_id", "decoration_image",
+                                          decoration_document, "decoration", ("decorations",)),
+    CatalogKind.promos: CatalogTable(Promo, PromoImportModel, "promo_id", None, None, "promo", ("promos",)),
+}
+
+
+def validation_errors(error: ValidationError):
+    return [f"{'.'.join(map(str, e['loc']))}: {e['msg']}" if e["loc"] else e["msg"] for e in error.errors()]
+
+
+def database_error(error: DBAPIError):
+    # "<class 'asyncpg.exceptions.CheckViolationError'>: new row ... violates ..." -> the message only
+    return str(error.orig).split(">: ", 1)[-1].splitlines()[0]
+
+
+def export_columns(kind: CatalogKind):
+    spec = CATALOG_TABLES[kind]
+    columns: list[Any] = list(spec.table.__table__.columns)  # type: ignore
+    if kind == CatalogKind.caterings:
+        menu = select(func.array_agg(CateringMenuItem.dish_id)).where(
+            CateringMenuItem.catering_id == Catering.catering_id).scalar_subquery()
+        columns.append(func.coalesce(menu, text("'{}'::uuid[]")).label("dish_ids"))
+    return columns
+
+
+class CatalogIOService:
+    async def import_rows(self, kind: CatalogKind, records: AsyncIterator[tuple[int, dict | None, str | None]],
+                          session: AsyncSession):
+        # records come from formats.read_records, written in the caller's transaction
+        spec = CATALOG_TABLES[kind]
+        result = ImportResultModel(imported=0, failed=0, errors=[])
+        written: list[dict[str, Any]] = []
+        batch: list[tuple[int, BaseModel]] = []
+        async for row, record, error in records:
+            if record is not None:
+                try:
+                    batch.append((row, spec.row_model.model_validate(record)))
+                except ValidationError as e:
+                    self._fail(result, row, validation_errors(e))
+            else:
+                self._fail(result, row, [error or "Invalid row"])
+            if len(batch) >= Config.CATALOG_IMPORT_BATCH_SIZE:
+                written += await self._import_batch(kind, batch, result, session)
+                batch = []
+        if batch:
+            written += await self._import_batch(kind, batch, result, session)
+        result.imported = len(written)
+
+        if written:
+            if spec.document:
+                documents = [spec.document(SimpleNamespace(**values)) for values in written]
+                after_commit(session, lambda: catalog_search_index.put_many(documents))
+            if spec.price_kind:
+                after_commit(session, lambda: component_prices.invalidate_kind(spec.price_kind))
+            catalog_cache.invalidate_after_commit(session, *spec.namespaces)
+        return result
+
+    def _fail(self, result: ImportResultModel, row: int, errors: list[str]):
+        result.failed += 1
+        if len(result.errors) < Config.CATALOG_IMPORT_MAX_ERRORS:
+            result.errors.append(ImportErrorModel(row=row, errors=errors))
+
+    async def _import_batch(self, kind: CatalogKind, batch: list[tuple[int, BaseModel]], result: ImportResultModel,
+                            session: AsyncSession):
+        spec = CATALOG_TABLES[kind]
+        rows = []
+        for row, item in batch:
+            values = item.model_dump()
+            values[spec.pk] = values[spec.pk] or uuid4()
+            rows.append((row, values))
+        if kind == CatalogKind.caterings:
+            rows = await self._check_menus(rows, result, session)
+        if not rows:
+            return []
+        try:
+            async with session.begin_nested():
+                await self._write(kind, [values for _, values in rows], session)
+            return [values for _, values in rows]
+        except DBAPIError:
+            pass
+        # somewhere in the batch is a row the database refuses, find it
+        written = []
+        for row, values in rows:
+            try:
+                async with session.begin_nested():
+                    await self._write(kind, [values], session)
+                written.append(values)
+            except DBAPIError as e:
+                self._fail(result, row, [database_error(e)])
+        return written
+
+    async def _check_menus(self, rows: list[tuple[int, dict[str, Any]]], result: ImportResultModel, session: AsyncSession):
+        # menus may only name existing dishes, one query for the whole batch
+        dish_ids = {dish_id for _, values in rows for dish_id in values["dish_ids"] or []}
+        existing: set[UUID] = set()
+        if dish_ids:
+            found = await session.exec(select(Dish.dish_id).where(Dish.dish_id.in_(dish_ids)))  # type: ignore
+            existing = set(found.all())
+        checked = []
+        for row, values in rows:
+            missing = [str(dish_id) for dish_id in values["dish_ids"] or [] if dish_id not in existing]
+            if missing:
+                self._fail(result, row, [f"dish_ids: Dish not found: {', '.join(missing)}"])
+            else:
+                checked.append((row, values))
+        return checked
+
+    async def _write(self, kind: CatalogKind, rows: list[dict[str, Any]], session: AsyncSession):
+        spec = CATALOG_TABLES[kind]
+        table: Any = spec.table
+        pk = getattr(table, spec.pk)
+        ids = [values[spec.pk] for values in rows]
+        old_images: dict[UUID, str | None] = {}
+        if spec.image:
+            found = await session.exec(select(pk, getattr(table, spec.image)).where(pk.in_(ids)))
+            old_images = dict(found.all())  # type: ignore
+
+        columns = [name for name in table.__table__.columns.keys()]
+        params = [{name: values[name] for name in columns} for values in rows]
+        statement = insert(table)
+        statement = statement.on_conflict_do_update(index_elements=[spec.pk], set_={
+            name: statement.excluded[name] for name in columns if name != spec.pk})
+        await session.exec(statement, params=params)  # type: ignore
+
+        if spec.image:
+            # the same image references as creating and deleting the rows one by one
+            for values in rows:
+                image, old_image = values[spec.image], old_images.get(values[spec.pk])
+                if image != old_image:
+                    await acquire_image(image, session)
+                    await delete_image(old_image, session)
+        if kind == CatalogKind.venues:
+            await session.exec(insert(VenueRatingSummary).on_conflict_do_nothing(),  # type: ignore
+                               params=[{"venue_id": venue_id} for venue_id in ids])
+        if kind == CatalogKind.caterings:
+            menus = {values["catering_id"]: values["dish_ids"] for values in rows if values["dish_ids"] is not None}
+            if menus:
+                await session.exec(delete(CateringMenuItem).where(  # type: ignore
+                    CateringMenuItem.catering_id.in_(menus)))  # type: ignore
+                items = [{"catering_id": catering_id, "dish_id": dish_id}
+                         for catering_id, dish_ids in menus.items() for dish_id in dict.fromkeys(dish_ids)]
+                if items:
+                    await session.exec(insert(CateringMenuItem), params=items)  # type: ignore
+
+    async def export_rows(self, kind: CatalogKind, format: CatalogFormat):
+        # an async iterator of encoded chunks, with a session of its own since it runs while the response is sent
+        spec = CATALOG_TABLES[kind]
+        columns = export_columns(kind)
+        names = [column.key for column in columns]
+        query = select(*columns).order_by(getattr(spec.table, spec.pk)).execution_options(
+            yield_per=Config.CATALOG_EXPORT_BATCH_SIZE)
+        yield encode_header(names, format)
+        async with async_session_factory() as session:
+            result = await session.stream(query)
+            async for rows in result.partitions():
+                yield encode_rows(names, rows, format)
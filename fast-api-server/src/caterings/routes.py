@@ -1,15 +1,17 @@
-from fastapi import APIRouter, Depends, File, Form, HTTPException, UploadFile, status
+from fastapi import APIRouter, Depends, File, Form, HTTPException, UploadFile, status, Request
 from pyparsing import C
 from sqlmodel.ext.asyncio.session import AsyncSession
-from src.db.main import get_session
+from src.db.main import get_session, get_unit_of_work
 from uuid import UUID
 from src.caterings.service import CateringService
-from src.caterings.schemas import CateringModel, CreateCateringModel, DishModel, CreateDishModel, CateringMenuItemModel
+from src.caterings.schemas import CateringModel, CreateCateringModel, DishModel, CreateDishModel, CateringMenuItemModel, DishFilterModel
 from src.users.JWTAuthMiddleware import JWTAuthMiddleware
 from src.users.schemas import UserModel
 from src.utils import upload_image
 from src.config import Config
 from src.db.models import DishType
+from src.pagination import PageParams, page_response
+from src.catalog_cache import catalog_cache
 
 catering_router = APIRouter(prefix="/caterings")
 catering_service = CateringService()
@@ -17,17 +19,21 @@ catering_service = CateringService()
 
 # Get all caterings along with their menu items
 @catering_router.get("/", response_model=list[CateringModel], status_code=status.HTTP_200_OK)
-async def get_all_caterings(session: AsyncSession = Depends(get_session)):
-    caterings = await catering_service.get_all_caterings(session)
-    return caterings
+async def get_all_caterings(request: Request, page: PageParams = Depends(), session: AsyncSession = Depends(get_session)):
+    async def build():
+        caterings, next_cursor = await catering_service.get_all_caterings(page, session)
+        return page_response(caterings, next_cursor, CateringModel, page)
+    return await catalog_cache.respond(request, "caterings", build)
 
 # Get all  dishes
 
 
 @catering_router.get("/dishes", response_model=list[DishModel], status_code=status.HTTP_200_OK)
-async def get_all_dishes(session: AsyncSession = Depends(get_session)):
-    dishes = await catering_service.get_all_dishes(session)
-    return dishes
+async def get_all_dishes(request: Request, page: PageParams = Depends(), filters: DishFilterModel = Depends(), session: AsyncSession = Depends(get_session)):
+    async def build():
+        dishes, next_cursor = await catering_service.get_all_dishes(page, filters, session)
+        return page_response(dishes, next_cursor, DishModel, page)
+    return await catalog_cache.respond(request, "dishes", build)
 
 # Get dish
 
@@ -48,7 +54,7 @@ async def create_catering(
     catering_description: str = Form(...),
     catering_image: UploadFile | None = File(None),  # Handle image file upload
     user: UserModel = Depends(JWTAuthMiddleware),
-    session: AsyncSession = Depends(get_session),
+    session: AsyncSession = Depends(get_unit_of_work),
 ):
     if not user.is_admin:
         raise HTTPException(
@@ -69,7 +75,7 @@ async def create_catering(
 
 # Delete a catering
 @catering_router.delete("/{catering_id}",  status_code=status.HTTP_204_NO_CONTENT)
-async def delete_catering(catering_id: UUID, user: UserModel = Depends(JWTAuthMiddleware), session: AsyncSession = Depends(get_session)):
+async def delete_catering(catering_id: UUID, user: UserModel = Depends(JWTAuthMiddleware), session: AsyncSession = Depends(get_unit_of_work)):
     if (not user.is_admin):
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN, detail="Admin access required")
@@ -91,7 +97,7 @@ async def create_dish(dish_name: str = Form(...),
                       # Handle image file upload
                       dish_image: UploadFile | None = File(None),
                       user: UserModel = Depends(JWTAuthMiddleware),
-                      session: AsyncSession = Depends(get_session),):
+                      session: AsyncSession = Depends(get_unit_of_work),):
     if not user.is_admin:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN, detail="Admin access required"
@@ -113,7 +119,7 @@ async def create_dish(dish_name: str = Form(...),
 
 # Delete a dish
 @catering_router.delete("/dishes/{dish_id}", status_code=status.HTTP_204_NO_CONTENT)
-async def delete_dish(dish_id: UUID, user: UserModel = Depends(JWTAuthMiddleware), session: AsyncSession = Depends(get_session)):
+async def delete_dish(dish_id: UUID, user: UserModel = Depends(JWTAuthMiddleware), session: AsyncSession = Depends(get_unit_of_work)):
     if (not user.is_admin):
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN, detail="Admin access required")
@@ -126,7 +132,7 @@ async def delete_dish(dish_id: UUID, user: UserModel = Depends(JWTAuthMiddleware
 
 # Add a dish to a catering
 @catering_router.post("/{catering_id}/dishes/{dish_id}", response_model=CateringMenuItemModel, status_code=status.HTTP_201_CREATED)
-async def add_dish_to_catering(catering_id: UUID,  dish_id: UUID, user: UserModel = Depends(JWTAuthMiddleware),  session: AsyncSession = Depends(get_session)):
+async def add_dish_to_catering(catering_id: UUID,  dish_id: UUID, user: UserModel = Depends(JWTAuthMiddleware),  session: AsyncSession = Depends(get_unit_of_work)):
     if (not user.is_admin):
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN, detail="Admin access required")
@@ -139,7 +145,7 @@ async def add_dish_to_catering(catering_id: UUID,  dish_id: UUID, user: UserMode
 
 # Remove a dish to a catering
 @catering_router.delete("/{catering_id}/dishes/{dish_id}",  status_code=status.HTTP_204_NO_CONTENT)
-async def remove_dish_to_catering(catering_id: UUID,  dish_id: UUID, user: UserModel = Depends(JWTAuthMiddleware),  session: AsyncSession = Depends(get_session)):
+async def remove_dish_to_catering(catering_id: UUID,  dish_id: UUID, user: UserModel = Depends(JWTAuthMiddleware),  session: AsyncSession = Depends(get_unit_of_work)):
     if (not user.is_admin):
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN, detail="Admin access required")
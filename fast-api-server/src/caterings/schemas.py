@@ -1,6 +1,6 @@
 from pydantic import BaseModel, Field
 import uuid
-from src.db.models import Booking, CateringMenuItem, DishType
+from src.db.models import CateringMenuItem, DishType
 
 # Dish Model Schema
 
@@ -23,7 +23,13 @@ class CateringModel(BaseModel):
     catering_description: str
     catering_image: str | None = None
     catering_menu_items: list[CateringMenuItem]
-    bookings: list[Booking]
+    # its bookings are paged from GET /bookings/?catering_id=...
+
+class DishFilterModel(BaseModel):
+    dish_type: DishType | None = None
+    min_cost: int | None = None
+    max_cost: int | None = None
+
 # Create Catering Schema
 
 
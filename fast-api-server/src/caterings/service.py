@@ -1,19 +1,25 @@
 from fastapi import HTTPException, status
 from sqlmodel import select
 from sqlmodel.ext.asyncio.session import AsyncSession
+from src.catalog_cache import BOOKING_NAMESPACES, catalog_cache
+from src.db.main import after_commit, commit
 from src.db.models import Catering, Dish, CateringMenuItem, DishType
-from src.caterings.schemas import CreateCateringModel, CreateDishModel
+from src.caterings.schemas import CreateCateringModel, CreateDishModel, DishFilterModel
 from uuid import UUID
-from src.utils import delete_image
+from src.utils import acquire_image, delete_image
+from src.db.loading import load_profile
+from src.search.index import catalog_search_index, catering_document, dish_document
+from src.quotes.prices import component_prices
+from src.pagination import PageParams, paginate
 
 
 class CateringService:
 
-    async def get_all_caterings(self, session: AsyncSession):
-        query = select(Catering)
-        result = await session.exec(query)
-        caterings = result.all()
-        return caterings
+    async def get_all_caterings(self, page: PageParams, session: AsyncSession):
+        query = select(Catering).options(*load_profile("catering.card"))
+        return await paginate(query, page, session, Catering.catering_id, {
+            "catering_name": Catering.catering_name,
+        })
 
         # can make whatever modifications to the relationship objects ie: catering_menu_items, can pop items from it, can modify it, can add new ones, and all changes will be saved on commit
 
@@ -25,7 +31,8 @@ class CateringService:
         #     return [catering]
 
     async def get_catering(self, catering_id: UUID, session: AsyncSession):
-        query = select(Catering).where(Catering.catering_id == catering_id)
+        query = select(Catering).where(Catering.catering_id == catering_id).options(
+            *load_profile("catering.card"))
         result = await session.exec(query)
         return result.first()
 
@@ -37,48 +44,65 @@ class CateringService:
         new_catering = Catering(**catering_data.model_dump())
 
         session.add(new_catering)
-        await session.commit()
-
-        await session.refresh(new_catering)
-
-        return new_catering
+        await acquire_image(new_catering.catering_image, session)
+        after_commit(session, lambda: catalog_search_index.put(catering_document(new_catering)))
+        catalog_cache.invalidate_after_commit(session, "caterings")
+        await commit(session)
+        return await self.get_catering(new_catering.catering_id, session)
 
     async def delete_catering(self, catering_id: UUID, session: AsyncSession):
         catering = await self.get_catering(catering_id, session)
         if catering:
-            await delete_image(catering.catering_image)
+            await delete_image(catering.catering_image, session)
             await session.delete(catering)
-            await session.commit()
+            after_commit(session, lambda: catalog_search_index.remove("catering", catering_id))
+            after_commit(session, lambda: component_prices.invalidate("catering", catering_id))
+            catalog_cache.invalidate_after_commit(session, "caterings", "dishes", *BOOKING_NAMESPACES)
+            await commit(session)
             return catering
         return None
 
     async def create_dish(self, dish_data: CreateDishModel, session: AsyncSession):
         new_dish = Dish(**dish_data.model_dump())
         session.add(new_dish)
-        await session.commit()
-        await session.refresh(new_dish)
-        return new_dish
+        await acquire_image(new_dish.dish_image, session)
+        after_commit(session, lambda: catalog_search_index.put(dish_document(new_dish)))
+        catalog_cache.invalidate_after_commit(session, "dishes")
+        await commit(session)
+        return await self.get_dish(new_dish.dish_id, session)
 
     async def delete_dish(self, dish_id: UUID, session: AsyncSession):
         dish = await self.get_dish(dish_id, session)
         if dish:
-            await delete_image(dish.dish_image)
+            await delete_image(dish.dish_image, session)
             await session.delete(dish)
-            await session.commit()
+            after_commit(session, lambda: catalog_search_index.remove("dish", dish_id))
+            # the dish may be on any catering's menu
+            after_commit(session, lambda: component_prices.invalidate_kind("catering"))
+            catalog_cache.invalidate_after_commit(session, "dishes", "caterings")
+            await commit(session)
             return dish
         return None
 
     async def get_dish(self, dish_id: UUID, session: AsyncSession):
-        query = select(Dish).where(Dish.dish_id == dish_id)
+        query = select(Dish).where(Dish.dish_id == dish_id).options(
+            *load_profile("dish.card"))
         result = await session.exec(query)
         dish = result.first()
         return dish if dish else None
 
-    async def get_all_dishes(self, session: AsyncSession):
-        query = select(Dish)
-        result = await session.exec(query)
-        dishes = result.all()
-        return dishes
+    async def get_all_dishes(self, page: PageParams, filters: DishFilterModel, session: AsyncSession):
+        query = select(Dish).options(*load_profile("dish.card"))
+        if filters.dish_type is not None:
+            query = query.where(Dish.dish_type == filters.dish_type)
+        if filters.min_cost is not None:
+            query = query.where(Dish.dish_cost_per_serving >= filters.min_cost)
+        if filters.max_cost is not None:
+            query = query.where(Dish.dish_cost_per_serving <= filters.max_cost)
+        return await paginate(query, page, session, Dish.dish_id, {
+            "dish_name": Dish.dish_name,
+            "dish_cost_per_serving": Dish.dish_cost_per_serving,
+        })
 
     async def add_dish_to_catering(self, catering_id: UUID, dish_id: UUID, session: AsyncSession):
         catering = await self.get_catering(catering_id, session)
@@ -96,7 +120,9 @@ class CateringService:
             catering_menu_item = CateringMenuItem(
                 catering_id=catering_id, dish_id=dish_id)
             session.add(catering_menu_item)
-            await session.commit()
+            after_commit(session, lambda: component_prices.invalidate("catering", catering_id))
+            catalog_cache.invalidate_after_commit(session, "caterings", "dishes")
+            await commit(session)
             await session.refresh(catering_menu_item)
             return catering_menu_item
         return None
@@ -108,6 +134,8 @@ class CateringService:
         menu_item = result.first()
         if menu_item:
             await session.delete(menu_item)
-            await session.commit()
+            after_commit(session, lambda: component_prices.invalidate("catering", catering_id))
+            catalog_cache.invalidate_after_commit(session, "caterings", "dishes")
+            await commit(session)
             return menu_item
         return None
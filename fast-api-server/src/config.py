@@ -3,11 +3,80 @@ from pydantic_settings import BaseSettings, SettingsConfigDict
 
 class Settings(BaseSettings):
     DATABASE_URL: str = "default"   # to counter type error below
+    DB_POOL_SIZE: int = 5
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_TIMEOUT: float = 30  # seconds to wait for a connection before giving up
+    DB_POOL_RECYCLE: int = 1800  # seconds after which a pooled connection is replaced
+    DB_POOL_PRE_PING: bool = True
+    DB_STATEMENT_TIMEOUT_MS: int = 0  # 0 = no statement timeout
+    DB_PREPARED_STATEMENT_CACHE_SIZE: int = 100  # asyncpg, 0 disables it (eg: behind pgbouncer)
     JWT_SECRET: str = "default"
     JWT_ALGORITHM: str = "default"
     ACCESS_TOKEN_EXPIRY: str = "3600"
+    BCRYPT_ROUNDS: int = 12  # existing hashes with a different cost are rehashed on login
+    PASSWORD_HASH_WORKERS: int = 4  # max concurrent bcrypt hashes/verifications
+    PRINCIPAL_CACHE_SIZE: int = 10000  # authenticated users kept in memory by JWTAuthMiddleware
+    PRINCIPAL_CACHE_TTL: int = 60  # seconds
+    # build the authenticated user from the token's signed claims (username, email, is_admin) without
+    # touching the database, an admin flag change then only applies once the user's token is reissued
+    JWT_TRUST_CLAIMS: bool = False
     SERVER_BASE_URL: str = "http://localhost:8000"
     CLIENT_BASE_URL: str = "http://localhost:5173"
+    AVAILABILITY_INDEX_TTL: int = 60  # seconds before the venue availability index is reloaded
+    AVAILABILITY_MAX_DAYS: int = 366  # widest from/to range served by the availability endpoints
+    SEARCH_INDEX_TTL: int = 300  # seconds before the search index is rebuilt from the database
+    SEARCH_PRICE_BANDS: list[int] = [100, 500, 1000, 5000]  # price_band facet values: 0-99, 100-499, ..., 5000+
+    SEARCH_CAPACITY_BUCKETS: list[int] = [50, 100, 250, 500]  # capacity facet values: 0-49, 50-99, ..., 500+
+    CAR_RESERVATION_MAX_BATCH: int = 100  # cars reserved by one POST /cars/reservations/{booking_id}
+    HOLD_MINUTES: int = 15  # how long POST /holds/ sets a venue day (and cars) aside when no minutes are given
+    HOLD_MAX_MINUTES: int = 60
+    HOLD_MAX_PER_USER: int = 3  # holds a customer can have at once, not counting those already booked
+    HOLD_SWEEP_INTERVAL: int = 30  # seconds between deletions of expired holds, whose cars stay counted until then
+    HOLD_SWEEP_BATCH_SIZE: int = 1000  # expired holds deleted per statement
+    QUOTE_MAX_BATCH: int = 1000  # packages priced by one POST /quotes/batch
+    QUOTE_PRICE_CACHE_SIZE: int = 10000  # component prices kept in memory for quotes
+    QUOTE_PRICE_CACHE_TTL: int = 60  # seconds
+    LOYALTY_DISCOUNT: float = 0.05  # added to the promo discount of recurring customers
+    LOYALTY_MIN_BOOKINGS: int = 2  # earlier bookings a customer needs for the loyalty discount
+    CATALOG_IMPORT_BATCH_SIZE: int = 1000  # rows written per executemany by the catalog imports
+    CATALOG_IMPORT_MAX_ERRORS: int = 1000  # failed rows listed in an import result, the rest are only counted
+    CATALOG_EXPORT_BATCH_SIZE: int = 1000  # rows fetched and encoded at a time by the catalog exports
+    SLOW_REQUEST_MS: int = 1000  # requests slower than this are logged as slow_request records
+    SLOW_REQUEST_STATEMENTS: int = 50  # so are requests running at least this many SQL statements
+    METRICS_TOKEN: str = ""  # bearer token for scraping GET /metrics, empty = admins only
+    PROFILER_ENABLED: bool = False  # admins can sample stacks with GET /internal/profile
+    PROFILER_INTERVAL_MS: float = 5  # between two stack samples
+    PROFILER_MAX_SECONDS: int = 60  # longest profile, also the longest wait for the requests of a route
+    PROFILER_MAX_REQUESTS: int = 100  # most requests profiled by one GET /internal/profile/requests
+    PAGE_DEFAULT_LIMIT: int = 100  # page size of list endpoints when no limit is given
+    PAGE_MAX_LIMIT: int = 500
+    # "fast" builds list responses straight from the loaded rows, "validate" runs every row through its response model
+    RESPONSE_SERIALIZATION: str = "fast"
+    MAX_IMAGE_UPLOAD_BYTES: int = 10 * 1024 * 1024
+    IMAGE_UPLOAD_CHUNK_SIZE: int = 1024 * 1024
+    # room for the other form fields and the multipart boundaries of an image upload request
+    IMAGE_UPLOAD_FORM_OVERHEAD: int = 64 * 1024
+    IMAGE_STORAGE_BACKEND: str = "local"  # "local" (directories below) or "s3"
+    IMAGE_STORAGE_DIR: str = "images"  # uploaded images, local backend
+    IMAGE_RENDITION_DIR: str = "image_renditions"  # derivative cache of resized WebP renditions, local backend
+    IMAGE_S3_BUCKET: str = ""
+    IMAGE_S3_PREFIX: str = ""  # originals go under <prefix>images/, renditions under <prefix>renditions/
+    IMAGE_S3_ENDPOINT_URL: str = ""  # set for S3 compatible services (MinIO, a local moto server, ...)
+    IMAGE_S3_REGION: str = ""
+    IMAGE_S3_ACCESS_KEY_ID: str = ""  # empty = boto3's default credential chain
+    IMAGE_S3_SECRET_ACCESS_KEY: str = ""
+    IMAGE_RENDITION_QUALITY: int = 80
+    IMAGE_CACHE_MAX_AGE: int = 31536000  # seconds, image responses are sent as immutable
+    IMAGE_CACHE_MAX_BYTES: int = 64 * 1024 * 1024  # in-memory cache of hot images
+    IMAGE_CACHE_MAX_FILE_BYTES: int = 256 * 1024  # larger images are always read from storage
+    # cache of the public list endpoints: "memory" (pages per worker, invalidated for all workers through
+    # the catalog_cache_version table, which each worker reloads every CATALOG_CACHE_VERSION_REFRESH
+    # seconds), "redis" (pages and versions in Redis, a change is seen by every worker at once) or "none"
+    CATALOG_CACHE_BACKEND: str = "memory"
+    CATALOG_CACHE_REDIS_URL: str = "redis://localhost:6379/0"
+    CATALOG_CACHE_SIZE: int = 1024  # pages kept by the memory backend
+    CATALOG_CACHE_TTL: int = 300  # seconds
+    CATALOG_CACHE_VERSION_REFRESH: float = 1  # seconds the other workers' changes may stay unseen (memory backend)
     # REDIS_URL: str = "redis://localhost:6379/0"
     # MAIL_USERNAME: str
     # MAIL_PASSWORD: str
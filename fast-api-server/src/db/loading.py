@@ -0,0 +1,48 @@
+from sqlalchemy.orm import joinedload, selectinload
+from src.db.models import Booking, Car, Catering, Dish, Venue, VenueReview
+
+# Named relationship loading profiles
+# Relationships are declared with lazy="raise_on_sql" in models.py, so every query
+# states what it needs here, each profile loads exactly what its response model serializes
+
+LOADING_PROFILES = {
+    # VenueModel: venue + its rating summary, the reviews themselves are paged from /venues/reviews/{venue_id}
+    "venue.card": [
+        joinedload(Venue.venue_rating_summary),  # type: ignore
+    ],
+    "venue.detail": [
+        joinedload(Venue.venue_rating_summary),  # type: ignore
+    ],
+    # VenueReviewModel
+    "venue_review.full": [
+        joinedload(VenueReview.user),  # type: ignore
+    ],
+    # BookingModel: every relationship, one joined select + one selectin for car_reservations
+    "booking.full": [
+        joinedload(Booking.user),  # type: ignore
+        joinedload(Booking.venue),  # type: ignore
+        joinedload(Booking.payment),  # type: ignore
+        joinedload(Booking.catering),  # type: ignore
+        joinedload(Booking.decoration),  # type: ignore
+        joinedload(Booking.promo),  # type: ignore
+        selectinload(Booking.car_reservations),  # type: ignore
+    ],
+    # CarModel
+    "car.card": [
+        selectinload(Car.car_reservations),  # type: ignore
+    ],
+    # CateringModel: menu items
+    "catering.card": [
+        selectinload(Catering.catering_menu_items),  # type: ignore
+    ],
+    # DishModel
+    "dish.card": [
+        selectinload(Dish.catering_menu_items),  # type: ignore
+    ],
+    # DecorationModel: no relationships
+    "decoration.card": [],
+}
+
+
+def load_profile(name: str):
+    return LOADING_PROFILES[name]
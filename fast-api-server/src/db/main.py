@@ -1,11 +1,37 @@
-from sqlalchemy.ext.asyncio import AsyncEngine
-from sqlalchemy.orm import sessionmaker
-from sqlmodel import SQLModel, create_engine
+from typing import Awaitable, Callable
+from fastapi import Depends
+from sqlalchemy import event
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.orm import Session
+from sqlmodel import SQLModel
 from sqlmodel.ext.asyncio.session import AsyncSession
 
 from src.config import Config
+from src.db.pool import InstrumentedQueuePool
 
-async_engine = AsyncEngine(create_engine(url=Config.DATABASE_URL))
+
+def engine_connect_args():
+    if make_url(Config.DATABASE_URL).get_driver_name() != "asyncpg":
+        return {}
+    connect_args: dict[str, object] = {
+        "prepared_statement_cache_size": Config.DB_PREPARED_STATEMENT_CACHE_SIZE}
+    if Config.DB_STATEMENT_TIMEOUT_MS:
+        connect_args["server_settings"] = {
+            "statement_timeout": str(Config.DB_STATEMENT_TIMEOUT_MS)}
+    return connect_args
+
+
+async_engine = create_async_engine(
+    Config.DATABASE_URL,
+    poolclass=InstrumentedQueuePool,
+    pool_size=Config.DB_POOL_SIZE,
+    max_overflow=Config.DB_MAX_OVERFLOW,
+    pool_timeout=Config.DB_POOL_TIMEOUT,
+    pool_recycle=Config.DB_POOL_RECYCLE,
+    pool_pre_ping=Config.DB_POOL_PRE_PING,
+    connect_args=engine_connect_args(),
+)
 
 
 async def init_db() -> None:
@@ -13,10 +39,66 @@ async def init_db() -> None:
         await conn.run_sync(SQLModel.metadata.create_all)
 
 
+# built once, every request session comes from this factory
+async_session_factory = async_sessionmaker(
+    bind=async_engine, class_=AsyncSession, expire_on_commit=False
+)
+
+
 async def get_session() -> AsyncSession:
-    Session = sessionmaker(
-        bind=async_engine, class_=AsyncSession, expire_on_commit=False
-    )
+    async with async_session_factory() as session:
+        yield session
+
 
-    async with Session() as session:
+async def get_unit_of_work(session: AsyncSession = Depends(get_session)) -> AsyncSession:
+    # Same request session (shared with JWTAuthMiddleware), but everything the route does through
+    # the services is committed once, when the route has finished, and rolled back if it raises
+    session.info["unit_of_work"] = True
+    try:
         yield session
+        await session.commit()
+        await run_after_commit_async(session)
+    except Exception:
+        await session.rollback()
+        raise
+    finally:
+        session.info.pop("unit_of_work", None)
+
+
+async def commit(session: AsyncSession):
+    # services call this instead of session.commit(),
+    # inside a unit of work it only flushes and the unit of work commits at the end
+    if session.info.get("unit_of_work"):
+        await session.flush()
+    else:
+        await session.commit()
+        await run_after_commit_async(session)
+
+
+def after_commit(session: AsyncSession, callback: Callable[[], None]):
+    # run callback once the current transaction is actually committed (dropped on rollback),
+    # for in-process state that must not get ahead of the database
+    session.info.setdefault("after_commit", []).append(callback)
+
+
+def after_commit_async(session: AsyncSession, callback: Callable[[], Awaitable[None]]):
+    # same, for callbacks that have to await (eg: a cache on the network),
+    # awaited by commit()/get_unit_of_work right after the commit, before the response is sent
+    session.info.setdefault("after_commit_async", []).append(callback)
+
+
+async def run_after_commit_async(session: AsyncSession):
+    for callback in session.info.pop("after_commit_async", []):
+        await callback()
+
+
+@event.listens_for(Session, "after_commit")
+def run_after_commit_callbacks(session: Session):
+    for callback in session.info.pop("after_commit", []):
+        callback()
+
+
+@event.listens_for(Session, "after_rollback")
+def drop_after_commit_callbacks(session: Session):
+    session.info.pop("after_commit", None)
+    session.info.pop("after_commit_async", None)
@@ -1,7 +1,7 @@
 from enum import Enum
 from typing import Optional
 from sqlmodel import SQLModel, Field, Column, Relationship  # type: ignore
-from datetime import datetime
+from datetime import date, datetime
 import sqlalchemy.dialects.postgresql as pg
 import uuid
 from sqlalchemy import Enum as PgEnum, ForeignKey, CheckConstraint, UniqueConstraint,  text, Index
@@ -64,15 +64,17 @@ class User(SQLModel, table=True):
 
     # one-many relationship with user_contact
     user_contacts: list["UserContact"] = Relationship(back_populates="user", sa_relationship_kwargs={
-                                                      "cascade": "all, delete-orphan", "lazy": "selectin"})
+                                                      "cascade": "all, delete-orphan", "lazy": "raise_on_sql", "passive_deletes": True})
     # one-many relationship with venue_review
     venue_reviews: list["VenueReview"] = Relationship(
-        back_populates="user", sa_relationship_kwargs={"cascade": "all, delete-orphan", "lazy": "selectin"})
+        back_populates="user", sa_relationship_kwargs={"cascade": "all, delete-orphan", "lazy": "raise_on_sql", "passive_deletes": True})
 
     # one-many relationship with booking
     bookings: list["Booking"] = Relationship(
-        back_populates="user", sa_relationship_kwargs={"cascade": "all, delete-orphan", "lazy": "selectin"})
+        back_populates="user", sa_relationship_kwargs={"cascade": "all, delete-orphan", "lazy": "raise_on_sql", "passive_deletes": True})
     # "cascade": "all, delete-orphan" is to delete/modify/add child entities when parent entity's 'child referencing property' is deleted/modified/add
+    # "lazy": "raise_on_sql" means no relationship is ever loaded implicitly, each service method picks a loading profile from src/db/loading.py
+    # "passive_deletes": True leaves deleting children to the ON DELETE CASCADE foreign keys instead of loading them first
     # eg: catering.catering_menu_items[0].dish = Dish(...)
     # eg: catering.catering_menu_items[0].pop(0)
 
@@ -88,7 +90,8 @@ class UserContact(SQLModel, table=True):
     user_id: uuid.UUID = Field(sa_column=Column(pg.UUID, ForeignKey(
         "user.user_id", ondelete="CASCADE"), nullable=False, primary_key=True))
     # ondelete="CASCADE", if user gets deleted, then user_contact also gets deleted
-    user: "User" = Relationship(back_populates="user_contacts")
+    user: "User" = Relationship(
+        back_populates="user_contacts", sa_relationship_kwargs={"lazy": "raise_on_sql"})
 
 
 class Venue(SQLModel, table=True):
@@ -111,12 +114,16 @@ class Venue(SQLModel, table=True):
 
     # one-many relationship with venue_review
     venue_reviews: list["VenueReview"] = Relationship(
-        back_populates="venue", sa_relationship_kwargs={"cascade": "all, delete-orphan", "lazy": "selectin"})
+        back_populates="venue", sa_relationship_kwargs={"cascade": "all, delete-orphan", "lazy": "raise_on_sql", "passive_deletes": True})
     # in list["Type"], Type should be class name not table name(VenueReview, not venue_review)
 
     # one-many relationship with booking
     bookings: list["Booking"] = Relationship(back_populates="venue", sa_relationship_kwargs={
-                                             "cascade": "all, delete-orphan", "lazy": "selectin"})
+                                             "cascade": "all, delete-orphan", "lazy": "raise_on_sql", "passive_deletes": True})
+
+    # one-one relationship with venue_rating_summary
+    venue_rating_summary: Optional["VenueRatingSummary"] = Relationship(back_populates="venue", sa_relationship_kwargs={
+        "cascade": "all, delete-orphan", "lazy": "raise_on_sql", "passive_deletes": True, "uselist": False})
 
     # check constraint for venue_rating
     # check constraint for venue_capacity
@@ -144,15 +151,54 @@ class VenueReview(SQLModel, table=True):
         sa_column=Column(pg.UUID, ForeignKey(
             "venue.venue_id", ondelete="CASCADE"), nullable=False)
     )
-    venue: "Venue" = Relationship(back_populates="venue_reviews")
+    venue: "Venue" = Relationship(
+        back_populates="venue_reviews", sa_relationship_kwargs={"lazy": "raise_on_sql"})
     # one-many relationship with users
     user_id: uuid.UUID = Field(
         sa_column=Column(pg.UUID, ForeignKey(
             "user.user_id", ondelete="CASCADE"), nullable=False)
     )
-    user: "User" = Relationship(back_populates="venue_reviews")
+    user: "User" = Relationship(
+        back_populates="venue_reviews", sa_relationship_kwargs={"lazy": "raise_on_sql"})
+    # venue's reviews are paged newest first
+    __table_args__ = tuple(
+        [CheckConstraint("venue_rating >= 1", name="check_venue_rating"),
+         Index("ix_venue_review_venue_created", "venue_id", "venue_review_created_at")])
+
+
+# Venue rating summary = aggregate of a venue's reviews, kept up to date by VenueService.create_review/delete_review
+# (see venues/ratings.py) so venue cards don't need the reviews themselves
+class VenueRatingSummary(SQLModel, table=True):
+    __tablename__: str = "venue_rating_summary"
+
+    # one-one relationship with venue
+    venue_id: uuid.UUID = Field(sa_column=Column(pg.UUID, ForeignKey(
+        "venue.venue_id", ondelete="CASCADE"), primary_key=True, nullable=False))
+    venue: "Venue" = Relationship(
+        back_populates="venue_rating_summary", sa_relationship_kwargs={"lazy": "raise_on_sql"})
+    rating_count: int = Field(sa_column=Column(
+        pg.INTEGER, nullable=False, default=0))
+    rating_sum: float = Field(sa_column=Column(
+        pg.FLOAT, nullable=False, default=0))
+    # number of reviews per star (ratings rounded to 1..5)
+    rating_1: int = Field(sa_column=Column(pg.INTEGER, nullable=False, default=0))
+    rating_2: int = Field(sa_column=Column(pg.INTEGER, nullable=False, default=0))
+    rating_3: int = Field(sa_column=Column(pg.INTEGER, nullable=False, default=0))
+    rating_4: int = Field(sa_column=Column(pg.INTEGER, nullable=False, default=0))
+    rating_5: int = Field(sa_column=Column(pg.INTEGER, nullable=False, default=0))
+    latest_review_at: datetime | None = Field(
+        sa_column=Column(pg.TIMESTAMP, nullable=True))
+
+    @property
+    def rating_average(self):
+        return self.rating_sum / self.rating_count if self.rating_count else None
+
+    @property
+    def rating_histogram(self):
+        return {1: self.rating_1, 2: self.rating_2, 3: self.rating_3, 4: self.rating_4, 5: self.rating_5}
+
     __table_args__ = tuple(
-        [CheckConstraint("venue_rating >= 1", name="check_venue_rating")])
+        [CheckConstraint("rating_count >= 0", name="check_venue_rating_summary_count")])
 
 
 class Payment(SQLModel, table=True):
@@ -171,7 +217,8 @@ class Payment(SQLModel, table=True):
                          default=PaymentMethod.debit_card)
     )
     # one-one relationship with booking
-    booking: "Booking" = Relationship(back_populates="payment")
+    booking: "Booking" = Relationship(
+        back_populates="payment", sa_relationship_kwargs={"lazy": "raise_on_sql"})
 
     booking_id: uuid.UUID = Field(
         sa_column=Column(pg.UUID, ForeignKey(
@@ -183,7 +230,9 @@ class Payment(SQLModel, table=True):
     __table_args__ = tuple([CheckConstraint(
         "amount_payed >= 0", name="check_payment_amount_payed"), CheckConstraint(
         "total_amount >= 0", name="check_payment_total_amount"), CheckConstraint(
-        "discount >= 0", name="check_payment_discount")])
+        "discount >= 0", name="check_payment_discount"),
+        # the booking's payment, joined into every booking load
+        Index("ix_payment_booking", "booking_id")])
 
 
 class Decoration(SQLModel, table=True):
@@ -204,7 +253,7 @@ class Decoration(SQLModel, table=True):
 
     # one-many relationship with booking
     bookings: list["Booking"] = Relationship(
-        back_populates="decoration", sa_relationship_kwargs={"cascade": "all, delete-orphan", "lazy": "selectin"})
+        back_populates="decoration", sa_relationship_kwargs={"cascade": "all, delete-orphan", "lazy": "raise_on_sql", "passive_deletes": True})
 
     # check constraint for decoration_price
     __table_args__ = tuple([CheckConstraint(
@@ -225,11 +274,12 @@ class Car(SQLModel, table=True):
     car_rental_price: int = Field(
         sa_column=Column(pg.INTEGER,  nullable=False))
     car_image: str = Field(sa_column=Column(pg.VARCHAR(255), nullable=True))
+    # number of these cars owned, what is left on a given day is car_quantity - car_reservation_day.reserved
     car_quantity: int = Field(sa_column=Column(pg.INTEGER, nullable=False))
 
     # one-many relationship with car_reservation
     car_reservations: list["CarReservation"] = Relationship(
-        back_populates="car", sa_relationship_kwargs={"cascade": "all, delete-orphan", "lazy": "selectin"})
+        back_populates="car", sa_relationship_kwargs={"cascade": "all, delete-orphan", "lazy": "raise_on_sql", "passive_deletes": True})
 
     # check constraint for car_rental_price
     # check constraint for car_quantity
@@ -249,11 +299,81 @@ class CarReservation(SQLModel, table=True):
     # one-many relationship with car
     car_id: uuid.UUID = Field(sa_column=Column(
         pg.UUID, ForeignKey("car.car_id", ondelete="CASCADE"), nullable=False))
-    car: "Car" = Relationship(back_populates="car_reservations")
+    car: "Car" = Relationship(
+        back_populates="car_reservations", sa_relationship_kwargs={"lazy": "raise_on_sql"})
     # one-many relationship with booking
     booking_id: uuid.UUID = Field(sa_column=Column(
         pg.UUID, ForeignKey("booking.booking_id", ondelete="CASCADE"), nullable=False))
-    booking: "Booking" = Relationship(back_populates="car_reservations")
+    booking: "Booking" = Relationship(
+        back_populates="car_reservations", sa_relationship_kwargs={"lazy": "raise_on_sql"})
+    # the booking's event day, copied so the car_reservation triggers know which day to count
+    # (booking_event_date changes are copied over by the booking_event_day_trigger)
+    reservation_day: date = Field(sa_column=Column(pg.DATE, nullable=False))
+
+    # the booking's car reservations, loaded with every booking
+    __table_args__ = tuple([Index("ix_car_reservation_booking", "booking_id")])
+
+
+# Cars reserved per car and event day, kept up to date by the car_reservation triggers
+# (see migration d5e8f2a14c69) so a day's availability is an index lookup, not a scan of the reservations
+class CarReservationDay(SQLModel, table=True):
+    __tablename__: str = "car_reservation_day"
+
+    reservation_day: date = Field(sa_column=Column(
+        pg.DATE, primary_key=True, nullable=False))
+    car_id: uuid.UUID = Field(sa_column=Column(pg.UUID, ForeignKey(
+        "car.car_id", ondelete="CASCADE"), primary_key=True, nullable=False))
+    reserved: int = Field(sa_column=Column(pg.INTEGER, nullable=False))
+
+    __table_args__ = tuple([CheckConstraint("reserved >= 0", name="check_car_reservation_day_reserved"),
+                            Index("ix_car_reservation_day_car", "car_id", "reservation_day")])
+
+
+# Venue hold = a venue and day set aside for a customer during checkout until expires_at (see src/holds)
+# Expired holds are ignored everywhere and deleted by the hold sweeper
+class VenueHold(SQLModel, table=True):
+    __tablename__: str = "venue_hold"
+
+    hold_id: uuid.UUID = Field(
+        sa_column=Column(pg.UUID, primary_key=True,
+                         nullable=False, default=uuid.uuid4)
+    )
+    venue_id: uuid.UUID = Field(sa_column=Column(
+        pg.UUID, ForeignKey("venue.venue_id", ondelete="CASCADE"), nullable=False))
+    hold_day: date = Field(sa_column=Column(pg.DATE, nullable=False))
+    user_id: uuid.UUID = Field(sa_column=Column(
+        pg.UUID, ForeignKey("user.user_id", ondelete="CASCADE"), nullable=False))
+    created_at: datetime = Field(
+        sa_column=Column(pg.TIMESTAMP, nullable=False, default=datetime.now))
+    expires_at: datetime = Field(sa_column=Column(pg.TIMESTAMP, nullable=False))
+    # the booking made on the hold, its held cars stay held until the booking reserves them (or the hold expires)
+    booking_id: uuid.UUID | None = Field(sa_column=Column(
+        pg.UUID, ForeignKey("booking.booking_id", ondelete="SET NULL"), nullable=True))
+
+    # one hold per venue and day, an expired one is taken over in place
+    __table_args__ = tuple([UniqueConstraint("venue_id", "hold_day", name="unique_venue_hold_day"),
+                            Index("ix_venue_hold_expires_at", "expires_at"),
+                            Index("ix_venue_hold_user", "user_id")])
+
+
+# A car held with a venue hold, counted in car_reservation_day like a reservation by the car_hold triggers
+# (the same count_car_reservations function, see migration e7b4d2c9a310)
+class CarHold(SQLModel, table=True):
+    __tablename__: str = "car_hold"
+
+    car_hold_id: uuid.UUID = Field(
+        sa_column=Column(pg.UUID, primary_key=True,
+                         nullable=False, default=uuid.uuid4)
+    )
+    hold_id: uuid.UUID = Field(sa_column=Column(
+        pg.UUID, ForeignKey("venue_hold.hold_id", ondelete="CASCADE"), nullable=False))
+    car_id: uuid.UUID = Field(sa_column=Column(
+        pg.UUID, ForeignKey("car.car_id", ondelete="CASCADE"), nullable=False))
+    # the hold's day, under the same name as car_reservation's for the shared trigger function
+    reservation_day: date = Field(sa_column=Column(pg.DATE, nullable=False))
+
+    __table_args__ = tuple([Index("ix_car_hold_hold", "hold_id"),
+                            Index("ix_car_hold_car_day", "car_id", "reservation_day")])
 
 
 class Catering(SQLModel, table=True):
@@ -272,11 +392,11 @@ class Catering(SQLModel, table=True):
 
     # one-many relationship with booking
     bookings: list["Booking"] = Relationship(back_populates="catering", sa_relationship_kwargs={
-        "cascade": "all, delete-orphan", "lazy": "selectin"})
+        "cascade": "all, delete-orphan", "lazy": "raise_on_sql", "passive_deletes": True})
 
     # one-many relationship with CateringMenuItem
     catering_menu_items: list["CateringMenuItem"] = Relationship(
-        back_populates="catering", sa_relationship_kwargs={"cascade": "all, delete-orphan", "lazy": "selectin"})
+        back_populates="catering", sa_relationship_kwargs={"cascade": "all, delete-orphan", "lazy": "raise_on_sql", "passive_deletes": True})
 
 
 class Dish(SQLModel, table=True):
@@ -299,7 +419,7 @@ class Dish(SQLModel, table=True):
 
     # one-many relationship with dishes
     catering_menu_items: list["CateringMenuItem"] = Relationship(
-        back_populates="dish", sa_relationship_kwargs={"cascade": "all, delete-orphan", "lazy": "selectin"})
+        back_populates="dish", sa_relationship_kwargs={"cascade": "all, delete-orphan", "lazy": "raise_on_sql", "passive_deletes": True})
 
     # check constraint for dish_cost_per_serving
     __table_args__ = tuple([CheckConstraint(
@@ -313,11 +433,13 @@ class CateringMenuItem(SQLModel, table=True):
     # one-many relationship with car
     catering_id: uuid.UUID = Field(sa_column=Column(pg.UUID, ForeignKey(
         "catering.catering_id", ondelete="CASCADE"), nullable=False, primary_key=True))
-    catering: "Catering" = Relationship(back_populates="catering_menu_items")
+    catering: "Catering" = Relationship(
+        back_populates="catering_menu_items", sa_relationship_kwargs={"lazy": "raise_on_sql"})
     # one-many relationship with booking
     dish_id: uuid.UUID = Field(sa_column=Column(pg.UUID, ForeignKey(
         "dish.dish_id", ondelete="CASCADE"), nullable=False, primary_key=True))
-    dish: "Dish" = Relationship(back_populates="catering_menu_items")
+    dish: "Dish" = Relationship(
+        back_populates="catering_menu_items", sa_relationship_kwargs={"lazy": "raise_on_sql"})
 
 
 class Promo(SQLModel, table=True):
@@ -336,7 +458,7 @@ class Promo(SQLModel, table=True):
 
     # one-many relationship with booking
     bookings: list["Booking"] = Relationship(back_populates="promo", sa_relationship_kwargs={
-        "cascade": "all, delete-orphan", "lazy": "selectin"})
+        "cascade": "all, delete-orphan", "lazy": "raise_on_sql", "passive_deletes": True})
 
     # Adding the constraint to ensure the promo_expiry is greater than the current date
     # check constraint for promo_discount
@@ -371,43 +493,48 @@ class Booking(SQLModel, table=True):
         sa_column=Column(pg.UUID, ForeignKey(
             "user.user_id", ondelete="CASCADE"), nullable=False)
     )
-    user: "User" = Relationship(back_populates="bookings")
+    user: "User" = Relationship(
+        back_populates="bookings", sa_relationship_kwargs={"lazy": "raise_on_sql"})
 
     # one-one relationship with payment(COMPULSORY)
     payment: Payment | None = Relationship(back_populates="booking", sa_relationship_kwargs={
-        "cascade": "all, delete-orphan", "lazy": "selectin"})
+        "cascade": "all, delete-orphan", "lazy": "raise_on_sql", "passive_deletes": True})
 
     # one-many relationship with venue(COMPULSORY)
     venue_id: uuid.UUID = Field(
         sa_column=Column(pg.UUID, ForeignKey(
             "venue.venue_id", ondelete="CASCADE"), nullable=False)
     )
-    venue: "Venue" = Relationship(back_populates="bookings")
+    venue: "Venue" = Relationship(
+        back_populates="bookings", sa_relationship_kwargs={"lazy": "raise_on_sql"})
 
     # one-many relationship with catering(OPTIONAL)
     catering_id: uuid.UUID = Field(
         sa_column=Column(pg.UUID, ForeignKey(
             "catering.catering_id", ondelete="CASCADE"), nullable=True)
     )
-    catering: "Catering" = Relationship(back_populates="bookings")
+    catering: "Catering" = Relationship(
+        back_populates="bookings", sa_relationship_kwargs={"lazy": "raise_on_sql"})
 
     # one-many relationship with Decoration(OPTIONAL)
     decoration_id: uuid.UUID = Field(
         sa_column=Column(pg.UUID, ForeignKey(
             "decoration.decoration_id", ondelete="CASCADE"), nullable=True)
     )
-    decoration: "Decoration" = Relationship(back_populates="bookings")
+    decoration: "Decoration" = Relationship(
+        back_populates="bookings", sa_relationship_kwargs={"lazy": "raise_on_sql"})
 
     # one-many relationship with car_reservation
     car_reservations: list["CarReservation"] = Relationship(
-        back_populates="booking", sa_relationship_kwargs={"cascade": "all, delete-orphan", "lazy": "selectin"})
+        back_populates="booking", sa_relationship_kwargs={"cascade": "all, delete-orphan", "lazy": "raise_on_sql", "passive_deletes": True})
 
     # one-many relationship with promo(OPTIONAL)
     promo_id: uuid.UUID = Field(
         sa_column=Column(pg.UUID, ForeignKey(
             "promo.promo_id", ondelete="CASCADE"), nullable=True)
     )
-    promo: "Promo" = Relationship(back_populates="bookings")
+    promo: "Promo" = Relationship(
+        back_populates="bookings", sa_relationship_kwargs={"lazy": "raise_on_sql"})
 
     # check to see if booking event date is not in the past
     # check constraint for booking_guest_count, there must be atleast 1 guest
@@ -419,8 +546,41 @@ class Booking(SQLModel, table=True):
         text('DATE(booking_event_date)'),
         unique=True
     ),  CheckConstraint("booking_event_date > CURRENT_TIMESTAMP",
-                        name="check_booking_event_date"), CheckConstraint("booking_guest_count > 0", name="check_booking_guest_count")])
+                        name="check_booking_event_date"), CheckConstraint("booking_guest_count > 0", name="check_booking_guest_count"),
+        # pages of one user's bookings (GET /bookings/me), keyset on booking_id
+        Index("ix_booking_user", "user_id", "booking_id"),
+        # pages of one catering's / decoration's bookings (GET /bookings/?catering_id=...), and their cascades
+        Index("ix_booking_catering", "catering_id", "booking_id"),
+        Index("ix_booking_decoration", "decoration_id", "booking_id")])
 
     # unique index for venue and booking_event_date
 # PostgreSQL doesn't allow functions in UNIQUE constraints, but it does allow them in unique indexes
 # A unique index provides the same guarantee as a unique constraint while also improving query performance
+
+
+# Image blob = one stored image file, shared by every venue/car/dish/catering/decoration using the same content
+class ImageBlob(SQLModel, table=True):
+    __tablename__: str = "image_blob"
+
+    # content addressed name, "<sha256><ext>"
+    image_name: str = Field(sa_column=Column(
+        pg.VARCHAR(255), primary_key=True, nullable=False))
+    # number of rows whose image column points at this blob, the blob is deleted when it drops to 0
+    ref_count: int = Field(sa_column=Column(
+        pg.INTEGER, nullable=False, default=0))
+    created_at: datetime = Field(
+        sa_column=Column(pg.TIMESTAMP, nullable=False, default=datetime.now))
+
+    __table_args__ = tuple(
+        [CheckConstraint("ref_count >= 0", name="check_image_blob_ref_count")])
+
+
+# Catalog cache version = generation of one namespace of the catalog response cache (src/catalog_cache.py),
+# bumped after every committed change so every worker stops serving the pages cached before it
+class CatalogCacheVersion(SQLModel, table=True):
+    __tablename__: str = "catalog_cache_version"
+
+    namespace: str = Field(sa_column=Column(
+        pg.VARCHAR(64), primary_key=True, nullable=False))
+    version: int = Field(sa_column=Column(
+        pg.BIGINT, nullable=False, default=0))
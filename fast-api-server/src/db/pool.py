@@ -0,0 +1,49 @@
+import time
+from sqlalchemy import exc
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+
+# upper bounds (ms) of the checkout latency histogram buckets, the last bucket is everything above
+CHECKOUT_LATENCY_BUCKETS_MS = [1, 5, 10, 25, 50, 100, 250, 500, 1000, 5000]
+
+
+class PoolStats:
+    def __init__(self):
+        self.waiting = 0  # checkouts currently waiting for a connection
+        self.checkouts = 0
+        self.checkout_timeouts = 0
+        self.checkout_latency_sum_ms = 0.0
+        self.checkout_latency_buckets = [0] * \
+            (len(CHECKOUT_LATENCY_BUCKETS_MS) + 1)
+
+    def observe_checkout(self, latency_ms: float):
+        self.checkouts += 1
+        self.checkout_latency_sum_ms += latency_ms
+        for i, bound in enumerate(CHECKOUT_LATENCY_BUCKETS_MS):
+            if latency_ms <= bound:
+                self.checkout_latency_buckets[i] += 1
+                return
+        self.checkout_latency_buckets[-1] += 1
+
+    def histogram(self):
+        labels = [f"le_{bound}" for bound in CHECKOUT_LATENCY_BUCKETS_MS] + ["inf"]
+        return dict(zip(labels, self.checkout_latency_buckets))
+
+
+pool_stats = PoolStats()
+
+
+class InstrumentedQueuePool(AsyncAdaptedQueuePool):
+    # QueuePool that records how long each checkout waits (including pre-ping) and how many are waiting
+
+    def connect(self):
+        started = time.perf_counter()
+        pool_stats.waiting += 1
+        try:
+            return super().connect()
+        except exc.TimeoutError:
+            pool_stats.checkout_timeouts += 1
+            raise
+        finally:
+            pool_stats.waiting -= 1
+            pool_stats.observe_checkout(
+                (time.perf_counter() - started) * 1000)
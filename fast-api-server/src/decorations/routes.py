@@ -1,14 +1,16 @@
-from fastapi import APIRouter, Depends, HTTPException, status, File, Form, UploadFile
+from fastapi import APIRouter, Depends, HTTPException, status, File, Form, UploadFile, Request
 from fastapi import APIRouter, Depends, HTTPException, status
 from sqlmodel.ext.asyncio.session import AsyncSession
-from src.db.main import get_session
+from src.db.main import get_session, get_unit_of_work
 from src.users.schemas import UserModel
 from src.decorations.service import DecorationService
-from src.decorations.schemas import DecorationModel, CreateDecorationModel
+from src.decorations.schemas import DecorationModel, CreateDecorationModel, DecorationFilterModel
 from uuid import UUID
 from src.users.JWTAuthMiddleware import JWTAuthMiddleware
 from src.config import Config
 from src.utils import upload_image
+from src.pagination import PageParams, page_response
+from src.catalog_cache import catalog_cache
 
 
 decoration_router = APIRouter(prefix="/decorations")
@@ -16,9 +18,11 @@ decoration_service = DecorationService()
 
 
 @decoration_router.get("/", response_model=list[DecorationModel], status_code=status.HTTP_200_OK)
-async def get_all_decorations(session: AsyncSession = Depends(get_session)):
-    decorations = await decoration_service.get_all_decorations(session)
-    return decorations
+async def get_all_decorations(request: Request, page: PageParams = Depends(), filters: DecorationFilterModel = Depends(), session: AsyncSession = Depends(get_session)):
+    async def build():
+        decorations, next_cursor = await decoration_service.get_all_decorations(page, filters, session)
+        return page_response(decorations, next_cursor, DecorationModel, page)
+    return await catalog_cache.respond(request, "decorations", build)
 
 
 @decoration_router.get("/{decoration_id}", response_model=DecorationModel, status_code=status.HTTP_200_OK)
@@ -40,7 +44,7 @@ async def create_decoration(
     # Handle image file upload
     decoration_image: UploadFile | None = File(None),
     user: UserModel = Depends(JWTAuthMiddleware),
-    session: AsyncSession = Depends(get_session),
+    session: AsyncSession = Depends(get_unit_of_work),
 ):
     if not user.is_admin:
         raise HTTPException(
@@ -65,7 +69,7 @@ async def create_decoration(
 async def delete_decoration(
     decoration_id: UUID,
     user: UserModel = Depends(JWTAuthMiddleware),
-    session: AsyncSession = Depends(get_session),
+    session: AsyncSession = Depends(get_unit_of_work),
 ):
     if not user.is_admin:
         raise HTTPException(
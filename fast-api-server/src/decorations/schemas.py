@@ -1,6 +1,5 @@
 from pydantic import Field
 from pydantic import BaseModel
-from src.db.models import Booking
 import uuid
 
 
@@ -10,7 +9,12 @@ class DecorationModel(BaseModel):
     decoration_price: int = Field(ge=0)
     decoration_description: str
     decoration_image: str | None
-    bookings: list[Booking]
+    # its bookings are paged from GET /bookings/?decoration_id=...
+
+
+class DecorationFilterModel(BaseModel):
+    min_price: int | None = None
+    max_price: int | None = None
 
 
 class CreateDecorationModel(BaseModel):
@@ -1,22 +1,33 @@
 from sqlmodel import select
 from sqlmodel.ext.asyncio.session import AsyncSession
+from src.catalog_cache import BOOKING_NAMESPACES, catalog_cache
+from src.db.main import after_commit, commit
 from src.db.models import Decoration
 from uuid import UUID
-from src.utils import delete_image
+from src.utils import acquire_image, delete_image
+from src.db.loading import load_profile
+from src.search.index import catalog_search_index, decoration_document
+from src.quotes.prices import component_prices
 
-from src.decorations.schemas import CreateDecorationModel
+from src.decorations.schemas import CreateDecorationModel, DecorationFilterModel
+from src.pagination import PageParams, paginate
 
 
 class DecorationService:
-    async def get_all_decorations(self, session: AsyncSession):
-        query = select(Decoration)
-        result = await session.exec(query)
-        decorations = result.all()
-        return decorations
+    async def get_all_decorations(self, page: PageParams, filters: DecorationFilterModel, session: AsyncSession):
+        query = select(Decoration).options(*load_profile("decoration.card"))
+        if filters.min_price is not None:
+            query = query.where(Decoration.decoration_price >= filters.min_price)
+        if filters.max_price is not None:
+            query = query.where(Decoration.decoration_price <= filters.max_price)
+        return await paginate(query, page, session, Decoration.decoration_id, {
+            "decoration_name": Decoration.decoration_name,
+            "decoration_price": Decoration.decoration_price,
+        })
 
     async def get_decoration(self, decoration_id: UUID, session: AsyncSession):
         query = select(Decoration).where(
-            Decoration.decoration_id == decoration_id)
+            Decoration.decoration_id == decoration_id).options(*load_profile("decoration.card"))
         result = await session.exec(query)
         decoration = result.first()
         return decoration if decoration else None
@@ -24,9 +35,11 @@ class DecorationService:
     async def create_decoration(self, decoration_data: CreateDecorationModel, session: AsyncSession):
         new_decoration = Decoration(**decoration_data.model_dump())
         session.add(new_decoration)
-        await session.commit()
-        await session.refresh(new_decoration)
-        return new_decoration
+        await acquire_image(new_decoration.decoration_image, session)
+        after_commit(session, lambda: catalog_search_index.put(decoration_document(new_decoration)))
+        catalog_cache.invalidate_after_commit(session, "decorations")
+        await commit(session)
+        return await self.get_decoration(new_decoration.decoration_id, session)
 
     async def delete_decoration(self, decoration_id: UUID, session: AsyncSession):
         query = select(Decoration).where(
@@ -36,7 +49,10 @@ class DecorationService:
         if not decoration:
             return None
         # Extract and delete the associated image file, if it exists
-        await delete_image(decoration.decoration_image)
+        await delete_image(decoration.decoration_image, session)
         await session.delete(decoration)
-        await session.commit()
+        after_commit(session, lambda: catalog_search_index.remove("decoration", decoration_id))
+        after_commit(session, lambda: component_prices.invalidate("decoration", decoration_id))
+        catalog_cache.invalidate_after_commit(session, "decorations", *BOOKING_NAMESPACES)
+        await commit(session)
         return decoration
@@ -0,0 +1,40 @@
+from fastapi import APIRouter, Depends, HTTPException, status
+from sqlmodel.ext.asyncio.session import AsyncSession
+from src.db.main import get_session, get_unit_of_work
+from src.users.schemas import UserModel
+from src.holds.service import HoldService
+from src.holds.schemas import CreateHoldModel, HoldModel
+from uuid import UUID
+from src.users.JWTAuthMiddleware import JWTAuthMiddleware
+
+hold_router = APIRouter(prefix="/holds")
+hold_service = HoldService()
+
+
+# sets a venue day (and cars) aside for the logged in user, eg: during checkout, until POST /bookings/ books it
+@hold_router.post("/", response_model=HoldModel, status_code=status.HTTP_201_CREATED)
+async def create_hold(
+    hold_data: CreateHoldModel,
+    user: UserModel = Depends(JWTAuthMiddleware),
+    session: AsyncSession = Depends(get_unit_of_work),
+):
+    return await hold_service.create_hold(hold_data, user.user_id, session)
+
+
+@hold_router.get("/me", response_model=list[HoldModel], status_code=status.HTTP_200_OK)
+async def get_my_holds(user: UserModel = Depends(JWTAuthMiddleware), session: AsyncSession = Depends(get_session)):
+    return await hold_service.get_my_holds(user.user_id, session)
+
+
+@hold_router.delete("/{hold_id}", status_code=status.HTTP_204_NO_CONTENT)
+async def release_hold(
+    hold_id: UUID,
+    user: UserModel = Depends(JWTAuthMiddleware),
+    session: AsyncSession = Depends(get_unit_of_work),
+):
+    hold = await hold_service.get_hold(hold_id, session)
+    if not hold or (hold.user_id != user.user_id and not user.is_admin):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="Hold not found"
+        )
+    await hold_service.release_hold(hold, session)
@@ -0,0 +1,29 @@
+from datetime import date, datetime
+from uuid import UUID
+from pydantic import BaseModel, Field, field_validator
+from src.cars.schemas import CarQuantityModel
+from src.config import Config
+
+
+class CreateHoldModel(BaseModel):
+    venue_id: UUID
+    hold_day: date
+    # cars set aside for the same day, reserved by the booking later on
+    cars: list[CarQuantityModel] = []
+    minutes: int = Field(ge=1, le=Config.HOLD_MAX_MINUTES, default=Config.HOLD_MINUTES)
+
+    @field_validator("hold_day")
+    def validate_hold_day(cls, value):
+        if value < date.today():
+            raise ValueError("hold_day cannot be in the past")
+        return value
+
+
+class HoldModel(BaseModel):
+    hold_id: UUID
+    venue_id: UUID
+    hold_day: date
+    user_id: UUID
+    expires_at: datetime
+    booking_id: UUID | None = None  # the booking made on the hold
+    cars: list[CarQuantityModel]
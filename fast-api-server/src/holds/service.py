@@ -0,0 +1,162 @@
+import asyncio
+import logging
+from collections import Counter
+from datetime import date, datetime, timedelta
+from uuid import UUID, uuid4
+from fastapi import HTTPException, status
+from sqlalchemy import delete, func, insert, or_
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.exc import DBAPIError
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+from src.cars.schemas import CarQuantityModel
+from src.cars.service import is_car_shortage, release_car_holds
+from src.config import Config
+from src.db.main import async_session_factory, commit
+from src.db.models import Booking, Car, CarHold, Venue, VenueHold
+from src.holds.schemas import CreateHoldModel, HoldModel
+
+# Holds set a venue day (and cars) aside for a customer while they check out, for a few minutes:
+# booking creation turns other customers away from a held day and the availability views show it as taken,
+# held cars are counted like reservations. A hold ends when it expires, the holder releases it,
+# or, for its cars, when the booking made on it reserves its cars
+# The bookings' unique index stays the final word: a hold only keeps other customers from trying
+
+
+def hold_model(hold: VenueHold, car_ids: list[UUID]):
+    return HoldModel(hold_id=hold.hold_id, venue_id=hold.venue_id, hold_day=hold.hold_day, user_id=hold.user_id,
+                     expires_at=hold.expires_at, booking_id=hold.booking_id,
+                     cars=[CarQuantityModel(car_id=car_id, quantity=quantity)
+                           for car_id, quantity in Counter(car_ids).items()])
+
+
+class HoldService:
+    async def create_hold(self, hold_data: CreateHoldModel, user_id: UUID, session: AsyncSession):
+        # holding a day again (the holder's own) extends the hold and replaces its cars
+        venue_id, day = hold_data.venue_id, hold_data.hold_day
+        car_ids = [car.car_id for car in hold_data.cars for _ in range(car.quantity)]
+        if len(car_ids) > Config.CAR_RESERVATION_MAX_BATCH:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST,
+                                detail=f"Cannot hold more than {Config.CAR_RESERVATION_MAX_BATCH} cars at once")
+        result = await session.exec(select(Venue.venue_id).where(Venue.venue_id == venue_id))
+        if not result.first():
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Venue not found")
+        result = await session.exec(select(Booking.booking_id).where(
+            Booking.venue_id == venue_id, func.date(Booking.booking_event_date) == day))
+        if result.first():
+            raise HTTPException(status_code=status.HTTP_409_CONFLICT,
+                                detail="The chosen Venue is already reserved for another booking on the provided date")
+        now = datetime.now()
+        result = await session.exec(select(func.count()).select_from(VenueHold).where(
+            VenueHold.user_id == user_id, VenueHold.expires_at > now, VenueHold.booking_id.is_(None),  # type: ignore
+            or_(VenueHold.venue_id != venue_id, VenueHold.hold_day != day)))
+        if result.one() >= Config.HOLD_MAX_PER_USER:
+            raise HTTPException(status_code=status.HTTP_409_CONFLICT,
+                                detail=f"At most {Config.HOLD_MAX_PER_USER} venue days can be held at once")
+
+        # one statement decides who holds the day: a new hold, or the row of an expired or own hold taken over
+        statement = pg_insert(VenueHold).values(hold_id=uuid4(), venue_id=venue_id, hold_day=day, user_id=user_id,
+                                                created_at=now, expires_at=now + timedelta(minutes=hold_data.minutes))
+        statement = statement.on_conflict_do_update(
+            constraint="unique_venue_hold_day",
+            set_={"user_id": statement.excluded.user_id, "created_at": statement.excluded.created_at,
+                  "expires_at": statement.excluded.expires_at, "booking_id": None},
+            where=or_(VenueHold.expires_at <= now, VenueHold.user_id == user_id),
+        ).returning(VenueHold).execution_options(populate_existing=True)
+        result = await session.exec(statement)  # type: ignore
+        hold = result.scalar_one_or_none()
+        if hold is None:
+            raise HTTPException(status_code=status.HTTP_409_CONFLICT,
+                                detail="The chosen Venue is held for another customer on the provided date")
+
+        # the cars of a taken over or extended hold start over
+        await session.exec(delete(CarHold).where(CarHold.hold_id == hold.hold_id))  # type: ignore
+        if car_ids:
+            result = await session.exec(select(Car.car_id).where(Car.car_id.in_(car_ids)))  # type: ignore
+            missing = set(car_ids) - set(result.all())
+            if missing:
+                raise HTTPException(status_code=status.HTTP_404_NOT_FOUND,
+                                    detail=f"Car not found: {', '.join(sorted(map(str, missing)))}")
+            await release_car_holds(set(car_ids), day, session)
+            try:
+                # one INSERT, so the car_hold trigger checks all the cars at once
+                await session.exec(insert(CarHold).values([  # type: ignore
+                    {"car_hold_id": uuid4(), "hold_id": hold.hold_id, "car_id": car_id, "reservation_day": day}
+                    for car_id in car_ids]))
+            except DBAPIError as e:
+                if is_car_shortage(e):
+                    raise HTTPException(status_code=status.HTTP_409_CONFLICT,
+                                        detail="Not enough cars available on the provided date")
+                raise
+        await commit(session)
+        return hold_model(hold, car_ids)
+
+    async def get_my_holds(self, user_id: UUID, session: AsyncSession):
+        result = await session.exec(select(VenueHold).where(
+            VenueHold.user_id == user_id, VenueHold.expires_at > datetime.now()).order_by(VenueHold.expires_at))
+        holds = result.all()
+        cars: dict[UUID, list[UUID]] = {hold.hold_id: [] for hold in holds}
+        if holds:
+            result = await session.exec(select(CarHold.hold_id, CarHold.car_id).where(
+                CarHold.hold_id.in_(cars)))  # type: ignore
+            for hold_id, car_id in result.all():
+                cars[hold_id].append(car_id)
+        return [hold_model(hold, cars[hold.hold_id]) for hold in holds]
+
+    async def get_hold(self, hold_id: UUID, session: AsyncSession):
+        result = await session.exec(select(VenueHold).where(
+            VenueHold.hold_id == hold_id, VenueHold.expires_at > datetime.now()))
+        return result.first()
+
+    async def get_active_hold(self, venue_id: UUID, day: date, session: AsyncSession):
+        result = await session.exec(select(VenueHold).where(
+            VenueHold.venue_id == venue_id, VenueHold.hold_day == day, VenueHold.expires_at > datetime.now()))
+        return result.first()
+
+    async def release_hold(self, hold: VenueHold, session: AsyncSession):
+        # its car holds go with it (on delete cascade), which the car_hold triggers count as free again
+        await session.delete(hold)
+        await commit(session)
+        return hold
+
+    async def release_booked_hold(self, booking_id: UUID, venue_id: UUID, day: date, session: AsyncSession):
+        # the hold a booking was made on, once the booking moves to another venue or day
+        await session.exec(delete(VenueHold).where(  # type: ignore
+            VenueHold.booking_id == booking_id, VenueHold.venue_id == venue_id, VenueHold.hold_day == day))
+
+    async def get_held_days(self, from_date: date, to_date: date, session: AsyncSession):
+        # venue_id -> held days in [from_date, to_date], of holds nobody booked on yet (those days are booked)
+        # (the table only has the current holds and those waiting for the sweeper, no venue filter needed)
+        result = await session.exec(select(VenueHold.venue_id, VenueHold.hold_day).where(
+            VenueHold.hold_day >= from_date, VenueHold.hold_day <= to_date,
+            VenueHold.expires_at > datetime.now(), VenueHold.booking_id.is_(None)))  # type: ignore
+        held: dict[UUID, set[date]] = {}
+        for venue_id, day in result.all():
+            held.setdefault(venue_id, set()).add(day)
+        return held
+
+    async def sweep_expired(self, session: AsyncSession):
+        # HOLD_SWEEP_BATCH_SIZE expired holds per statement, SKIP LOCKED so the workers' sweepers don't queue up
+        swept = 0
+        while True:
+            expired = select(VenueHold.hold_id).where(VenueHold.expires_at <= datetime.now()).limit(
+                Config.HOLD_SWEEP_BATCH_SIZE).with_for_update(skip_locked=True)
+            result = await session.exec(delete(VenueHold).where(  # type: ignore
+                VenueHold.hold_id.in_(expired.scalar_subquery())).returning(VenueHold.hold_id))  # type: ignore
+            count = len(result.all())
+            await session.commit()
+            swept += count
+            if count < Config.HOLD_SWEEP_BATCH_SIZE:
+                return swept
+
+
+async def sweep_expired_holds():
+    # background task of every worker, started with the app
+    hold_service = HoldService()
+    while True:
+        await asyncio.sleep(Config.HOLD_SWEEP_INTERVAL)
+        try:
+            async with async_session_factory() as session:
+                await hold_service.sweep_expired(session)
+        except Exception as e:
+            logging.error(f"Sweeping expired holds failed: {e}")
@@ -0,0 +1,70 @@
+import hashlib
+import mimetypes
+from dataclasses import dataclass
+from email.utils import formatdate
+from cachetools import LRUCache
+from src.config import Config
+from src.images.storage import ImageStorage
+
+
+@dataclass
+class ImageFile:
+    storage: ImageStorage
+    key: str
+    size: int
+    etag: str
+    last_modified: str
+    media_type: str
+    body: bytes | None = None  # only kept for small files
+
+    def headers(self):
+        # image files are never rewritten in place (names are content hashes), so clients may keep them for good
+        return {
+            "etag": self.etag,
+            "last-modified": self.last_modified,
+            "cache-control": f"public, max-age={Config.IMAGE_CACHE_MAX_AGE}, immutable",
+            "accept-ranges": "bytes",
+        }
+
+
+def load_image_file(storage: ImageStorage, key: str):
+    # Runs on a worker thread, raises FileNotFoundError for a missing image
+    stat = storage.stat(key)
+    etag_base = f"{key}-{stat.modified}-{stat.size}"
+    image = ImageFile(
+        storage=storage,
+        key=key,
+        size=stat.size,
+        etag=f'"{hashlib.md5(etag_base.encode(), usedforsecurity=False).hexdigest()}"',
+        last_modified=formatdate(stat.modified, usegmt=True),
+        media_type=mimetypes.guess_type(key)[0] or "application/octet-stream",
+    )
+    if stat.size <= Config.IMAGE_CACHE_MAX_FILE_BYTES:
+        image.body = storage.read(key)
+    return image
+
+
+class HotImageCache:
+    # Small images (originals and renditions) kept in memory by storage location, least recently served evicted first,
+    # so the most viewed venue photos are served without touching the filesystem
+    # Bounded by the total size of the cached bodies, anything deleting an image file must call invalidate()
+
+    def __init__(self):
+        self._images: LRUCache[str, ImageFile] = LRUCache(
+            maxsize=Config.IMAGE_CACHE_MAX_BYTES, getsizeof=lambda image: len(image.body or b""))
+
+    def get(self, storage: ImageStorage, key: str):
+        return self._images.get(storage.location(key))
+
+    def set(self, image: ImageFile):
+        if image.body is not None and len(image.body) <= self._images.maxsize:
+            self._images[image.storage.location(image.key)] = image
+
+    def invalidate(self, storage: ImageStorage, key: str):
+        self._images.pop(storage.location(key), None)
+
+    def clear(self):
+        self._images.clear()
+
+
+hot_image_cache = HotImageCache()
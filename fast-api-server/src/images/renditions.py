@@ -0,0 +1,76 @@
+import asyncio
+import io
+from pathlib import Path
+from PIL import Image, ImageOps
+from starlette.concurrency import run_in_threadpool
+from src.config import Config
+from src.images.cache import hot_image_cache
+from src.images.storage import image_storage, rendition_storage
+
+# Fixed renditions (max width in px) served instead of the full upload on listing pages
+# Stored as WebP in rendition_storage under <size>/<image stem>.webp, generated at upload time
+# and lazily on first request for images uploaded before renditions existed
+RENDITIONS = {
+    "thumb": 160,
+    "card": 480,
+    "full": 1600,
+}
+
+# errors Pillow raises for content it can't decode
+RENDER_ERRORS = (OSError, ValueError, Image.DecompressionBombError)
+
+# one render per rendition at a time, concurrent requests for it wait for the same blob
+render_locks: dict[str, asyncio.Lock] = {}
+
+
+def rendition_key(image_name: str, size: str):
+    return f"{size}/{Path(image_name).stem}.webp"
+
+
+def rendition_for_width(width: int):
+    # smallest rendition at least as wide as requested, the largest one otherwise
+    for size, max_width in sorted(RENDITIONS.items(), key=lambda item: item[1]):
+        if max_width >= width:
+            return size
+    return max(RENDITIONS, key=lambda size: RENDITIONS[size])
+
+
+def render(image_name: str, key: str, max_width: int):
+    # runs on a worker thread
+    with Image.open(io.BytesIO(image_storage.read(image_name))) as image:
+        image = ImageOps.exif_transpose(image)  # respect camera orientation
+        if image.mode not in ("RGB", "RGBA"):
+            image = image.convert("RGBA" if "transparency" in image.info or image.mode in ("LA", "PA") else "RGB")
+        if image.width > max_width:
+            image.thumbnail((max_width, image.height), Image.Resampling.LANCZOS)
+        buffer = io.BytesIO()
+        image.save(buffer, "WEBP", quality=Config.IMAGE_RENDITION_QUALITY, method=4)
+    buffer.seek(0)
+    rendition_storage.write(key, buffer, "image/webp")
+
+
+async def get_rendition(image_name: str, size: str):
+    key = rendition_key(image_name, size)
+    if await run_in_threadpool(rendition_storage.exists, key):
+        return key
+    lock = render_locks.setdefault(key, asyncio.Lock())
+    try:
+        async with lock:
+            if not await run_in_threadpool(rendition_storage.exists, key):
+                await run_in_threadpool(render, image_name, key, RENDITIONS[size])
+    finally:
+        if not lock.locked():
+            render_locks.pop(key, None)
+    return key
+
+
+async def generate_renditions(image_name: str):
+    for size in RENDITIONS:
+        await get_rendition(image_name, size)
+
+
+async def delete_renditions(image_name: str):
+    for size in RENDITIONS:
+        key = rendition_key(image_name, size)
+        hot_image_cache.invalidate(rendition_storage, key)
+        await run_in_threadpool(rendition_storage.delete, key)
@@ -0,0 +1,113 @@
+from pathlib import Path
+from fastapi import APIRouter, HTTPException, Query, Request, Response
+from fastapi.responses import FileResponse
+from starlette.concurrency import run_in_threadpool
+from src.images.cache import ImageFile, hot_image_cache, load_image_file
+from src.images.renditions import RENDER_ERRORS, RENDITIONS, get_rendition, rendition_for_width, rendition_key
+from src.images.storage import ImageStorage, image_storage, rendition_storage
+
+image_router = APIRouter(prefix="/images")
+
+
+def check_image_name(image_name: str):
+    # image names are flat file names, never paths
+    if Path(image_name).name != image_name or image_name.startswith("."):
+        raise HTTPException(status_code=404, detail="Image not found")
+
+
+async def get_image_file(storage: ImageStorage, key: str):
+    image = hot_image_cache.get(storage, key)
+    if image:
+        return image
+    try:
+        image = await run_in_threadpool(load_image_file, storage, key)
+    except (FileNotFoundError, IsADirectoryError):
+        raise HTTPException(status_code=404, detail="Image not found")
+    hot_image_cache.set(image)
+    return image
+
+
+def etag_matches(header: str, etag: str):
+    # If-None-Match uses the weak comparison
+    tags = [tag.strip().removeprefix("W/") for tag in header.split(",")]
+    return "*" in tags or etag in tags
+
+
+def parse_range(header: str, size: int):
+    # single "bytes=start-end" ranges only, anything else is ignored and the whole file is sent
+    unit, _, spec = header.partition("=")
+    if unit.strip() != "bytes" or "," in spec:
+        return None
+    start, _, end = spec.strip().partition("-")
+    try:
+        if not start:  # suffix range, the last <end> bytes
+            length = int(end)
+            if length <= 0:
+                raise HTTPException(status_code=416, headers={"content-range": f"bytes */{size}"})
+            return max(size - length, 0), size - 1
+        first = int(start)
+        last = min(int(end), size - 1) if end else size - 1
+    except ValueError:
+        return None
+    if first >= size or first > last:
+        raise HTTPException(status_code=416, headers={"content-range": f"bytes */{size}"})
+    return first, last
+
+
+async def image_response(request: Request, image: ImageFile):
+    headers = image.headers()
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match and etag_matches(if_none_match, image.etag):
+        return Response(status_code=304, headers=headers)
+
+    range_header = request.headers.get("range")
+    if_range = request.headers.get("if-range")
+    if range_header and (not if_range or if_range in (image.etag, image.last_modified)):
+        byte_range = parse_range(range_header, image.size)
+        if byte_range:
+            start, end = byte_range
+            if image.body is not None:
+                body = image.body[start:end + 1]
+            else:
+                body = await run_in_threadpool(image.storage.read, image.key, start, end)
+            headers["content-range"] = f"bytes {start}-{end}/{image.size}"
+            return Response(body, status_code=206, media_type=image.media_type, headers=headers)
+
+    if image.body is not None:
+        return Response(image.body, media_type=image.media_type, headers=headers)
+    local_path = image.storage.local_path(image.key)
+    if local_path:
+        return FileResponse(local_path, media_type=image.media_type, headers=headers)
+    body = await run_in_threadpool(image.storage.read, image.key)
+    return Response(body, media_type=image.media_type, headers=headers)
+
+
+async def rendition_response(request: Request, image_name: str, size: str):
+    image = hot_image_cache.get(rendition_storage, rendition_key(image_name, size))
+    if image:
+        return await image_response(request, image)
+    original = await get_image_file(image_storage, image_name)
+    try:
+        key = await get_rendition(image_name, size)
+    except RENDER_ERRORS:
+        # an image stored before uploads were validated, serve it as it is
+        return await image_response(request, original)
+    return await image_response(request, await get_image_file(rendition_storage, key))
+
+
+# Serve uploaded images from image storage, ?w= picks the smallest rendition at least that wide
+@image_router.get("/{image_name}", response_class=FileResponse)
+async def serve_image(request: Request, image_name: str, w: int | None = Query(None, ge=1)):
+    check_image_name(image_name)
+    if w is None:
+        return await image_response(request, await get_image_file(image_storage, image_name))
+    return await rendition_response(request, image_name, rendition_for_width(w))
+
+
+@image_router.get("/{size}/{image_name}", response_class=FileResponse)
+async def serve_image_rendition(request: Request, size: str, image_name: str):
+    if size not in RENDITIONS:
+        raise HTTPException(
+            status_code=404, detail=f"Unknown image size, available: {', '.join(RENDITIONS)}")
+    check_image_name(image_name)
+    return await rendition_response(request, image_name, size)
@@ -0,0 +1,150 @@
+import os
+from abc import ABC, abstractmethod
+from pathlib import Path
+from typing import BinaryIO, NamedTuple
+from uuid import uuid4
+from src.config import Config
+
+
+class BlobStat(NamedTuple):
+    size: int
+    modified: float  # unix timestamp
+
+
+class ImageStorage(ABC):
+    # Where image blobs live, keys are flat names ("<sha256>.png", "thumb/<sha256>.webp")
+    # Every method does blocking I/O, call them from a worker thread (run_in_threadpool)
+
+    @abstractmethod
+    def location(self, key: str) -> str:
+        ...
+
+    def local_path(self, key: str) -> Path | None:
+        # set when the blob is a plain file on this machine, so it can be streamed with sendfile
+        return None
+
+    @abstractmethod
+    def stat(self, key: str) -> BlobStat:
+        # raises FileNotFoundError for a missing blob
+        ...
+
+    def exists(self, key: str):
+        try:
+            self.stat(key)
+            return True
+        except FileNotFoundError:
+            return False
+
+    @abstractmethod
+    def read(self, key: str, start: int = 0, end: int | None = None) -> bytes:
+        # end is inclusive, raises FileNotFoundError for a missing blob
+        ...
+
+    @abstractmethod
+    def write(self, key: str, source: BinaryIO, content_type: str):
+        ...
+
+    @abstractmethod
+    def delete(self, key: str):
+        # missing blobs are ignored
+        ...
+
+
+class LocalImageStorage(ImageStorage):
+    def __init__(self, root: str):
+        self.root = Path(root)
+
+    def location(self, key: str):
+        return str(self.root / key)
+
+    def local_path(self, key: str):
+        return self.root / key
+
+    def stat(self, key: str):
+        stat = (self.root / key).stat()
+        return BlobStat(stat.st_size, stat.st_mtime)
+
+    def read(self, key: str, start: int = 0, end: int | None = None):
+        with (self.root / key).open("rb") as file:
+            file.seek(start)
+            return file.read(-1 if end is None else end - start + 1)
+
+    def write(self, key: str, source: BinaryIO, content_type: str):
+        path = self.root / key
+        path.parent.mkdir(parents=True, exist_ok=True)
+        # written next to the target and renamed, readers never see a partial file
+        temp_path = path.with_name(f".{uuid4()}{path.suffix}")
+        try:
+            with temp_path.open("wb") as buffer:
+                while chunk := source.read(Config.IMAGE_UPLOAD_CHUNK_SIZE):
+                    buffer.write(chunk)
+            os.replace(temp_path, path)
+        finally:
+            temp_path.unlink(missing_ok=True)
+
+    def delete(self, key: str):
+        (self.root / key).unlink(missing_ok=True)
+
+
+class S3ImageStorage(ImageStorage):
+    # Any S3 compatible service (AWS, MinIO, a moto server for local testing) through boto3,
+    # workers then need no shared writable directory
+    def __init__(self, bucket: str, prefix: str = ""):
+        import boto3  # only needed with IMAGE_STORAGE_BACKEND=s3
+        from botocore.exceptions import ClientError
+
+        self.bucket = bucket
+        self.prefix = prefix
+        self.client_error = ClientError
+        self.client = boto3.client(
+            "s3",
+            endpoint_url=Config.IMAGE_S3_ENDPOINT_URL or None,
+            region_name=Config.IMAGE_S3_REGION or None,
+            aws_access_key_id=Config.IMAGE_S3_ACCESS_KEY_ID or None,
+            aws_secret_access_key=Config.IMAGE_S3_SECRET_ACCESS_KEY or None,
+        )
+
+    def location(self, key: str):
+        return f"s3://{self.bucket}/{self.prefix}{key}"
+
+    def missing(self, error):
+        return error.response.get("Error", {}).get("Code") in ("404", "NoSuchKey", "NotFound")
+
+    def stat(self, key: str):
+        try:
+            head = self.client.head_object(
+                Bucket=self.bucket, Key=self.prefix + key)
+        except self.client_error as e:
+            if self.missing(e):
+                raise FileNotFoundError(self.location(key))
+            raise
+        return BlobStat(head["ContentLength"], head["LastModified"].timestamp())
+
+    def read(self, key: str, start: int = 0, end: int | None = None):
+        byte_range = f"bytes={start}-{'' if end is None else end}"
+        try:
+            result = self.client.get_object(
+                Bucket=self.bucket, Key=self.prefix + key, Range=byte_range)
+        except self.client_error as e:
+            if self.missing(e):
+                raise FileNotFoundError(self.location(key))
+            raise
+        return result["Body"].read()
+
+    def write(self, key: str, source: BinaryIO, content_type: str):
+        self.client.upload_fileobj(source, self.bucket, self.prefix + key,
+                                   ExtraArgs={"ContentType": content_type})
+
+    def delete(self, key: str):
+        self.client.delete_object(Bucket=self.bucket, Key=self.prefix + key)
+
+
+def create_storage(local_dir: str, s3_prefix: str) -> ImageStorage:
+    if Config.IMAGE_STORAGE_BACKEND == "s3":
+        return S3ImageStorage(Config.IMAGE_S3_BUCKET, Config.IMAGE_S3_PREFIX + s3_prefix)
+    return LocalImageStorage(local_dir)
+
+
+# uploaded originals and their generated renditions
+image_storage = create_storage(Config.IMAGE_STORAGE_DIR, "images/")
+rendition_storage = create_storage(Config.IMAGE_RENDITION_DIR, "renditions/")
@@ -0,0 +1,56 @@
+from fastapi import HTTPException, status
+from starlette.responses import JSONResponse
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from src.config import Config
+
+# Caps the size of image upload requests (the app's multipart/form-data requests) before their body is read:
+# Starlette spools a multipart body to a temporary file while parsing the form, ahead of the route
+# (and of upload_image's own checks), so an oversized upload would be received and written to disk in full
+# Requests announcing a larger Content-Length are refused without reading the body, the others
+# (chunked) are cut off as soon as they send more than the limit
+
+
+def upload_limit():
+    return Config.MAX_IMAGE_UPLOAD_BYTES + Config.IMAGE_UPLOAD_FORM_OVERHEAD
+
+
+def too_large():
+    return HTTPException(status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+                         detail=f"Image too large. Maximum size is {Config.MAX_IMAGE_UPLOAD_BYTES} bytes.")
+
+
+class UploadLimitMiddleware:
+    # pure ASGI middleware, the body is checked as it is received
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        headers = dict(scope["headers"])
+        if not headers.get(b"content-type", b"").startswith(b"multipart/form-data"):
+            await self.app(scope, receive, send)
+            return
+
+        limit = upload_limit()
+        content_length = headers.get(b"content-length")
+        if content_length is not None and content_length.isdigit() and int(content_length) > limit:
+            error = too_large()
+            response = JSONResponse({"detail": error.detail}, status_code=error.status_code)
+            await response(scope, receive, send)
+            return
+
+        received = 0
+
+        async def receive_limited() -> Message:
+            nonlocal received
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+                if received > limit:
+                    # raised while the form is parsed, answered by the app's exception handling
+                    raise too_large()
+            return message
+
+        await self.app(scope, receive_limited, send)
@@ -0,0 +1,197 @@
+import json
+import logging
+import time
+from contextvars import ContextVar
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from src.config import Config
+from src.db.pool import pool_stats
+
+# Per route request metrics, exported in the Prometheus text format on GET /metrics:
+# latency histogram, status counts, SQL statements per request (histogram), DB time and rows fetched
+# Routes are labelled by their template (/cars/{car_id}), so the number of series stays bounded
+# Metrics are per process, with several workers each one is scraped (or summed) separately
+
+# upper bounds of the histogram buckets, the +Inf bucket is everything above
+LATENCY_BUCKETS_S = [0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10]
+STATEMENT_BUCKETS = [0, 1, 2, 3, 5, 10, 20, 50, 100]
+UNMATCHED_ROUTE = "<unmatched>"  # 404s, every unknown path would be a series of its own otherwise
+
+
+class Histogram:
+    def __init__(self, bounds: list[float]):
+        self.bounds = bounds
+        self.buckets = [0] * (len(bounds) + 1)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value: float):
+        self.count += 1
+        self.sum += value
+        for i, bound in enumerate(self.bounds):
+            if value <= bound:
+                self.buckets[i] += 1
+                return
+        self.buckets[-1] += 1
+
+    def cumulative(self):
+        # (le, count of observations <= le), as Prometheus expects
+        total = 0
+        for bound, count in zip([*map(str, self.bounds), "+Inf"], self.buckets):
+            total += count
+            yield bound, total
+
+
+class RouteStats:
+    def __init__(self):
+        self.latency = Histogram(LATENCY_BUCKETS_S)
+        self.statements = Histogram(STATEMENT_BUCKETS)
+        self.db_seconds = 0.0
+        self.db_rows = 0
+        self.responses: dict[str, int] = {}  # status code -> count
+
+
+class RequestStats:
+    # what the SQL hooks record for the request being handled
+    __slots__ = ("statements", "db_seconds", "db_rows")
+
+    def __init__(self):
+        self.statements = 0
+        self.db_seconds = 0.0
+        self.db_rows = 0
+
+
+current_request: ContextVar[RequestStats | None] = ContextVar("current_request", default=None)
+
+
+class RequestMetrics:
+    def __init__(self):
+        self.routes: dict[tuple[str, str], RouteStats] = {}  # (method, route template) -> stats
+
+    def observe(self, method: str, route: str, status: int, seconds: float, request: RequestStats):
+        stats = self.routes.get((method, route))
+        if stats is None:
+            stats = self.routes[(method, route)] = RouteStats()
+        stats.latency.observe(seconds)
+        stats.statements.observe(request.statements)
+        stats.db_seconds += request.db_seconds
+        stats.db_rows += request.db_rows
+        stats.responses[str(status)] = stats.responses.get(str(status), 0) + 1
+
+    def reset(self):
+        self.routes.clear()
+
+    def render(self):
+        lines = []
+
+        def family(name: str, kind: str, help: str):
+            lines.append(f"# HELP {name} {help}")
+            lines.append(f"# TYPE {name} {kind}")
+
+        def histogram(name: str, attribute: str):
+            for (method, route), stats in sorted(self.routes.items()):
+                histogram = getattr(stats, attribute)
+                labels = f'method="{method}",route="{escape(route)}"'
+                for le, count in histogram.cumulative():
+                    lines.append(f'{name}_bucket{{{labels},le="{le}"}} {count}')
+                lines.append(f"{name}_sum{{{labels}}} {histogram.sum:g}")
+                lines.append(f"{name}_count{{{labels}}} {histogram.count}")
+
+        family("http_request_duration_seconds", "histogram", "Request latency by route")
+        histogram("http_request_duration_seconds", "latency")
+        family("http_request_db_statements", "histogram", "SQL statements executed per request by route")
+        histogram("http_request_db_statements", "statements")
+        family("http_requests_total", "counter", "Responses by route and status code")
+        for (method, route), stats in sorted(self.routes.items()):
+            for status, count in sorted(stats.responses.items()):
+                lines.append(f'http_requests_total{{method="{method}",route="{escape(route)}",status="{status}"}} {count}')
+        family("http_request_db_seconds_total", "counter", "Time spent executing SQL statements by route")
+        for (method, route), stats in sorted(self.routes.items()):
+            lines.append(f'http_request_db_seconds_total{{method="{method}",route="{escape(route)}"}} {stats.db_seconds:g}')
+        family("http_request_db_rows_total", "counter", "Rows returned or affected by SQL statements by route")
+        for (method, route), stats in sorted(self.routes.items()):
+            lines.append(f'http_request_db_rows_total{{method="{method}",route="{escape(route)}"}} {stats.db_rows}')
+
+        family("db_pool_checkouts_total", "counter", "Connection pool checkouts")
+        lines.append(f"db_pool_checkouts_total {pool_stats.checkouts}")
+        family("db_pool_checkout_timeouts_total", "counter", "Connection pool checkouts that timed out")
+        lines.append(f"db_pool_checkout_timeouts_total {pool_stats.checkout_timeouts}")
+        family("db_pool_waiting", "gauge", "Checkouts currently waiting for a connection")
+        lines.append(f"db_pool_waiting {pool_stats.waiting}")
+        return "\n".join(lines) + "\n"
+
+
+def escape(value: str):
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+request_metrics = RequestMetrics()
+
+
+def instrument_engine(engine: Engine):
+    # count every statement run on behalf of the current request, with its time and row count
+    # (the async engine runs these hooks in the request's context, so current_request is the request's)
+    @event.listens_for(engine, "before_cursor_execute")
+    def start_statement(conn, cursor, statement, parameters, context, executemany):
+        if current_request.get() is not None:
+            conn.info.setdefault("statement_started", []).append(time.perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def end_statement(conn, cursor, statement, parameters, context, executemany):
+        request = current_request.get()
+        started = conn.info.get("statement_started")
+        if request is None or not started:
+            return
+        request.statements += 1
+        request.db_seconds += time.perf_counter() - started.pop()
+        if cursor.rowcount and cursor.rowcount > 0:
+            request.db_rows += cursor.rowcount
+
+    @event.listens_for(engine, "handle_error")
+    def failed_statement(context):
+        started = context.connection.info.get("statement_started") if context.connection is not None else None
+        if started:
+            started.pop()
+
+
+class MetricsMiddleware:
+    # pure ASGI middleware (no response buffering), the route template is known once the router has matched
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        request = RequestStats()
+        token = current_request.set(request)
+        status = 500  # unless a response is started
+        started = time.perf_counter()
+
+        async def send_with_status(message: Message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            seconds = time.perf_counter() - started
+            current_request.reset(token)
+            route = scope.get("route")
+            template = getattr(route, "path", None) or UNMATCHED_ROUTE
+            request_metrics.observe(scope["method"], template, status, seconds, request)
+            if seconds * 1000 >= Config.SLOW_REQUEST_MS or request.statements >= Config.SLOW_REQUEST_STATEMENTS:
+                logging.warning(json.dumps({
+                    "event": "slow_request",
+                    "method": scope["method"],
+                    "route": template,
+                    "path": scope["path"],
+                    "status": status,
+                    "duration_ms": round(seconds * 1000, 1),
+                    "db_statements": request.statements,
+                    "db_time_ms": round(request.db_seconds * 1000, 1),
+                    "db_rows": request.db_rows,
+                }))
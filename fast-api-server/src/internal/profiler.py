@@ -0,0 +1,287 @@
+import asyncio
+import os
+import sys
+import sysconfig
+import threading
+from collections import Counter
+from types import CodeType, FrameType
+from starlette.routing import Match
+from starlette.types import ASGIApp, Receive, Scope, Send
+from src.config import Config
+
+# Sampling profiler for a hot worker, see GET /internal/profile and /internal/profile/requests
+# A background thread reads the Python stacks every PROFILER_INTERVAL_MS (sys._current_frames), the profiled
+# code runs unchanged (no tracing hooks), the cost is the sampling thread's, a few percent of a core at most
+# - sample(seconds): what every thread of the worker runs, the event loop and the executors (passlib's hashing)
+# - capture(method, route, count): the next requests of a route only, whether they run or wait: a request that
+#   awaits (the database, an executor) is sampled in the coroutine chain it waits in, with an "[await ...]" leaf,
+#   so its profile adds up to the request's wall time (sync dependencies run in a threadpool show as that wait)
+# Profiles are collapsed stacks (flamegraph.pl, speedscope, ...) or speedscope's JSON, one at a time per worker
+
+STDLIB = sysconfig.get_paths()["stdlib"]
+SITE_PACKAGES = sysconfig.get_paths()["purelib"]
+# leaf frames of a thread waiting for work: the event loop's select, executor and threadpool workers
+IDLE_FILES = ("selectors.py", "threading.py", "queue.py")
+IDLE_FUNCTIONS = {("thread.py", "_worker")}
+
+
+class ProfilerBusy(Exception):
+    pass
+
+
+Frame = tuple[str, str, int]  # (function, file, first line)
+
+
+def code_frame(code: CodeType) -> Frame:
+    return code.co_qualname, short_path(code.co_filename), code.co_firstlineno
+
+
+def short_path(path: str):
+    for prefix in (SITE_PACKAGES, STDLIB, os.getcwd()):
+        if path.startswith(prefix + os.sep):
+            return path[len(prefix) + 1:]
+    return path
+
+
+def frame_stack(frame: FrameType | None, stop: CodeType | None = None):
+    # root first, starting at the frame running stop when given (None when no frame runs it)
+    stack: list[Frame] = []
+    while frame is not None:
+        stack.append(code_frame(frame.f_code))
+        if frame.f_code is stop:
+            break
+        frame = frame.f_back
+    else:
+        if stop is not None:
+            return None
+    stack.reverse()
+    return stack
+
+
+def coroutine_stack(coroutine):
+    # the chain of a suspended task, down to what it waits for
+    stack: list[Frame] = []
+    awaitable = coroutine
+    while awaitable is not None:
+        frame = getattr(awaitable, "cr_frame", None) or getattr(awaitable, "gi_frame", None)
+        if frame is None:
+            break
+        stack.append(code_frame(frame.f_code))
+        inner = getattr(awaitable, "cr_await", None) or getattr(awaitable, "gi_yieldfrom", None)
+        if inner is None or not (hasattr(inner, "cr_frame") or hasattr(inner, "gi_frame")):
+            stack.append((f"[await {type(inner).__name__ if inner is not None else 'loop'}]", "", 0))
+            break
+        awaitable = inner
+    return stack
+
+
+def is_idle(stack: list[Frame]):
+    _, path, _ = stack[-1]
+    name = os.path.basename(path)
+    return name in IDLE_FILES or (name, stack[-1][0]) in IDLE_FUNCTIONS
+
+
+class StackSamples:
+    def __init__(self):
+        self.counts: Counter[tuple[Frame, ...]] = Counter()
+
+    def add(self, stack):
+        self.counts[tuple(stack)] += 1
+
+    def merge(self, other: "StackSamples"):
+        self.counts.update(other.counts)
+
+    @property
+    def total(self):
+        return sum(self.counts.values())
+
+    def collapsed(self):
+        # "root;caller;callee count" per distinct stack, Brendan Gregg's folded format
+        return "".join(f"{';'.join(label(frame).replace(';', ':') for frame in stack)} {count}\n"
+                       for stack, count in self.counts.most_common())
+
+    def speedscope(self, name: str, interval_ms: float):
+        # https://www.speedscope.app/file-format-schema.json, one sampled profile weighted in milliseconds
+        frames: dict[Frame, int] = {}
+        samples, weights = [], []
+        for stack, count in self.counts.most_common():
+            samples.append([frames.setdefault(frame, len(frames)) for frame in stack])
+            weights.append(round(count * interval_ms, 3))
+        return {
+            "$schema": "https://www.speedscope.app/file-format-schema.json",
+            "name": name,
+            "exporter": "fast-api-server profiler",
+            "activeProfileIndex": 0,
+            "shared": {"frames": [{"name": function, "file": path, "line": line} if path else {"name": function}
+                                  for function, path, line in frames]},
+            "profiles": [{
+                "type": "sampled",
+                "name": name,
+                "unit": "milliseconds",
+                "startValue": 0,
+                "endValue": round(sum(weights), 3),
+                "samples": samples,
+                "weights": weights,
+            }],
+        }
+
+
+def label(frame: Frame):
+    function, path, line = frame
+    return f"{function} ({path}:{line})" if path else function
+
+
+class RequestCapture:
+    # a request being profiled, sampled from the sampler thread
+    __slots__ = ("task", "loop", "thread_id", "samples")
+
+    def __init__(self):
+        self.task = asyncio.current_task()
+        self.loop = asyncio.get_running_loop()
+        self.thread_id = threading.get_ident()
+        self.samples = StackSamples()
+
+
+class Profiler:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.busy = False
+        # the armed request capture: the (method, route template) wanted, how many more requests,
+        # their merged samples, set when enough requests were captured, the requests being sampled
+        self.samples_lock = threading.Lock()  # between the sampler thread and the requests' merges
+        self.wanted: tuple[str, str] | None = None
+        self.remaining = 0
+        self.captured = StackSamples()
+        self.done: asyncio.Event | None = None
+        self.requests: set[RequestCapture] = set()
+
+    def _start(self):
+        with self.lock:
+            if self.busy:
+                raise ProfilerBusy()
+            self.busy = True
+
+    async def _run(self, seconds: float, tick):
+        # calls tick(frames) from a thread every PROFILER_INTERVAL_MS, until seconds have passed or done is set
+        stop = threading.Event()
+
+        def sampler():
+            own = threading.get_ident()
+            interval = Config.PROFILER_INTERVAL_MS / 1000
+            while not stop.wait(interval):
+                frames = sys._current_frames()
+                frames.pop(own, None)
+                tick(frames)
+
+        thread = threading.Thread(target=sampler, name="profiler", daemon=True)
+        thread.start()
+        try:
+            if self.done is not None:
+                try:
+                    await asyncio.wait_for(self.done.wait(), seconds)
+                except asyncio.TimeoutError:
+                    pass
+            else:
+                await asyncio.sleep(seconds)
+        finally:
+            stop.set()
+            await asyncio.to_thread(thread.join)
+
+    async def sample(self, seconds: float, include_idle: bool = False):
+        # every thread, root frames are the thread names
+        self._start()
+        samples = StackSamples()
+
+        def tick(frames: dict[int, FrameType]):
+            names = {thread.ident: thread.name for thread in threading.enumerate()}
+            for thread_id, frame in frames.items():
+                stack = frame_stack(frame)
+                if stack and (include_idle or not is_idle(stack)):
+                    samples.add([(f"thread {names.get(thread_id, thread_id)}", "", 0), *stack])
+
+        try:
+            await self._run(seconds, tick)
+        finally:
+            self.busy = False
+        return samples
+
+    async def capture(self, method: str, route: str, count: int, timeout: float):
+        # the next count requests of the route, or those that came within timeout seconds
+        self._start()
+        self.captured, self.remaining = StackSamples(), count
+        self.done = asyncio.Event()
+        self.wanted = (method, route)
+
+        def tick(frames: dict[int, FrameType]):
+            with self.samples_lock:
+                for request in self.requests:
+                    coroutine = request.task.get_coro()
+                    stack = None
+                    # the task the request's loop is running (given the loop, safe from this thread)
+                    if asyncio.current_task(request.loop) is request.task:
+                        # running right now, its thread's stack from the task's coroutine on
+                        stack = frame_stack(frames.get(request.thread_id), coroutine.cr_code)
+                    if stack is None:
+                        stack = coroutine_stack(coroutine)
+                    if stack:
+                        request.samples.add(stack)
+
+        try:
+            await self._run(timeout, tick)
+        finally:
+            self.wanted, self.done = None, None
+            with self.samples_lock:
+                self.requests.clear()
+            self.busy = False
+        return self.captured, count - self.remaining
+
+    def request_started(self, scope: Scope):
+        # a RequestCapture when the request is one the armed capture wants, cheap otherwise
+        if self.wanted is None or self.remaining <= 0:
+            return None
+        method, route = self.wanted
+        if scope["method"] != method or route_template(scope) != route:
+            return None
+        request = RequestCapture()
+        with self.samples_lock:
+            self.requests.add(request)
+        return request
+
+    def request_finished(self, request: RequestCapture):
+        with self.samples_lock:
+            self.requests.discard(request)
+        if self.done is None or self.remaining <= 0:
+            return
+        self.captured.merge(request.samples)
+        self.remaining -= 1
+        if self.remaining <= 0:
+            self.done.set()
+
+
+def route_template(scope: Scope):
+    # the template the router will match, the request hasn't been routed yet
+    app = scope.get("app")
+    for route in getattr(getattr(app, "router", None), "routes", []):
+        match, _ = route.matches(scope)
+        if match == Match.FULL:
+            return getattr(route, "path", None)
+    return None
+
+
+profiler = Profiler()
+
+
+class ProfilerMiddleware:
+    # registers the requests an armed GET /internal/profile/requests wants, a passthrough otherwise
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        request = profiler.request_started(scope) if scope["type"] == "http" else None
+        if request is None:
+            await self.app(scope, receive, send)
+            return
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            profiler.request_finished(request)
@@ -0,0 +1,108 @@
+import hmac
+from fastapi import APIRouter, Cookie, Depends, HTTPException, Query, Request, status
+from fastapi.responses import JSONResponse, PlainTextResponse
+from sqlmodel.ext.asyncio.session import AsyncSession
+from src.db.main import async_engine, get_session
+from src.db.pool import InstrumentedQueuePool, pool_stats
+from src.internal.schemas import PoolStatsModel, CheckoutLatencyModel, ProfileFormat
+from src.users.JWTAuthMiddleware import JWTAuthMiddleware
+from src.users.schemas import UserModel
+from src.config import Config
+from src.internal.metrics import request_metrics
+from src.internal.profiler import ProfilerBusy, StackSamples, profiler
+
+internal_router = APIRouter(prefix="/internal")
+metrics_router = APIRouter()
+
+
+@internal_router.get("/db/pool", response_model=PoolStatsModel, status_code=status.HTTP_200_OK)
+async def get_pool_stats(user: UserModel = Depends(JWTAuthMiddleware)):
+    if not user.is_admin:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN, detail="Admin access required"
+        )
+    pool = async_engine.pool
+    assert isinstance(pool, InstrumentedQueuePool)
+    return PoolStatsModel(
+        pool_size=pool.size(),
+        max_overflow=Config.DB_MAX_OVERFLOW,
+        checked_out=pool.checkedout(),
+        checked_in=pool.checkedin(),
+        # negative while the pool hasn't opened pool_size connections yet
+        overflow=pool.overflow(),
+        waiting=pool_stats.waiting,
+        checkout_timeouts=pool_stats.checkout_timeouts,
+        checkout_latency=CheckoutLatencyModel(
+            count=pool_stats.checkouts,
+            sum_ms=pool_stats.checkout_latency_sum_ms,
+            buckets=pool_stats.histogram(),
+        ),
+    )
+
+
+def check_profiler(user: UserModel):
+    if not user.is_admin:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN, detail="Admin access required"
+        )
+    if not Config.PROFILER_ENABLED:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="The profiler is disabled (PROFILER_ENABLED)"
+        )
+
+
+def profile_response(samples: StackSamples, name: str, format: ProfileFormat, headers: dict[str, str]):
+    headers = {**headers, "X-Profile-Samples": str(samples.total)}
+    if format == ProfileFormat.speedscope:
+        return JSONResponse(samples.speedscope(name, Config.PROFILER_INTERVAL_MS), headers=headers)
+    return PlainTextResponse(samples.collapsed(), headers=headers)
+
+
+# stacks of every thread of the worker that serves this request, sampled for the given seconds
+@internal_router.get("/profile", status_code=status.HTTP_200_OK)
+async def get_profile(seconds: float = Query(10, gt=0, le=Config.PROFILER_MAX_SECONDS),
+                      format: ProfileFormat = ProfileFormat.collapsed, idle: bool = False,
+                      user: UserModel = Depends(JWTAuthMiddleware), session: AsyncSession = Depends(get_session)):
+    check_profiler(user)
+    await session.close()  # no database access while sampling, the connection goes back to the pool
+    try:
+        samples = await profiler.sample(seconds, include_idle=idle)
+    except ProfilerBusy:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="A profile is already running")
+    return profile_response(samples, f"worker, {seconds:g}s", format, {})
+
+
+# the next count requests of a route (its template, eg: /venues/{venue_id}) this worker serves,
+# or those that came within timeout seconds
+@internal_router.get("/profile/requests", status_code=status.HTTP_200_OK)
+async def get_request_profile(request: Request, route: str, method: str = "GET",
+                              count: int = Query(10, ge=1, le=Config.PROFILER_MAX_REQUESTS),
+                              timeout: float = Query(Config.PROFILER_MAX_SECONDS, gt=0, le=Config.PROFILER_MAX_SECONDS),
+                              format: ProfileFormat = ProfileFormat.collapsed,
+                              user: UserModel = Depends(JWTAuthMiddleware), session: AsyncSession = Depends(get_session)):
+    check_profiler(user)
+    method = method.upper()
+    if not any(getattr(r, "path", None) == route and method in (getattr(r, "methods", None) or ())
+               for r in request.app.routes):
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"No route {method} {route}")
+    await session.close()  # no database access while waiting, the connection goes back to the pool
+    try:
+        samples, captured = await profiler.capture(method, route, count, timeout)
+    except ProfilerBusy:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="A profile is already running")
+    return profile_response(samples, f"{method} {route}, {captured} requests", format,
+                            {"X-Profile-Requests": str(captured)})
+
+
+# Prometheus scrape endpoint, with METRICS_TOKEN as bearer token (Prometheus' authorization.credentials)
+# or, without the token, for a logged in admin
+@metrics_router.get("/metrics", response_class=PlainTextResponse, status_code=status.HTTP_200_OK)
+async def get_metrics(request: Request, access_token: str = Cookie(None), session: AsyncSession = Depends(get_session)):
+    authorization = request.headers.get("authorization", "")
+    if not (Config.METRICS_TOKEN and hmac.compare_digest(authorization, f"Bearer {Config.METRICS_TOKEN}")):
+        user = await JWTAuthMiddleware(access_token, session)
+        if not user.is_admin:
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN, detail="Admin access required"
+            )
+    return PlainTextResponse(request_metrics.render(), media_type="text/plain; version=0.0.4")
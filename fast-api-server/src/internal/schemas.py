@@ -0,0 +1,24 @@
+from enum import Enum
+from pydantic import BaseModel
+
+
+class CheckoutLatencyModel(BaseModel):
+    count: int
+    sum_ms: float
+    buckets: dict[str, int]
+
+
+class PoolStatsModel(BaseModel):
+    pool_size: int
+    max_overflow: int
+    checked_out: int
+    checked_in: int
+    overflow: int
+    waiting: int
+    checkout_timeouts: int
+    checkout_latency: CheckoutLatencyModel
+
+
+class ProfileFormat(str, Enum):
+    collapsed = "collapsed"  # folded stacks, for flamegraph.pl or speedscope
+    speedscope = "speedscope"  # speedscope's JSON file format
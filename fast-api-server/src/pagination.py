@@ -0,0 +1,122 @@
+import base64
+import json
+from datetime import date, datetime
+from enum import Enum
+from typing import Any, Sequence
+from uuid import UUID
+from fastapi import HTTPException, Query, status
+from pydantic import BaseModel
+from sqlalchemy import tuple_
+from sqlmodel.ext.asyncio.session import AsyncSession
+from src.config import Config
+from src.serialization import RawJSONResponse, dump_rows
+
+# Shared keyset pagination for the list endpoints
+# Pages are ordered by (sort column, primary key) and the cursor holds the last row's values of both,
+# so fetching page N costs the same as fetching page 1 (no OFFSET scans)
+# Response bodies stay plain JSON arrays, the next page's cursor is sent in the X-Next-Cursor header
+
+
+class PageParams:
+    def __init__(
+        self,
+        limit: int = Query(Config.PAGE_DEFAULT_LIMIT, ge=1,
+                           le=Config.PAGE_MAX_LIMIT),
+        cursor: str | None = Query(None),
+        # column to order by, prefix with "-" for descending, defaults to the primary key
+        sort: str | None = Query(None),
+        # comma separated list of response fields to keep, eg: fields=venue_id,venue_name
+        fields: str | None = Query(None),
+    ):
+        self.limit = limit
+        self.cursor = cursor
+        self.sort = sort
+        self.fields = set(field.strip()
+                          for field in fields.split(",") if field.strip()) if fields else None
+
+
+def bad_request(detail: str):
+    return HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=detail)
+
+
+def encode_cursor(values: list[Any]):
+    raw = json.dumps([value.isoformat() if isinstance(value, (date, datetime)) else str(value) if isinstance(value, UUID) else value
+                      for value in values])
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+
+def decode_value(column: Any, value: Any):
+    # the cursor comes from the client: every value has to be of its column's type, anything else is a bad cursor
+    python_type = column.type.python_type
+    if value is None:
+        return None
+    if python_type in (datetime, date, UUID) or issubclass(python_type, (str, Enum)):
+        if not isinstance(value, str):
+            raise TypeError(f"{column.key} takes a string")
+        if python_type is datetime:
+            return datetime.fromisoformat(value)
+        if python_type is date:
+            return date.fromisoformat(value)
+        return python_type(value)
+    # (json booleans are ints to isinstance, told apart here)
+    if python_type is bool and isinstance(value, bool):
+        return value
+    if python_type is int and isinstance(value, int) and not isinstance(value, bool):
+        return value
+    if python_type is float and isinstance(value, (int, float)) and not isinstance(value, bool):
+        return value
+    raise TypeError(f"{column.key} takes a {python_type.__name__}")
+
+
+def decode_cursor(cursor: str, columns: list[Any]):
+    try:
+        values = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        if not isinstance(values, list) or len(values) != len(columns):
+            raise ValueError
+        return [decode_value(column, value) for column, value in zip(columns, values)]
+    except (ValueError, TypeError, AttributeError):
+        raise bad_request("Invalid cursor")
+
+
+async def paginate(query: Any, page: PageParams, session: AsyncSession, pk: Any, sort_columns: dict[str, Any] | None = None):
+    # returns (rows, next_cursor), next_cursor is None on the last page
+    sort_columns = sort_columns or {}
+    descending = False
+    columns = [pk]
+    if page.sort:
+        name = page.sort.lstrip("-")
+        descending = page.sort.startswith("-")
+        if name not in sort_columns:
+            raise bad_request(
+                f"Cannot sort by '{name}', allowed: {', '.join(sorted(sort_columns))}")
+        columns = [sort_columns[name], pk]
+
+    if page.cursor:
+        after = decode_cursor(page.cursor, columns)
+        key = tuple_(*columns) if len(columns) > 1 else columns[0]
+        after_key = tuple_(*after) if len(after) > 1 else after[0]
+        query = query.where(key < after_key if descending else key > after_key)
+
+    query = query.order_by(
+        *[column.desc() if descending else column.asc() for column in columns]).limit(page.limit + 1)
+    result = await session.exec(query)
+    rows = result.all()
+
+    next_cursor = None
+    if len(rows) > page.limit:
+        rows = rows[:page.limit]
+        last = rows[-1]
+        next_cursor = encode_cursor(
+            [getattr(last, column.key) for column in columns])
+    return rows, next_cursor
+
+
+def page_response(rows: Sequence[Any], next_cursor: str | None, model: type[BaseModel], page: PageParams):
+    # serializes rows as the response model would (see serialization.py), trimmed to the requested fields
+    if page.fields:
+        unknown = page.fields - set(model.model_fields)
+        if unknown:
+            raise bad_request(
+                f"Unknown fields: {', '.join(sorted(unknown))}")
+    headers = {"X-Next-Cursor": next_cursor} if next_cursor else None
+    return RawJSONResponse(dump_rows(rows, model, page.fields), headers=headers)
@@ -1,20 +1,24 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, status, Request
 from sqlmodel.ext.asyncio.session import AsyncSession
-from src.db.main import get_session
+from src.db.main import get_session, get_unit_of_work
 from src.users.schemas import UserModel
 from src.promos.service import PromoService
-from src.promos.schemas import PromoModel, CreatePromoModel
+from src.promos.schemas import PromoModel, CreatePromoModel, PromoFilterModel
 from uuid import UUID
 from src.users.JWTAuthMiddleware import JWTAuthMiddleware
+from src.pagination import PageParams, page_response
+from src.catalog_cache import catalog_cache
 
 promo_router = APIRouter(prefix="/promos")
 promo_service = PromoService()
 
 
 @promo_router.get("/", response_model=list[PromoModel], status_code=status.HTTP_200_OK)
-async def get_all_promos(session: AsyncSession = Depends(get_session)):
-    promos = await promo_service.get_all_promos(session)
-    return promos
+async def get_all_promos(request: Request, page: PageParams = Depends(), filters: PromoFilterModel = Depends(), session: AsyncSession = Depends(get_session)):
+    async def build():
+        promos, next_cursor = await promo_service.get_all_promos(page, filters, session)
+        return page_response(promos, next_cursor, PromoModel, page)
+    return await catalog_cache.respond(request, "promos", build)
 
 
 @promo_router.get("/{promo_id}", response_model=PromoModel, status_code=status.HTTP_200_OK)
@@ -31,7 +35,7 @@ async def get_promo(promo_id: UUID, session: AsyncSession = Depends(get_session)
 async def create_promo(
     promo_data: CreatePromoModel,
     user: UserModel = Depends(JWTAuthMiddleware),
-    session: AsyncSession = Depends(get_session),
+    session: AsyncSession = Depends(get_unit_of_work),
 ):
     if not user.is_admin:
         raise HTTPException(
@@ -46,7 +50,7 @@ async def create_promo(
 async def delete_promo(
     promo_id: UUID,
     user: UserModel = Depends(JWTAuthMiddleware),
-    session: AsyncSession = Depends(get_session),
+    session: AsyncSession = Depends(get_unit_of_work),
 ):
     if not user.is_admin:
         raise HTTPException(
@@ -12,6 +12,11 @@ class PromoModel(BaseModel):
     
 
 
+class PromoFilterModel(BaseModel):
+    # only promos that haven't expired yet
+    active: bool | None = None
+
+
 class CreatePromoModel(BaseModel):
     promo_name: str
     # expects new dateObject.toISOString() string from JS frontend as ISO 8601
@@ -1,16 +1,27 @@
+from datetime import datetime
 from sqlmodel import select
 from sqlmodel.ext.asyncio.session import AsyncSession
+from src.catalog_cache import BOOKING_NAMESPACES, catalog_cache
+from src.db.main import after_commit, commit
 from src.db.models import Promo
 from uuid import UUID
-from src.promos.schemas import CreatePromoModel
+from src.promos.schemas import CreatePromoModel, PromoFilterModel
+from src.pagination import PageParams, paginate
+from src.quotes.prices import component_prices
 
 
 class PromoService:
-    async def get_all_promos(self, session: AsyncSession):
+    async def get_all_promos(self, page: PageParams, filters: PromoFilterModel, session: AsyncSession):
         query = select(Promo)
-        result = await session.exec(query)
-        promos = result.all()
-        return promos
+        if filters.active is True:
+            query = query.where(Promo.promo_expiry > datetime.now())
+        elif filters.active is False:
+            query = query.where(Promo.promo_expiry <= datetime.now())
+        return await paginate(query, page, session, Promo.promo_id, {
+            "promo_name": Promo.promo_name,
+            "promo_expiry": Promo.promo_expiry,
+            "promo_discount": Promo.promo_discount,
+        })
 
     async def get_promo(self, promo_id: UUID, session: AsyncSession):
         query = select(Promo).where(Promo.promo_id == promo_id)
@@ -21,7 +32,8 @@ class PromoService:
     async def create_promo(self, promo_data: CreatePromoModel, session: AsyncSession):
         new_promo = Promo(**promo_data.model_dump())
         session.add(new_promo)
-        await session.commit()
+        catalog_cache.invalidate_after_commit(session, "promos")
+        await commit(session)
         await session.refresh(new_promo)
 
         return new_promo
@@ -33,5 +45,7 @@ class PromoService:
         if not promo:
             return None
         await session.delete(promo)
-        await session.commit()
+        after_commit(session, lambda: component_prices.invalidate("promo", promo_id))
+        catalog_cache.invalidate_after_commit(session, "promos", *BOOKING_NAMESPACES)
+        await commit(session)
         return promo
@@ -0,0 +1,90 @@
+from datetime import datetime
+from typing import Any, NamedTuple
+from uuid import UUID
+from cachetools import TTLCache
+from sqlalchemy import func
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+from src.config import Config
+from src.db.models import Car, Catering, CateringMenuItem, Decoration, Dish, Promo, Venue
+
+
+class VenuePrice(NamedTuple):
+    price_per_day: int
+    capacity: int
+
+
+class PromoPrice(NamedTuple):
+    discount: float
+    expiry: datetime
+
+
+def price_query(kind: str, ids: list[UUID]) -> Any:
+    # (id, price) rows of the components of one kind
+    if kind == "venue":
+        return select(Venue.venue_id, Venue.venue_price_per_day, Venue.venue_capacity).where(
+            Venue.venue_id.in_(ids))  # type: ignore
+    if kind == "catering":
+        # cost per guest of a catering is the sum of its menu's dish costs per serving
+        return select(Catering.catering_id, func.coalesce(func.sum(Dish.dish_cost_per_serving), 0)).outerjoin(
+            CateringMenuItem, CateringMenuItem.catering_id == Catering.catering_id).outerjoin(  # type: ignore
+            Dish, Dish.dish_id == CateringMenuItem.dish_id).where(  # type: ignore
+            Catering.catering_id.in_(ids)).group_by(Catering.catering_id)  # type: ignore
+    if kind == "decoration":
+        return select(Decoration.decoration_id, Decoration.decoration_price).where(
+            Decoration.decoration_id.in_(ids))  # type: ignore
+    if kind == "car":
+        return select(Car.car_id, Car.car_rental_price).where(Car.car_id.in_(ids))  # type: ignore
+    if kind == "promo":
+        return select(Promo.promo_id, Promo.promo_discount, Promo.promo_expiry).where(
+            Promo.promo_id.in_(ids))  # type: ignore
+    raise ValueError(kind)
+
+
+def price_of(kind: str, row: Any):
+    if kind == "venue":
+        return VenuePrice(row[1], row[2])
+    if kind == "promo":
+        return PromoPrice(row[1], row[2])
+    return int(row[1])
+
+
+class ComponentPriceCache:
+    # Prices of the quote components by (kind, id): venue (price per day, capacity), catering (cost per guest),
+    # decoration, car and promo (discount, expiry), so repeated quotes of the same components are free
+    # Prices only change by deleting a component or changing a catering's menu, the services invalidate()
+    # after those commits, the TTL bounds staleness for other workers and changes made outside the app
+    # Missing components are never cached
+
+    def __init__(self):
+        self._prices: TTLCache[tuple[str, UUID], Any] = TTLCache(
+            maxsize=Config.QUOTE_PRICE_CACHE_SIZE, ttl=Config.QUOTE_PRICE_CACHE_TTL)
+
+    async def load(self, kind: str, ids: set[UUID], session: AsyncSession, use_cache: bool = True):
+        # id -> price of the existing components among ids, one query for all the uncached ones
+        prices = {}
+        missing = []
+        for id in ids:
+            price = self._prices.get((kind, id)) if use_cache else None
+            if price is None:
+                missing.append(id)
+            else:
+                prices[id] = price
+        if missing:
+            result = await session.exec(price_query(kind, missing))
+            for row in result.all():
+                prices[row[0]] = self._prices[(kind, row[0])] = price_of(kind, row)
+        return prices
+
+    def invalidate(self, kind: str, id: UUID):
+        self._prices.pop((kind, id), None)
+
+    def invalidate_kind(self, kind: str):
+        for key in [key for key in self._prices.keys() if key[0] == kind]:
+            self._prices.pop(key, None)
+
+    def clear(self):
+        self._prices.clear()
+
+
+component_prices = ComponentPriceCache()
@@ -0,0 +1,22 @@
+from fastapi import APIRouter, Depends, status
+from sqlmodel.ext.asyncio.session import AsyncSession
+from src.db.main import get_session
+from src.users.schemas import UserModel
+from src.users.JWTAuthMiddleware import JWTAuthMiddleware
+from src.quotes.service import QuoteService
+from src.quotes.schemas import QuoteBatchModel, QuoteModel, QuotePackageModel
+
+quote_router = APIRouter(prefix="/quotes")
+quote_service = QuoteService()
+
+
+# Price of one package, the total a booking of it will be stored with
+@quote_router.post("/", response_model=QuoteModel, status_code=status.HTTP_200_OK)
+async def create_quote(package: QuotePackageModel, user: UserModel = Depends(JWTAuthMiddleware), session: AsyncSession = Depends(get_session)):
+    return await quote_service.quote(package, user.user_id, session)
+
+
+# Prices of many candidate packages in one call, in request order, invalid packages carry their errors
+@quote_router.post("/batch", response_model=list[QuoteModel], status_code=status.HTTP_200_OK)
+async def create_quotes(batch: QuoteBatchModel, user: UserModel = Depends(JWTAuthMiddleware), session: AsyncSession = Depends(get_session)):
+    return await quote_service.quote_packages(batch.packages, user.user_id, session)
@@ -0,0 +1,28 @@
+from pydantic import BaseModel, Field
+from uuid import UUID
+from src.config import Config
+
+
+class QuotePackageModel(BaseModel):
+    venue_id: UUID
+    booking_guest_count: int = Field(ge=1)
+    catering_id: UUID | None = None
+    decoration_id: UUID | None = None
+    car_ids: list[UUID] = []
+    promo_id: UUID | None = None
+
+
+class QuoteBatchModel(BaseModel):
+    packages: list[QuotePackageModel] = Field(min_length=1, max_length=Config.QUOTE_MAX_BATCH)
+
+
+class QuoteModel(BaseModel):
+    venue_cost: int
+    catering_cost_per_guest: int  # sum of the catering menu's dish_cost_per_serving
+    catering_cost: int
+    decoration_cost: int
+    car_cost: int
+    total_amount: int
+    discount: float  # promo discount + loyalty discount
+    amount_due: int  # total_amount after the discount, rounded up
+    errors: list[str] = []  # why the package can't be booked (batch quotes only, a single quote fails with 400)
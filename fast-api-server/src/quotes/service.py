@@ -0,0 +1,117 @@
+import math
+from datetime import datetime
+from uuid import UUID
+from fastapi import HTTPException, status
+from sqlalchemy import func
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+from src.config import Config
+from src.db.models import Booking, CarReservation, Payment
+from src.quotes.prices import component_prices
+from src.quotes.schemas import QuoteModel, QuotePackageModel
+
+# Server side pricing of event packages, the same numbers the booking form shows:
+# venue price per day + catering cost per guest * guests + decoration + rented cars,
+# minus the promo discount and the loyalty discount for recurring customers
+# Component prices are loaded once per kind for a whole batch (see prices.py), then every package
+# is priced column by column over plain lists, so 500 packages cost 5 small queries at most
+
+
+class QuoteService:
+    async def loyalty_discount(self, user_id: UUID, session: AsyncSession, exclude_booking_id: UUID | None = None):
+        query = select(func.count()).select_from(Booking).where(Booking.user_id == user_id)
+        if exclude_booking_id is not None:
+            query = query.where(Booking.booking_id != exclude_booking_id)
+        result = await session.exec(query)  # type: ignore
+        return Config.LOYALTY_DISCOUNT if result.one() >= Config.LOYALTY_MIN_BOOKINGS else 0.0
+
+    async def quote_packages(self, packages: list[QuotePackageModel], user_id: UUID, session: AsyncSession,
+                             use_cache: bool = True, check_promo_expiry: bool = True, exclude_booking_id: UUID | None = None):
+        venues = await component_prices.load("venue", {p.venue_id for p in packages}, session, use_cache)
+        caterings = await component_prices.load(
+            "catering", {p.catering_id for p in packages if p.catering_id}, session, use_cache)
+        decorations = await component_prices.load(
+            "decoration", {p.decoration_id for p in packages if p.decoration_id}, session, use_cache)
+        cars = await component_prices.load(
+            "car", {car_id for p in packages for car_id in p.car_ids}, session, use_cache)
+        promos = await component_prices.load(
+            "promo", {p.promo_id for p in packages if p.promo_id}, session, use_cache)
+        loyalty = await self.loyalty_discount(user_id, session, exclude_booking_id)
+        now = datetime.now()
+
+        errors: list[list[str]] = [[] for _ in packages]
+        for i, p in enumerate(packages):
+            venue = venues.get(p.venue_id)
+            if venue is None:
+                errors[i].append("Venue not found")
+            elif p.booking_guest_count > venue.capacity:
+                errors[i].append("Guest count exceeds venue capacity")
+            if p.catering_id and p.catering_id not in caterings:
+                errors[i].append("Catering not found")
+            if p.decoration_id and p.decoration_id not in decorations:
+                errors[i].append("Decoration not found")
+            if any(car_id not in cars for car_id in p.car_ids):
+                errors[i].append("Car not found")
+            promo = promos.get(p.promo_id) if p.promo_id else None
+            if p.promo_id and promo is None:
+                errors[i].append("Promo not found")
+            elif promo and check_promo_expiry and promo.expiry <= now:
+                errors[i].append("Promo has expired")
+
+        # one column per component, unknown components price as 0 (those packages carry errors)
+        guests = [p.booking_guest_count for p in packages]
+        venue_costs = [venues[p.venue_id].price_per_day if p.venue_id in venues else 0 for p in packages]
+        per_guest = [caterings.get(p.catering_id, 0) if p.catering_id else 0 for p in packages]
+        catering_costs = [cost * count for cost, count in zip(per_guest, guests)]
+        decoration_costs = [decorations.get(p.decoration_id, 0) if p.decoration_id else 0 for p in packages]
+        car_costs = [sum(cars.get(car_id, 0) for car_id in p.car_ids) for p in packages]
+        totals = [sum(costs) for costs in zip(venue_costs, catering_costs, decoration_costs, car_costs)]
+        discounts = [min(1.0, round((promos[p.promo_id].discount if p.promo_id in promos else 0) + loyalty, 6))
+                     for p in packages]
+        # rounded before ceil so float noise (1000 * 0.9 = 900.0000000001) doesn't add a unit
+        amounts_due = [math.ceil(round(total * (1 - discount), 6)) for total, discount in zip(totals, discounts)]
+
+        return [QuoteModel(
+            venue_cost=venue_costs[i], catering_cost_per_guest=per_guest[i], catering_cost=catering_costs[i],
+            decoration_cost=decoration_costs[i], car_cost=car_costs[i], total_amount=totals[i],
+            discount=discounts[i], amount_due=amounts_due[i], errors=errors[i],
+        ) for i in range(len(packages))]
+
+    async def quote(self, package: QuotePackageModel, user_id: UUID, session: AsyncSession):
+        [quote] = await self.quote_packages([package], user_id, session)
+        if quote.errors:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=quote.errors[0])
+        return quote
+
+    async def price_booking(self, booking: Booking, session: AsyncSession, check_promo_expiry: bool):
+        # authoritative price of a stored (flushed) booking and its car reservations, never from the cache
+        result = await session.exec(select(CarReservation.car_id).where(
+            CarReservation.booking_id == booking.booking_id))
+        package = QuotePackageModel(
+            venue_id=booking.venue_id, booking_guest_count=booking.booking_guest_count,
+            catering_id=booking.catering_id, decoration_id=booking.decoration_id,
+            car_ids=list(result.all()), promo_id=booking.promo_id)
+        [quote] = await self.quote_packages([package], booking.user_id, session, use_cache=False,
+                                            check_promo_expiry=check_promo_expiry, exclude_booking_id=booking.booking_id)
+        if quote.errors:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=quote.errors[0])
+        return quote
+
+    async def reprice_booking(self, booking_id: UUID, session: AsyncSession):
+        # after its car reservations changed, the promo isn't checked for expiry again (valid when booked)
+        result = await session.exec(select(Booking, Payment).join(
+            Payment, Payment.booking_id == Booking.booking_id).where(Booking.booking_id == booking_id))  # type: ignore
+        row = result.first()
+        if not row:
+            return None
+        booking, payment = row
+        quote = await self.price_booking(booking, session, check_promo_expiry=False)
+        apply_quote(payment, quote)
+        return quote
+
+
+def apply_quote(payment: Payment, quote: QuoteModel):
+    # amount_payed stays what the client reported as paid
+    payment.total_amount = quote.total_amount
+    payment.discount = quote.discount
+
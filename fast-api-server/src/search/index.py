@@ -0,0 +1,464 @@
+import asyncio
+import heapq
+import logging
+import math
+import re
+import time
+import unicodedata
+from bisect import bisect_left, insort
+from dataclasses import dataclass, field
+from itertools import combinations
+from typing import Any, Callable, Iterable
+from uuid import UUID
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+from src.config import Config
+from src.db.main import async_session_factory
+from src.db.models import Car, Catering, Decoration, Dish, Venue
+
+
+# In-process inverted index of the searchable catalog (venues, caterings, dishes, cars, decorations)
+# term -> {document: weight}, every query term also matches vocabulary terms within a few typos
+# (symmetric delete lookup, no scan of the vocabulary) and the last one is matched as a prefix
+# Matching, filtering and facet counts are done on bitmasks (Python ints, one bit per document),
+# so their cost barely depends on how many documents a common term matches
+# Like the venue availability index, the services keep it in sync after their commits and it is rebuilt
+# from the database once older than SEARCH_INDEX_TTL seconds, in the background while the old one keeps serving
+
+KINDS = ("venue", "catering", "dish", "car", "decoration")
+FACETS = ("kind", "price_band", "capacity", "dish_type", "car_year")
+
+NAME_WEIGHT = 3.0
+TEXT_WEIGHT = 1.0
+PREFIX_FACTOR = 0.8
+TYPO_FACTOR = 0.6
+MAX_EXPANSIONS = 50  # vocabulary terms a single prefix/typo may expand to
+MASK_CACHE_MIN_POSTINGS = 256
+
+
+def tokenize(text: str | None):
+    if not text:
+        return []
+    # case and accent insensitive: "Café" and "cafe" are the same term
+    text = unicodedata.normalize("NFKD", text.casefold())
+    text = "".join(char for char in text if not unicodedata.combining(char))
+    return re.findall(r"[^\W_]+", text)
+
+
+def max_typos(term: str):
+    # short terms have too many neighbours to be fuzzy
+    if len(term) >= 9:
+        return 2
+    if len(term) >= 5:
+        return 1
+    return 0
+
+
+def deletes(term: str, distance: int):
+    # the term with up to `distance` characters removed
+    variants = {term}
+    for n in range(1, min(distance, len(term) - 1) + 1):
+        for positions in combinations(range(len(term)), n):
+            variants.add("".join(char for i, char in enumerate(term) if i not in positions))
+    return variants
+
+
+def edit_distance(a: str, b: str):
+    # optimal string alignment distance (a transposition counts as one edit)
+    previous2: list[int] = []
+    previous = list(range(len(b) + 1))
+    for i in range(1, len(a) + 1):
+        current = [i] + [0] * len(b)
+        for j in range(1, len(b) + 1):
+            cost = 0 if a[i - 1] == b[j - 1] else 1
+            current[j] = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + cost)
+            if i > 1 and j > 1 and a[i - 1] == b[j - 2] and a[i - 2] == b[j - 1]:
+                current[j] = min(current[j], previous2[j - 2] + 1)
+        previous2, previous = previous, current
+    return previous[len(b)]
+
+
+def bucket(value: int | None, bounds: list[int]):
+    # label of the [bound, next bound) range holding value, eg: "100-499", "5000+"
+    if value is None:
+        return None
+    lower = 0
+    for bound in bounds:
+        if value < bound:
+            return f"{lower}-{bound - 1}"
+        lower = bound
+    return f"{lower}+"
+
+
+@dataclass(eq=False, slots=True)
+class SearchDocument:
+    kind: str
+    id: UUID
+    name: str
+    description: str | None
+    image: str | None
+    price: int | None
+    capacity: int | None = None
+    dish_type: str | None = None
+    car_year: int | None = None
+    text: str | None = None  # searchable text besides name/description (eg: a car's year)
+    facets: dict[str, str] = field(default_factory=dict)
+    terms: dict[str, float] = field(default_factory=dict)
+    ordinal: int = -1  # set by SearchSnapshot.put
+
+    def __post_init__(self):
+        for term in tokenize(self.name):
+            self.terms[term] = self.terms.get(term, 0) + NAME_WEIGHT
+        for term in tokenize(self.description) + tokenize(self.text):
+            self.terms[term] = self.terms.get(term, 0) + TEXT_WEIGHT
+        values = {
+            "kind": self.kind,
+            "price_band": bucket(self.price, Config.SEARCH_PRICE_BANDS),
+            "capacity": bucket(self.capacity, Config.SEARCH_CAPACITY_BUCKETS),
+            "dish_type": self.dish_type,
+            "car_year": None if self.car_year is None else str(self.car_year),
+        }
+        self.facets = {name: value for name, value in values.items() if value is not None}
+
+
+# builders of the indexed documents, from ORM objects or from the rows selected by load()
+def venue_document(row: Any):
+    return SearchDocument("venue", row.venue_id, row.venue_name, row.venue_address, row.venue_image,
+                          row.venue_price_per_day, capacity=row.venue_capacity)
+
+
+def catering_document(row: Any):
+    return SearchDocument("catering", row.catering_id, row.catering_name, row.catering_description,
+                          row.catering_image, None)
+
+
+def dish_document(row: Any):
+    return SearchDocument("dish", row.dish_id, row.dish_name, row.dish_description, row.dish_image,
+                          row.dish_cost_per_serving, dish_type=row.dish_type.value)
+
+
+def car_document(row: Any):
+    return SearchDocument("car", row.car_id, f"{row.car_make} {row.car_model}", None, row.car_image,
+                          row.car_rental_price, car_year=row.car_year, text=str(row.car_year))
+
+
+def decoration_document(row: Any):
+    return SearchDocument("decoration", row.decoration_id, row.decoration_name, row.decoration_description,
+                          row.decoration_image, row.decoration_price)
+
+
+SOURCES: list[tuple[list[Any], Callable[[Any], SearchDocument]]] = [
+    ([Venue.venue_id, Venue.venue_name, Venue.venue_address, Venue.venue_image,
+      Venue.venue_price_per_day, Venue.venue_capacity], venue_document),
+    ([Catering.catering_id, Catering.catering_name, Catering.catering_description,
+      Catering.catering_image], catering_document),
+    ([Dish.dish_id, Dish.dish_name, Dish.dish_description, Dish.dish_image,
+      Dish.dish_cost_per_serving, Dish.dish_type], dish_document),
+    ([Car.car_id, Car.car_make, Car.car_model, Car.car_image, Car.car_rental_price, Car.car_year], car_document),
+    ([Decoration.decoration_id, Decoration.decoration_name, Decoration.decoration_description,
+      Decoration.decoration_image, Decoration.decoration_price], decoration_document),
+]
+
+
+class SearchSnapshot:
+    # documents get ordinals (their bit in every mask), assigned in name order by a rebuild so equally
+    # scored hits come out alphabetically, documents added since the last rebuild come after them
+    def __init__(self):
+        self.documents: dict[tuple[str, UUID], SearchDocument] = {}
+        self.slots: list[SearchDocument | None] = []  # ordinal -> document, None once removed
+        self.postings: dict[str, dict[int, float]] = {}  # term -> {ordinal: weight}
+        self.facet_postings: dict[str, dict[str, set[int]]] = {name: {} for name in FACETS}
+        self.vocabulary: list[str] = []  # sorted, for prefix matches
+        # term with up to max_typos(term) characters deleted -> terms, a query term and a vocabulary
+        # term are within the typo budget only if some of their deletes are equal
+        self.neighbours: dict[str, list[str]] = {}
+        # masks of the larger postings, dropped whenever one of their documents changes
+        self._masks: dict[tuple[str, ...], Any] = {}
+
+    def put(self, document: SearchDocument, keep_sorted: bool = True):
+        self.remove(document.kind, document.id)
+        document.ordinal = len(self.slots)
+        self.slots.append(document)
+        self.documents[(document.kind, document.id)] = document
+        for term, weight in document.terms.items():
+            postings = self.postings.get(term)
+            if postings is None:
+                postings = self.postings[term] = {}
+                self._add_term(term, keep_sorted)
+            postings[document.ordinal] = weight
+        for name, value in document.facets.items():
+            self.facet_postings[name].setdefault(value, set()).add(document.ordinal)
+        self._forget_masks(document)
+
+    def remove(self, kind: str, id: UUID):
+        document = self.documents.pop((kind, id), None)
+        if document is None:
+            return
+        # emptied terms stay in the vocabulary until the next rebuild, lookups skip them
+        self.slots[document.ordinal] = None
+        for term in document.terms:
+            self.postings[term].pop(document.ordinal, None)
+        for name, value in document.facets.items():
+            self.facet_postings[name][value].discard(document.ordinal)
+        self._forget_masks(document)
+
+    def _add_term(self, term: str, keep_sorted: bool):
+        if keep_sorted:
+            insort(self.vocabulary, term)
+        else:
+            self.vocabulary.append(term)
+        for variant in deletes(term, max_typos(term)):
+            self.neighbours.setdefault(variant, []).append(term)
+
+    def _forget_masks(self, document: SearchDocument):
+        if not self._masks:
+            return
+        self._masks.pop(("all",), None)
+        for term in document.terms:
+            self._masks.pop(("term", term), None)
+        for name, value in document.facets.items():
+            self._masks.pop(("facet", name, value), None)
+
+    def to_mask(self, ordinals: Iterable[int]):
+        bits = bytearray(len(self.slots) // 8 + 1)
+        for ordinal in ordinals:
+            bits[ordinal >> 3] |= 1 << (ordinal & 7)
+        return int.from_bytes(bits, "little")
+
+    def _cached(self, key: tuple[str, ...], size: int, build: Callable[[], Any]):
+        # small postings are cheap to turn into masks, caching them would only cost memory
+        if size < MASK_CACHE_MIN_POSTINGS:
+            return build()
+        if key not in self._masks:
+            self._masks[key] = build()
+        return self._masks[key]
+
+    def all_mask(self):
+        return self._cached(("all",), len(self.documents),
+                            lambda: self.to_mask(document.ordinal for document in self.documents.values()))
+
+    def facet_mask(self, name: str, value: str):
+        ordinals = self.facet_postings[name].get(value, set())
+        return self._cached(("facet", name, value), len(ordinals), lambda: self.to_mask(ordinals))
+
+    def term_masks(self, term: str):
+        # [(weight, mask of the documents with that weight for the term)]
+        postings = self.postings[term]
+
+        def build():
+            by_weight: dict[float, list[int]] = {}
+            for ordinal, weight in postings.items():
+                by_weight.setdefault(weight, []).append(ordinal)
+            return [(weight, self.to_mask(ordinals)) for weight, ordinals in by_weight.items()]
+        return self._cached(("term", term), len(postings), build)
+
+    def expand(self, term: str, prefix: bool):
+        # vocabulary terms matching a query term -> score factor
+        matches: dict[str, float] = {}
+        if self.postings.get(term):
+            matches[term] = 1.0
+        if prefix:
+            i = bisect_left(self.vocabulary, term)
+            while i < len(self.vocabulary) and len(matches) < MAX_EXPANSIONS and self.vocabulary[i].startswith(term):
+                if self.postings.get(self.vocabulary[i]):
+                    matches.setdefault(self.vocabulary[i], PREFIX_FACTOR)
+                i += 1
+        typos = max_typos(term)
+        if typos:
+            candidates = {candidate for variant in deletes(term, typos)
+                          for candidate in self.neighbours.get(variant, ())}
+            for candidate in candidates:
+                if len(matches) >= MAX_EXPANSIONS:
+                    break
+                if candidate not in matches and self.postings.get(candidate) \
+                        and edit_distance(term, candidate) <= min(typos, max_typos(candidate)):
+                    matches[candidate] = TYPO_FACTOR
+        return matches
+
+    def tiers(self, term: str, prefix: bool):
+        # [(score, mask)] of a query term, best score first, masks disjoint:
+        # a document is in the tier of the best scoring vocabulary term it matched
+        scores: dict[float, int] = {}
+        for candidate, factor in self.expand(term, prefix).items():
+            idf = math.log(1 + len(self.documents) / len(self.postings[candidate]))
+            for weight, mask in self.term_masks(candidate):
+                score = round(weight * idf * factor, 4)
+                scores[score] = scores.get(score, 0) | mask
+        tiers = []
+        seen = 0
+        for score in sorted(scores, reverse=True):
+            mask = scores[score] & ~seen
+            if mask:
+                tiers.append((score, mask))
+                seen |= mask
+        return tiers
+
+
+def first_ordinals(mask: int, count: int):
+    # the lowest `count` set bits of mask
+    bits = bin(mask)[:1:-1]
+    ordinals = []
+    position = bits.find("1")
+    while position != -1 and len(ordinals) < count:
+        ordinals.append(position)
+        position = bits.find("1", position + 1)
+    return ordinals
+
+
+class CatalogSearchIndex:
+    def __init__(self):
+        self._snapshot = SearchSnapshot()
+        self._loaded_at: float | None = None
+        self._loading = False
+        self._reload: asyncio.Task | None = None
+        # changes made while a rebuild is in flight, replayed on top of the new snapshot
+        self._pending: list[tuple[str, Any]] = []
+
+    def is_stale(self):
+        return self._loaded_at is None or time.monotonic() - self._loaded_at > Config.SEARCH_INDEX_TTL
+
+    async def load(self, session: AsyncSession):
+        self._loading = True
+        self._pending = []
+        try:
+            rows = []
+            for columns, build in SOURCES:
+                result = await session.exec(select(*columns))
+                rows.append((result.all(), build))
+            # tokenizing the whole catalog takes a while, keep it off the event loop
+            snapshot = await asyncio.to_thread(self._build, rows)
+            for op, value in self._pending:
+                self._apply(snapshot, op, value)
+            self._snapshot = snapshot
+            self._loaded_at = time.monotonic()
+        finally:
+            self._loading = False
+            self._pending = []
+
+    @staticmethod
+    def _build(sources: list[tuple[list[Any], Callable[[Any], SearchDocument]]]):
+        snapshot = SearchSnapshot()
+        documents = [build(row) for rows, build in sources for row in rows]
+        documents.sort(key=lambda document: (document.name.casefold(), document.id))
+        for document in documents:
+            snapshot.put(document, keep_sorted=False)
+        snapshot.vocabulary.sort()
+        return snapshot
+
+    async def ensure_fresh(self, session: AsyncSession):
+        if self._loaded_at is None and not self._loading:
+            await self.load(session)
+        elif self.is_stale() and not self._loading:
+            # rebuilt in the background with a session of its own, the current snapshot keeps serving
+            self._loading = True
+            self._reload = asyncio.create_task(self._background_load())
+
+    async def _background_load(self):
+        try:
+            async with async_session_factory() as session:
+                await self.load(session)
+        except Exception as e:
+            logging.error(f"Search index rebuild failed: {e}")
+            self._loaded_at = time.monotonic()  # retried after another TTL
+        finally:
+            self._loading = False
+
+    def put(self, document: SearchDocument):
+        self._record("put", document)
+
+    def put_many(self, documents: list[SearchDocument]):
+        # bulk imports: the new terms are sorted into the vocabulary once, not one insort each
+        if self._loading:
+            self._pending += [("put", document) for document in documents]
+        for document in documents:
+            self._snapshot.put(document, keep_sorted=False)
+        self._snapshot.vocabulary.sort()
+
+    def remove(self, kind: str, id: UUID):
+        self._record("remove", (kind, id))
+
+    def _record(self, op: str, value: Any):
+        if self._loading:
+            self._pending.append((op, value))
+        self._apply(self._snapshot, op, value)
+
+    @staticmethod
+    def _apply(snapshot: SearchSnapshot, op: str, value: Any):
+        if op == "put":
+            snapshot.put(value)
+        else:
+            snapshot.remove(*value)
+
+    def search(self, query: str, filters: dict[str, set[str]], limit: int, offset: int):
+        # returns (total, [(document, score)], facets), documents have to match every query term
+        snapshot = self._snapshot
+        terms = list(dict.fromkeys(tokenize(query)))
+        term_tiers = [snapshot.tiers(term, prefix=i == len(terms) - 1) for i, term in enumerate(terms)]
+        matched = snapshot.all_mask()
+        for tiers in term_tiers:
+            term_mask = 0
+            for _, mask in tiers:
+                term_mask |= mask
+            matched &= term_mask
+
+        filter_masks = {}
+        for name, allowed in filters.items():
+            mask = 0
+            for value in allowed:
+                mask |= snapshot.facet_mask(name, value)
+            filter_masks[name] = mask
+        hits = matched
+        for mask in filter_masks.values():
+            hits &= mask
+
+        # facet counts are disjunctive: each facet is counted with every filter applied except its own,
+        # so selecting a value doesn't hide the other values of the same facet
+        facets: dict[str, dict[str, int]] = {}
+        for name in FACETS:
+            base = matched
+            for other, mask in filter_masks.items():
+                if other != name:
+                    base &= mask
+            counts = {}
+            if base:
+                for value in snapshot.facet_postings[name]:
+                    count = (base & snapshot.facet_mask(name, value)).bit_count()
+                    if count:
+                        counts[value] = count
+            facets[name] = counts
+
+        return hits.bit_count(), self._rank(snapshot, term_tiers, hits, offset + limit)[offset:], facets
+
+    @staticmethod
+    def _rank(snapshot: SearchSnapshot, term_tiers: list[list[tuple[float, int]]], hits: int, count: int):
+        # best `count` hits without scoring them one by one: a hit's score is the sum of its tier scores,
+        # so tier combinations are visited best first and their hits taken in ordinal (name) order
+        if not term_tiers:
+            return [(snapshot.slots[ordinal], 0.0) for ordinal in first_ordinals(hits, count)]
+        term_tiers = [[(score, mask & hits) for score, mask in tiers if mask & hits] for tiers in term_tiers]
+        if not hits or not all(term_tiers):
+            return []
+        ranked = []
+        start = (0,) * len(term_tiers)
+        heap = [(-sum(tiers[0][0] for tiers in term_tiers), start)]
+        seen = {start}
+        while heap and len(ranked) < count:
+            score, combination = heapq.heappop(heap)
+            mask = hits
+            for tiers, i in zip(term_tiers, combination):
+                mask &= tiers[i][1]
+                if not mask:
+                    break
+            for ordinal in first_ordinals(mask, count - len(ranked)) if mask else ():
+                ranked.append((snapshot.slots[ordinal], round(-score, 4)))
+            for t, tiers in enumerate(term_tiers):
+                if combination[t] + 1 < len(tiers):
+                    following = combination[:t] + (combination[t] + 1,) + combination[t + 1:]
+                    if following not in seen:
+                        seen.add(following)
+                        heapq.heappush(heap, (score + tiers[combination[t]][0] - tiers[combination[t] + 1][0],
+                                              following))
+        return ranked
+
+
+catalog_search_index = CatalogSearchIndex()
@@ -0,0 +1,22 @@
+from fastapi import APIRouter, Depends, Query, status
+from sqlmodel.ext.asyncio.session import AsyncSession
+from src.db.main import get_session
+from src.search.service import SearchService
+from src.search.schemas import SearchFilterModel, SearchResultModel
+from src.config import Config
+
+search_router = APIRouter(prefix="/search")
+search_service = SearchService()
+
+
+# Ranked, typo tolerant search over venues, caterings, dishes, cars and decorations, with facet counts
+# eg: /search?q=garden wedding&kind=venue&capacity=100-249
+@search_router.get("/", response_model=SearchResultModel, status_code=status.HTTP_200_OK)
+async def search(
+    q: str = Query("", max_length=200),
+    filters: SearchFilterModel = Depends(),
+    limit: int = Query(Config.PAGE_DEFAULT_LIMIT, ge=1, le=Config.PAGE_MAX_LIMIT),
+    offset: int = Query(0, ge=0, le=10000),
+    session: AsyncSession = Depends(get_session),
+):
+    return await search_service.search(q, filters, limit, offset, session)
@@ -0,0 +1,30 @@
+from pydantic import BaseModel
+from uuid import UUID
+
+
+class SearchFilterModel(BaseModel):
+    # comma separated facet values, eg: kind=venue,car&price_band=100-499
+    kind: str | None = None
+    price_band: str | None = None
+    capacity: str | None = None
+    dish_type: str | None = None
+    car_year: str | None = None
+
+
+class SearchHitModel(BaseModel):
+    kind: str  # venue, catering, dish, car or decoration
+    id: UUID
+    name: str
+    description: str | None
+    image: str | None
+    price: int | None
+    capacity: int | None
+    dish_type: str | None
+    car_year: int | None
+    score: float
+
+
+class SearchResultModel(BaseModel):
+    total: int
+    hits: list[SearchHitModel]
+    facets: dict[str, dict[str, int]]  # facet -> value -> number of matches
@@ -0,0 +1,27 @@
+from fastapi import HTTPException, status
+from sqlmodel.ext.asyncio.session import AsyncSession
+from src.search.index import KINDS, catalog_search_index
+from src.search.schemas import SearchFilterModel, SearchHitModel, SearchResultModel
+
+
+class SearchService:
+    def parse_filters(self, filters: SearchFilterModel):
+        parsed: dict[str, set[str]] = {}
+        for name, value in filters.model_dump().items():
+            if value:
+                parsed[name] = {part.strip().lower() for part in value.split(",") if part.strip()}
+        unknown = parsed.get("kind", set()) - set(KINDS)
+        if unknown:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST,
+                                detail=f"Unknown kind: {', '.join(sorted(unknown))}, allowed: {', '.join(KINDS)}")
+        return parsed
+
+    async def search(self, query: str, filters: SearchFilterModel, limit: int, offset: int, session: AsyncSession):
+        parsed = self.parse_filters(filters)
+        await catalog_search_index.ensure_fresh(session)
+        total, hits, facets = catalog_search_index.search(query, parsed, limit, offset)
+        return SearchResultModel(total=total, facets=facets, hits=[SearchHitModel(
+            kind=document.kind, id=document.id, name=document.name, description=document.description,
+            image=document.image, price=document.price, capacity=document.capacity,
+            dish_type=document.dish_type, car_year=document.car_year, score=round(score, 4),
+        ) for document, score in hits])
@@ -0,0 +1,94 @@
+import json
+import types
+import typing
+from functools import lru_cache
+from typing import Any, Callable, Sequence
+from fastapi import Response
+from pydantic import BaseModel
+from pydantic_core import to_json
+from src.config import Config
+
+# Response serialization of the read endpoints
+# Running rows just loaded from the database through the response models (model_validate(from_attributes)
+# + model_dump + json.dumps) re-checks data that is already valid and is where most of a large list's CPU goes.
+# compile_serializer() walks a response model once and builds a function that only reads the model's fields
+# off the ORM object (nested models and lists of them included, Field(exclude=True) fields left out),
+# the dicts it makes are then encoded to bytes by pydantic_core's JSON encoder
+# RESPONSE_SERIALIZATION="validate" switches back to validating every row
+
+
+class RawJSONResponse(Response):
+    # body is already encoded JSON
+    media_type = "application/json"
+
+
+def model_of(annotation: Any):
+    # the response model inside X, X | None and list[X]; (model, is_list) or None for plain values
+    origin = typing.get_origin(annotation)
+    if origin in (typing.Union, types.UnionType):
+        args = [arg for arg in typing.get_args(annotation) if arg is not type(None)]
+        return model_of(args[0]) if len(args) == 1 else None
+    if origin is list:
+        args = typing.get_args(annotation)
+        inner = model_of(args[0]) if args else None
+        return (inner[0], True) if inner and not inner[1] else None
+    if isinstance(annotation, type) and issubclass(annotation, BaseModel):
+        return annotation, False
+    return None
+
+
+def as_int(value: Any):
+    # what validation did for int fields backed by float columns (4.0 -> 4)
+    return int(value) if isinstance(value, float) and value.is_integer() else value
+
+
+@lru_cache(maxsize=None)
+def compile_serializer(model: type[BaseModel]) -> Callable[[Any], dict]:
+    plan = []
+    for name, field in model.model_fields.items():
+        if field.exclude:
+            continue
+        convert = None
+        nested = model_of(field.annotation)
+        if nested:
+            serialize = compile_serializer(nested[0])
+            if nested[1]:
+                def convert(value, serialize=serialize):
+                    return [serialize(item) for item in value]
+            else:
+                def convert(value, serialize=serialize):
+                    return None if value is None else serialize(value)
+        elif field.annotation is int:
+            convert = as_int
+        plan.append((name, convert, field.is_required(), field.get_default(call_default_factory=True)))
+
+    def serialize(row: Any):
+        # loaded ORM attributes sit in the instance __dict__, reading them there skips the attribute instrumentation
+        loaded = getattr(row, "__dict__", {})
+        data = {}
+        for name, convert, required, default in plan:
+            if name in loaded:
+                value = loaded[name]
+            else:
+                value = getattr(row, name) if required else getattr(row, name, default)
+            data[name] = value if convert is None else convert(value)
+        return data
+    return serialize
+
+
+def dump_rows(rows: Sequence[Any], model: type[BaseModel], fields: set[str] | None = None) -> bytes:
+    if Config.RESPONSE_SERIALIZATION == "validate":
+        return dump_rows_validated(rows, model, fields)
+    serialize = compile_serializer(model)
+    content = [serialize(row) for row in rows]
+    if fields:
+        content = [{name: value for name, value in item.items() if name in fields}
+                   for item in content]
+    return to_json(content)
+
+
+def dump_rows_validated(rows: Sequence[Any], model: type[BaseModel], fields: set[str] | None = None) -> bytes:
+    # validates rows against the response model like response_model would
+    content = [model.model_validate(row, from_attributes=True).model_dump(mode="json", include=fields)
+               for row in rows]
+    return json.dumps(content, ensure_ascii=False, allow_nan=False, separators=(",", ":")).encode()
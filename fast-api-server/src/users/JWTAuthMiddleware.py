@@ -1,9 +1,12 @@
+from uuid import UUID
 from fastapi import Depends, HTTPException, status, Cookie
 import jwt
 
 from src.config import Config
 from src.db.main import get_session
 from src.users.service import UserService
+from src.users.schemas import UserModel
+from src.users.principal_cache import principal_cache
 from sqlmodel.ext.asyncio.session import AsyncSession
 
 user_service = UserService()
@@ -20,9 +23,22 @@ async def JWTAuthMiddleware(access_token: str = Cookie(None), session: AsyncSess
         # Decode and verify the JWT token
         payload = jwt.decode(access_token, Config.JWT_SECRET, algorithms=[
                              Config.JWT_ALGORITHM])  # necessary to pass algo here
-        user = await user_service.get_user(payload.get("user_id"), session)
+        user_id = UUID(payload.get("user_id"))
+
+        # the claims are signed, so when trusted the request needs no database access at all
+        if Config.JWT_TRUST_CLAIMS and "is_admin" in payload:
+            return UserModel(user_id=user_id, username=payload["username"], email=payload["email"],
+                             password_hash="", is_admin=payload["is_admin"])
+
+        principal = principal_cache.get(user_id)
+        if principal:
+            return principal
+
+        user = await user_service.get_user(user_id, session)
         if user:
-            return user
+            principal = UserModel.model_validate(user, from_attributes=True)
+            principal_cache.set(principal)
+            return principal
         raise Exception("User not found")
 
     except Exception as e:
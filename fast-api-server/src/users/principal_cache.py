@@ -0,0 +1,29 @@
+from uuid import UUID
+from cachetools import TTLCache
+from src.config import Config
+from src.users.schemas import UserModel
+
+
+class PrincipalCache:
+    # Authenticated users by user_id, so JWTAuthMiddleware doesn't query the user on every request
+    # Entries are plain UserModel copies (not ORM objects) so they can be shared between sessions
+    # Anything changing a user must call invalidate(), the TTL bounds staleness for changes made outside the app
+
+    def __init__(self):
+        self._users: TTLCache[UUID, UserModel] = TTLCache(
+            maxsize=Config.PRINCIPAL_CACHE_SIZE, ttl=Config.PRINCIPAL_CACHE_TTL)
+
+    def get(self, user_id: UUID):
+        return self._users.get(user_id)
+
+    def set(self, user: UserModel):
+        self._users[user.user_id] = user
+
+    def invalidate(self, user_id: UUID):
+        self._users.pop(user_id, None)
+
+    def clear(self):
+        self._users.clear()
+
+
+principal_cache = PrincipalCache()
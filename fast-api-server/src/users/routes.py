@@ -1,12 +1,13 @@
 from fastapi import APIRouter, Depends, HTTPException, status, Response
-from src.db.main import get_session
+from src.db.main import get_session, get_unit_of_work
 from sqlmodel.ext.asyncio.session import AsyncSession
 from src.users.service import UserService
-from src.users.schemas import CreateUserModel, UserModel, LoginUserModel
+from src.users.schemas import CreateUserModel, UserModel, LoginUserModel, UserFilterModel
 from uuid import UUID
 from .utils import verify_password, create_access_token
 from src.config import Config
 from .JWTAuthMiddleware import JWTAuthMiddleware
+from src.pagination import PageParams, page_response
 
 user_router = APIRouter(prefix="/users")
 user_service = UserService()
@@ -19,13 +20,13 @@ user_service = UserService()
 
 
 @user_router.get("/", response_model=list[UserModel], status_code=status.HTTP_200_OK)
-async def get_all_users(user: UserModel = Depends(JWTAuthMiddleware), session: AsyncSession = Depends(get_session)):
+async def get_all_users(page: PageParams = Depends(), filters: UserFilterModel = Depends(), user: UserModel = Depends(JWTAuthMiddleware), session: AsyncSession = Depends(get_session)):
     if not user.is_admin:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN, detail="Admin access required"
         )
-    users = await user_service.get_all_users(session)
-    return users
+    users, next_cursor = await user_service.get_all_users(page, filters, session)
+    return page_response(users, next_cursor, UserModel, page)
 
 
 @user_router.get("/me", response_model=UserModel, status_code=status.HTTP_200_OK)
@@ -34,12 +35,12 @@ async def get_current_user(user: UserModel = Depends(JWTAuthMiddleware), session
 
 
 @user_router.post("/signup", response_model=UserModel, status_code=status.HTTP_201_CREATED)
-async def create_user(response: Response, user_data: CreateUserModel, session: AsyncSession = Depends(get_session)):
+async def create_user(response: Response, user_data: CreateUserModel, session: AsyncSession = Depends(get_unit_of_work)):
     if not await user_service.get_user_by_email(user_data.email, session):
         user = await user_service.create_user(user_data, session)
         response.set_cookie(
             key="access_token",
-            value=create_access_token(user.user_id),
+            value=create_access_token(user),
             httponly=True,  # Secure the cookie from JavaScript access
             max_age=int(Config.ACCESS_TOKEN_EXPIRY),
             samesite="lax"
@@ -51,18 +52,22 @@ async def create_user(response: Response, user_data: CreateUserModel, session: A
 
 
 @user_router.post("/login", response_model=UserModel, status_code=status.HTTP_200_OK)
-async def login_user(response: Response, user_data: LoginUserModel, session: AsyncSession = Depends(get_session)):
+async def login_user(response: Response, user_data: LoginUserModel, session: AsyncSession = Depends(get_unit_of_work)):
     user = await user_service.get_user_by_email(user_data.email, session)
     if not user:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND,
                             detail=f"User does not exist")
-    if not verify_password(user_data.password, user.password_hash):
+    is_valid, new_hash = await verify_password(user_data.password, user.password_hash)
+    if not is_valid:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED,
                             detail="Incorrect username or password")
+    if new_hash:
+        # BCRYPT_ROUNDS changed since this password was hashed
+        await user_service.update_password_hash(user, new_hash, session)
 
     response.set_cookie(
         key="access_token",
-        value=create_access_token(user.user_id),
+        value=create_access_token(user),
         httponly=True,  # Secure the cookie from JavaScript access
         max_age=int(Config.ACCESS_TOKEN_EXPIRY),
         samesite="lax"
@@ -11,6 +11,10 @@ class UserModel(BaseModel):  # this is the response model
 
  
 
+class UserFilterModel(BaseModel):
+    is_admin: bool | None = None
+
+
 class CreateUserModel(BaseModel):
     username: str
     email: str
@@ -1,18 +1,24 @@
 from sqlmodel import select
 from sqlmodel.ext.asyncio.session import AsyncSession
+from src.db.main import after_commit, commit
 from src.db.models import User
-from src.users.schemas import CreateUserModel
+from src.users.schemas import CreateUserModel, UserFilterModel
+from src.pagination import PageParams, paginate
 from uuid import UUID
 from .utils import generate_passwd_hash
+from .principal_cache import principal_cache
 
 
 class UserService:
 
-    async def get_all_users(self,  session: AsyncSession):
+    async def get_all_users(self, page: PageParams, filters: UserFilterModel, session: AsyncSession):
         s = select(User)
-        result = await session.exec(s)
-        users = result.all()
-        return users
+        if filters.is_admin is not None:
+            s = s.where(User.is_admin == filters.is_admin)
+        return await paginate(s, page, session, User.user_id, {
+            "username": User.username,
+            "email": User.email,
+        })
 
     async def get_user(self, user_id: UUID, session: AsyncSession):
         s = select(User).where(User.user_id == user_id)
@@ -26,12 +32,18 @@ class UserService:
 
         new_user = User(**user_data.model_dump())
 
-        new_user.password_hash = generate_passwd_hash(user_data.password)
+        new_user.password_hash = await generate_passwd_hash(user_data.password)
         session.add(new_user)
         # transaction, so can perform multiple actions, and commit all at once
-        await session.commit()
+        await commit(session)
         return new_user
 
+    async def update_password_hash(self, user: User, password_hash: str, session: AsyncSession):
+        user.password_hash = password_hash
+        after_commit(session, lambda: principal_cache.invalidate(user.user_id))
+        await commit(session)
+        return user
+
     async def get_user_by_email(self, email: str, session: AsyncSession):
         statement = select(User).where(User.email == email)
 
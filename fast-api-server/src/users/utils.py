@@ -1,30 +1,44 @@
+import asyncio
 import uuid
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
 
 import jwt
 from passlib.context import CryptContext
 
 from src.config import Config
+from src.db.models import User
 
-passwd_context = CryptContext(schemes=["bcrypt"])
+passwd_context = CryptContext(
+    schemes=["bcrypt"], bcrypt__rounds=Config.BCRYPT_ROUNDS)
 
+# bcrypt takes tens of milliseconds of CPU per call (and releases the GIL while doing it),
+# so it runs on these threads instead of blocking the event loop,
+# max_workers caps how many hashes run at once, the rest wait in the executor queue
+hashing_executor = ThreadPoolExecutor(
+    max_workers=Config.PASSWORD_HASH_WORKERS, thread_name_prefix="passwd-hash")
 
-def generate_passwd_hash(password: str) -> str:
-    hash = passwd_context.hash(password)
-    return hash
 
+async def generate_passwd_hash(password: str) -> str:
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(hashing_executor, passwd_context.hash, password)
 
-def verify_password(password: str, hash: str) -> bool:
-    return passwd_context.verify(password, hash)
+
+async def verify_password(password: str, hash: str) -> tuple[bool, str | None]:
+    # returns (is_valid, new_hash), new_hash is set when the stored hash
+    # uses another cost than BCRYPT_ROUNDS and should be replaced
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(hashing_executor, passwd_context.verify_and_update, password, hash)
 
 
 def create_access_token(
     # we are not implementing refresh tokens
-    user_id: uuid.UUID
+    user: User
 ):
-
+    # username, email and is_admin are signed claims so JWTAuthMiddleware can trust them (see Config.JWT_TRUST_CLAIMS)
     token = jwt.encode(
-        payload={"user_id": str(user_id), "exp": datetime.now() + timedelta(seconds=float(Config.ACCESS_TOKEN_EXPIRY)), "jti": str(uuid.uuid4())}, key=Config.JWT_SECRET
+        payload={"user_id": str(user.user_id), "username": user.username, "email": user.email, "is_admin": user.is_admin,
+                 "exp": datetime.now() + timedelta(seconds=float(Config.ACCESS_TOKEN_EXPIRY)), "jti": str(uuid.uuid4())}, key=Config.JWT_SECRET
     )
 
     return token
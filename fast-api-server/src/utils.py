@@ -1,44 +1,171 @@
-import os
-from uuid import uuid4
-from fastapi import UploadFile, HTTPException
-import shutil
+import asyncio
+import hashlib
+import mimetypes
+from contextvars import ContextVar
+from typing import BinaryIO
+from fastapi import UploadFile, HTTPException, status
 from pathlib import Path
+from sqlalchemy import func, union_all
+from sqlalchemy.dialects.postgresql import insert
+from sqlmodel import delete, select, update
+from sqlmodel.ext.asyncio.session import AsyncSession
+from starlette.concurrency import run_in_threadpool
+from src.config import Config
+from src.db.main import after_commit, async_session_factory
+from src.db.models import Car, Catering, Decoration, Dish, ImageBlob, Venue
+from src.images.cache import hot_image_cache
+from src.images.renditions import RENDER_ERRORS, delete_renditions, generate_renditions
+from src.images.storage import image_storage
 
+# file signatures ("magic bytes") of the allowed image types and the extension stored for each
+IMAGE_SIGNATURES = [
+    (b"\xff\xd8\xff", ".jpg"),
+    (b"\x89PNG\r\n\x1a\n", ".png"),
+    (b"GIF87a", ".gif"),
+    (b"GIF89a", ".gif"),
+]
 
-async def upload_image(image_file: UploadFile | None, upload_dir: str = "images"):
-    # Restrict allowed file types
+IMAGE_COLUMNS = [Venue.venue_image, Car.car_image, Dish.dish_image,
+                 Catering.catering_image, Decoration.decoration_image]
+
+# blob deletions running in the background, referenced here until they finish
+blob_deletions: set[asyncio.Task] = set()
+
+# the images uploaded by the current request, by image name: acquire_image stores the blob again from
+# them when a deletion removed it after upload_image found it already stored
+request_uploads: ContextVar[dict[str, BinaryIO] | None] = ContextVar("request_uploads", default=None)
+
+
+def sniff_image_extension(head: bytes):
+    for signature, extension in IMAGE_SIGNATURES:
+        if head.startswith(signature):
+            return extension
+    if head[:4] == b"RIFF" and head[8:12] == b"WEBP":
+        return ".webp"
+    return None
+
+
+def store_upload(source: BinaryIO):
+    # Runs on a worker thread: reads the upload in chunks, checking its type and size as it goes,
+    # and stores it named by the sha256 of its content so identical images are stored once
+    # Returns the image name and whether a new blob was written
+    source.seek(0)
+    digest = hashlib.sha256()
+    size = 0
+    extension = None
+    while chunk := source.read(Config.IMAGE_UPLOAD_CHUNK_SIZE):
+        if extension is None:
+            extension = sniff_image_extension(chunk)
+            if extension is None:
+                break
+        size += len(chunk)
+        if size > Config.MAX_IMAGE_UPLOAD_BYTES:
+            raise HTTPException(
+                status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+                detail=f"Image too large. Maximum size is {Config.MAX_IMAGE_UPLOAD_BYTES} bytes."
+            )
+        digest.update(chunk)
+    if extension is None:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid file type. Only JPEG, WEBP, PNG, and GIF are allowed."
+        )
+    image_name = digest.hexdigest() + extension
+    if image_storage.exists(image_name):
+        return image_name, False  # same image already stored
+    write_blob(image_name, source)
+    return image_name, True
+
+
+def write_blob(image_name: str, source: BinaryIO):
+    source.seek(0)
+    image_storage.write(image_name, source, mimetypes.guess_type(image_name)[0] or "application/octet-stream")
+
+
+def lock_image(image_name: str):
+    # Held until the end of the transaction, serializes taking a reference to an image (acquire_image)
+    # with deleting its blob (delete_blob)
+    return select(func.pg_advisory_xact_lock(func.hashtext(image_name)))
+
+
+async def upload_image(image_file: UploadFile | None):
     if image_file is None:
         return None
-    allowed_types = {"image/jpeg", "image/webp", "image/png", "image/gif"}
-    if image_file.content_type not in allowed_types:
+    # reject early when the client told us the size
+    if image_file.size is not None and image_file.size > Config.MAX_IMAGE_UPLOAD_BYTES:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=f"Image too large. Maximum size is {Config.MAX_IMAGE_UPLOAD_BYTES} bytes."
+        )
+
+    # the file type is taken from the content, not from the client's content_type/filename
+    image_name, created = await run_in_threadpool(store_upload, image_file.file)
+    try:
+        await generate_renditions(image_name)
+    except RENDER_ERRORS:
+        if created:
+            await run_in_threadpool(image_storage.delete, image_name)
         raise HTTPException(
-            status_code=400, detail="Invalid file type. Only JPEG, PNG, and GIF are allowed."
+            status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid image file."
         )
+    # the blob is only referenced once the row using it is saved, see acquire_image
+    request_uploads.set({**(request_uploads.get() or {}), image_name: image_file.file})
+    return image_name
 
-    # Create upload directory(images) if not exists
-    Path(upload_dir).mkdir(parents=True, exist_ok=True)
 
-    # Generate unique file name
-    file_extension = Path(
-        image_file.filename).suffix if image_file.filename else ""
+async def acquire_image(image: str | None, session: AsyncSession):
+    # count one more row using the image, call it in the transaction that saves the row
+    if not image:
+        return
+    image_name = Path(image).name
+    statement = insert(ImageBlob).values(image_name=image_name, ref_count=1).on_conflict_do_update(
+        index_elements=[ImageBlob.image_name], set_={"ref_count": ImageBlob.ref_count + 1})
+    await session.exec(statement)  # type: ignore
+    # a deletion of the blob that started before the reference finishes first, and deletions that
+    # start later wait for the commit and find the reference
+    await session.exec(lock_image(image_name))
+    source = (request_uploads.get() or {}).get(image_name)
+    if source is not None and not await run_in_threadpool(image_storage.exists, image_name):
+        # deleted since upload_image found it stored
+        await run_in_threadpool(write_blob, image_name, source)
+        await generate_renditions(image_name)
 
-    # Generate a random UUID for the file name
-    # Append the extension to the UUID
-    file_name = str(uuid4()) + file_extension
 
-    # Create the full file path
-    file_path = Path(upload_dir) / file_name
-    # Save the file to the server
-    with file_path.open("wb") as buffer:
-        shutil.copyfileobj(image_file.file, buffer)
+async def delete_image(image: str | None, session: AsyncSession):
+    # count one row less using the image, the blob (and its renditions) is deleted after the commit
+    # that drops the last reference
+    if not image:
+        return
+    image_name = Path(image).name
+    result = await session.exec(update(ImageBlob).where(ImageBlob.image_name == image_name).values(  # type: ignore
+        ref_count=ImageBlob.ref_count - 1).returning(ImageBlob.ref_count))
+    ref_count = result.scalar_one_or_none()
+    if ref_count is None:
+        # stored before references were counted, check the rows still using it
+        # (the row being deleted is still counted here)
+        references = union_all(*[select(column).where(column == image)
+                               for column in IMAGE_COLUMNS]).subquery()
+        result = await session.exec(select(func.count()).select_from(references))
+        if result.one() > 1:
+            return
+    elif ref_count > 0:
+        return
+    else:
+        await session.exec(delete(ImageBlob).where(ImageBlob.image_name == image_name))  # type: ignore
 
-    return file_name
+    def schedule_blob_deletion():
+        task = asyncio.get_running_loop().create_task(delete_blob(image_name))
+        blob_deletions.add(task)
+        task.add_done_callback(blob_deletions.discard)
+    after_commit(session, schedule_blob_deletion)
 
 
-async def delete_image(image: str):
-    if image:
-        # Extract image name from the URL
-        image_name = Path(image).name
-        image_path = Path("images") / image_name
-        if image_path.exists():
-            os.remove(image_path)  # Delete the file
+async def delete_blob(image_name: str):
+    async with async_session_factory() as session:
+        await session.exec(lock_image(image_name))
+        # the same image may have been uploaded and referenced again since
+        if await session.get(ImageBlob, image_name):
+            return
+        hot_image_cache.invalidate(image_storage, image_name)
+        await run_in_threadpool(image_storage.delete, image_name)
+        await delete_renditions(image_name)
+        await session.commit()
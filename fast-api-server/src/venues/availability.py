@@ -0,0 +1,87 @@
+import time
+from bisect import bisect_left, bisect_right, insort
+from datetime import date
+from uuid import UUID
+from sqlalchemy import func
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+from src.db.models import Booking
+from src.config import Config
+
+
+class VenueAvailabilityIndex:
+    # In-process mirror of the unique_venue_reservation_day index:
+    # venue_id -> sorted list of reserved days (as date ordinals), so a range lookup is two bisects
+    # Bookings are kept in sync by BookingService, anything else (cascading deletes, other workers)
+    # is picked up by reloading the index once it is older than AVAILABILITY_INDEX_TTL seconds
+
+    def __init__(self):
+        self._reserved: dict[UUID, list[int]] = {}
+        self._loaded_at: float | None = None
+        self._loading = False
+        # changes made while a reload query is in flight, replayed on top of the fresh snapshot
+        self._pending: list[tuple[str, UUID, int]] = []
+
+    def is_stale(self):
+        return self._loaded_at is None or time.monotonic() - self._loaded_at > Config.AVAILABILITY_INDEX_TTL
+
+    async def load(self, session: AsyncSession):
+        self._loading = True
+        self._pending = []
+        try:
+            query = select(Booking.venue_id, func.date(Booking.booking_event_date))
+            result = await session.exec(query)
+            reserved: dict[UUID, list[int]] = {}
+            for venue_id, day in result.all():
+                reserved.setdefault(venue_id, []).append(day.toordinal())
+            for days in reserved.values():
+                days.sort()
+            for op, venue_id, day in self._pending:
+                self._apply(reserved, op, venue_id, day)
+            self._reserved = reserved
+            self._loaded_at = time.monotonic()
+        finally:
+            self._loading = False
+            self._pending = []
+
+    async def ensure_fresh(self, session: AsyncSession):
+        if self.is_stale() and not self._loading:
+            await self.load(session)
+
+    def add(self, venue_id: UUID, day: date):
+        self._record("add", venue_id, day.toordinal())
+
+    def remove(self, venue_id: UUID, day: date):
+        self._record("remove", venue_id, day.toordinal())
+
+    def discard_venue(self, venue_id: UUID):
+        self._reserved.pop(venue_id, None)
+
+    def reserved_days(self, venue_id: UUID, from_date: date, to_date: date):
+        # reserved days of a venue in [from_date, to_date]
+        days = self._reserved.get(venue_id)
+        if not days:
+            return []
+        lo = bisect_left(days, from_date.toordinal())
+        hi = bisect_right(days, to_date.toordinal())
+        return [date.fromordinal(day) for day in days[lo:hi]]
+
+    def _record(self, op: str, venue_id: UUID, day: int):
+        if self._loading:
+            self._pending.append((op, venue_id, day))
+        self._apply(self._reserved, op, venue_id, day)
+
+    @staticmethod
+    def _apply(reserved: dict[UUID, list[int]], op: str, venue_id: UUID, day: int):
+        days = reserved.setdefault(venue_id, [])
+        i = bisect_left(days, day)
+        present = i < len(days) and days[i] == day
+        if op == "add" and not present:
+            insort(days, day)
+        elif op == "remove" and present:
+            days.pop(i)
+        if not days:
+            del reserved[venue_id]
+
+
+venue_availability_index = VenueAvailabilityIndex()
@@ -0,0 +1,42 @@
+from sqlalchemy import func
+from sqlalchemy.dialects.postgresql import insert
+from sqlmodel import select, update
+from sqlmodel.ext.asyncio.session import AsyncSession
+from src.db.models import VenueRatingSummary, VenueReview
+
+# Incremental upkeep of venue_rating_summary, called in the same transaction as the review insert/delete
+# Single atomic statements (no read-modify-write), concurrent reviews of one venue don't lose updates
+
+
+def rating_star(rating: float):
+    return min(5, max(1, round(rating)))
+
+
+async def add_rating(review: VenueReview, session: AsyncSession):
+    star = f"rating_{rating_star(review.venue_rating)}"
+    summary = VenueRatingSummary.__table__.c  # type: ignore
+    statement = insert(VenueRatingSummary).values(
+        venue_id=review.venue_id, rating_count=1, rating_sum=review.venue_rating,
+        latest_review_at=review.venue_review_created_at, **{star: 1},
+    ).on_conflict_do_update(index_elements=[summary.venue_id], set_={
+        "rating_count": summary.rating_count + 1,
+        "rating_sum": summary.rating_sum + review.venue_rating,
+        star: summary[star] + 1,
+        "latest_review_at": func.greatest(summary.latest_review_at, review.venue_review_created_at),
+    })
+    await session.exec(statement)  # type: ignore
+
+
+async def remove_rating(review: VenueReview, session: AsyncSession):
+    # the review has to be deleted (flushed) already, latest_review_at is taken from the remaining ones
+    star = f"rating_{rating_star(review.venue_rating)}"
+    summary = VenueRatingSummary.__table__.c  # type: ignore
+    latest = select(func.max(VenueReview.venue_review_created_at)).where(
+        VenueReview.venue_id == review.venue_id).scalar_subquery()
+    await session.exec(update(VenueRatingSummary).where(VenueRatingSummary.venue_id == review.venue_id).values(  # type: ignore
+        {
+            summary.rating_count: summary.rating_count - 1,
+            summary.rating_sum: summary.rating_sum - review.venue_rating,
+            summary[star]: summary[star] - 1,
+            summary.latest_review_at: latest,
+        }))
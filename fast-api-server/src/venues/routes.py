@@ -1,22 +1,65 @@
-from fastapi import APIRouter, Depends, File, Form, HTTPException, UploadFile, status
+from datetime import date
+from fastapi import APIRouter, Depends, File, Form, HTTPException, Query, UploadFile, status, Request
 from sqlmodel.ext.asyncio.session import AsyncSession
-from src.db.main import get_session
+from src.db.main import get_session, get_unit_of_work
 from src.users.schemas import UserModel
 from src.venues.service import VenueService
-from src.venues.schemas import VenueModel, CreateVenueModel, VenueReviewModel, CreateVenueReviewModel
+from src.venues.schemas import VenueModel, CreateVenueModel, VenueReviewModel, CreateVenueReviewModel, VenueAvailabilityModel, VenueFilterModel
 from uuid import UUID
 from src.users.JWTAuthMiddleware import JWTAuthMiddleware
 from src.utils import upload_image
 from src.config import Config
+from src.pagination import PageParams, page_response
+from src.catalog_cache import catalog_cache
 
 venue_router = APIRouter(prefix="/venues")
 venue_service = VenueService()
 
 
 @venue_router.get("/", response_model=list[VenueModel], status_code=status.HTTP_200_OK)
-async def get_all_venues(session: AsyncSession = Depends(get_session)):
-    venues = await venue_service.get_all_venues(session)
-    return venues
+async def get_all_venues(request: Request, page: PageParams = Depends(), filters: VenueFilterModel = Depends(), session: AsyncSession = Depends(get_session)):
+    async def build():
+        venues, next_cursor = await venue_service.get_all_venues(page, filters, session)
+        return page_response(venues, next_cursor, VenueModel, page)
+    return await catalog_cache.respond(request, "venues", build)
+
+
+def validate_availability_range(from_date: date, to_date: date):
+    if to_date < from_date:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST,
+                            detail="'to' must not be before 'from'")
+    if (to_date - from_date).days + 1 > Config.AVAILABILITY_MAX_DAYS:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST,
+                            detail=f"Availability range cannot exceed {Config.AVAILABILITY_MAX_DAYS} days")
+
+
+# Availability of many venues in one call (all venues if no venue_ids are given)
+# must stay above /{venue_id} so "availability" isn't parsed as a venue id
+@venue_router.get("/availability", response_model=list[VenueAvailabilityModel], status_code=status.HTTP_200_OK)
+async def get_venues_availability(
+    from_date: date = Query(..., alias="from"),
+    to_date: date = Query(..., alias="to"),
+    venue_ids: list[UUID] | None = Query(None),
+    session: AsyncSession = Depends(get_session),
+):
+    validate_availability_range(from_date, to_date)
+    existing_ids = await venue_service.get_venue_ids(venue_ids, session)
+    return await venue_service.get_availability(list(existing_ids), from_date, to_date, session)
+
+
+@venue_router.get("/{venue_id}/availability", response_model=VenueAvailabilityModel, status_code=status.HTTP_200_OK)
+async def get_venue_availability(
+    venue_id: UUID,
+    from_date: date = Query(..., alias="from"),
+    to_date: date = Query(..., alias="to"),
+    session: AsyncSession = Depends(get_session),
+):
+    validate_availability_range(from_date, to_date)
+    if not await venue_service.get_venue_ids([venue_id], session):
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND,
+                            detail="Venue not found")
+    availability = await venue_service.get_availability([venue_id], from_date, to_date, session)
+    return availability[0]
 
 
 @venue_router.get("/{venue_id}", response_model=VenueModel, status_code=status.HTTP_200_OK)
@@ -29,10 +72,12 @@ async def get_venue(venue_id: UUID, session: AsyncSession = Depends(get_session)
 
 
 @venue_router.get("/reviews/{venue_id}", response_model=list[VenueReviewModel], status_code=status.HTTP_200_OK)
-async def get_venue_reviews(venue_id: UUID, session: AsyncSession = Depends(get_session)):
-    reviews = await venue_service.get_venue_reviews(venue_id, session)
-    if reviews is not None:
-        return reviews
+async def get_venue_reviews(venue_id: UUID, page: PageParams = Depends(), session: AsyncSession = Depends(get_session)):
+    page.sort = page.sort or "-venue_review_created_at"  # newest first
+    result = await venue_service.get_venue_reviews(venue_id, page, session)
+    if result is not None:
+        reviews, next_cursor = result
+        return page_response(reviews, next_cursor, VenueReviewModel, page)
     raise HTTPException(status_code=status.HTTP_404_NOT_FOUND,
                         detail="Venue not found")
 
@@ -43,7 +88,7 @@ async def create_review(
     venue_review_data: CreateVenueReviewModel,
     # This will give us the user details
     user: UserModel = Depends(JWTAuthMiddleware),
-    session: AsyncSession = Depends(get_session)
+    session: AsyncSession = Depends(get_unit_of_work)
 ):
     if user.is_admin:  # only users can submit reviews
         raise HTTPException(
@@ -56,7 +101,7 @@ async def create_review(
 async def delete_venue_review(
     venue_review_id: UUID,
     user: UserModel = Depends(JWTAuthMiddleware),
-    session: AsyncSession = Depends(get_session),
+    session: AsyncSession = Depends(get_unit_of_work),
 ):
     if user.is_admin:
         raise HTTPException(
@@ -76,7 +121,7 @@ async def create_venue(
     venue_price_per_day: int = Form(..., ge=0),
     venue_image: UploadFile | None = File(None),  # Handle image file upload
     user: UserModel = Depends(JWTAuthMiddleware),
-    session: AsyncSession = Depends(get_session),
+    session: AsyncSession = Depends(get_unit_of_work),
 ):
     if not user.is_admin:
         raise HTTPException(
@@ -102,7 +147,7 @@ async def create_venue(
 async def delete_venue(
     venue_id: UUID,
     user: UserModel = Depends(JWTAuthMiddleware),
-    session: AsyncSession = Depends(get_session),
+    session: AsyncSession = Depends(get_unit_of_work),
 ):
     if not user.is_admin:
         raise HTTPException(
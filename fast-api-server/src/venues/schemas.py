@@ -1,6 +1,6 @@
 from pydantic import BaseModel, Field
 import uuid
-from datetime import datetime
+from datetime import date, datetime
 from src.users.schemas import UserModel
 
 
@@ -18,6 +18,13 @@ class CreateVenueReviewModel(BaseModel):
     venue_review_text: str
 
 
+class VenueRatingSummaryModel(BaseModel):
+    rating_count: int
+    rating_average: float | None  # None until the first review
+    rating_histogram: dict[int, int]  # star (1-5) -> number of reviews
+    latest_review_at: datetime | None
+
+
 class VenueModel(BaseModel):
     venue_id: uuid.UUID
     venue_name: str
@@ -25,7 +32,14 @@ class VenueModel(BaseModel):
     venue_capacity: int = Field(ge=1)
     venue_price_per_day: int = Field(ge=0)
     venue_image: str | None
-    venue_reviews: list[VenueReviewModel]
+    venue_rating_summary: VenueRatingSummaryModel | None
+
+
+class VenueFilterModel(BaseModel):
+    min_price: int | None = None
+    max_price: int | None = None
+    min_capacity: int | None = None
+    max_capacity: int | None = None
 
 
 class CreateVenueModel(BaseModel):
@@ -34,3 +48,12 @@ class CreateVenueModel(BaseModel):
     venue_capacity: int = Field(ge=1)
     venue_price_per_day: int = Field(ge=0)
     venue_image: str | None
+
+
+class VenueAvailabilityModel(BaseModel):
+    venue_id: uuid.UUID
+    from_date: date
+    to_date: date
+    reserved_dates: list[date]
+    held_dates: list[date] = []  # set aside for a customer checking out (see /holds), not available either
+    available_dates: list[date]
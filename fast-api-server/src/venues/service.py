@@ -1,29 +1,44 @@
+from datetime import date, timedelta
 from sqlmodel import select
 from sqlmodel.ext.asyncio.session import AsyncSession
-from src.db.models import Venue, VenueReview
-from src.venues.schemas import CreateVenueModel, CreateVenueReviewModel
+from src.catalog_cache import BOOKING_NAMESPACES, catalog_cache
+from src.db.main import after_commit, commit
+from src.db.models import Venue, VenueRatingSummary, VenueReview
+from src.venues.schemas import CreateVenueModel, CreateVenueReviewModel, VenueAvailabilityModel, VenueFilterModel
 from uuid import UUID
-from src.utils import delete_image
+from src.utils import acquire_image, delete_image
+from src.venues.availability import venue_availability_index
+from src.venues.ratings import add_rating, remove_rating
+from src.search.index import catalog_search_index, venue_document
+from src.quotes.prices import component_prices
+from src.db.loading import load_profile
+from src.pagination import PageParams, paginate
+from src.holds.service import HoldService
 
 
-class VenueService:
-    async def get_all_venues(self, session: AsyncSession):
-        query = select(Venue)
-        result = await session.exec(query)
-        venues = result.all()
-        new_venues = []
-        for venue in venues:
-            # need to add array
-            await session.refresh(venue, ["venue_reviews"])
+hold_service = HoldService()
 
-            for review in venue.venue_reviews:
-                await session.refresh(review, ["user"])
 
-            new_venues.append(venue)
-        return new_venues
+class VenueService:
+    async def get_all_venues(self, page: PageParams, filters: VenueFilterModel, session: AsyncSession):
+        query = select(Venue).options(*load_profile("venue.card"))
+        if filters.min_price is not None:
+            query = query.where(Venue.venue_price_per_day >= filters.min_price)
+        if filters.max_price is not None:
+            query = query.where(Venue.venue_price_per_day <= filters.max_price)
+        if filters.min_capacity is not None:
+            query = query.where(Venue.venue_capacity >= filters.min_capacity)
+        if filters.max_capacity is not None:
+            query = query.where(Venue.venue_capacity <= filters.max_capacity)
+        return await paginate(query, page, session, Venue.venue_id, {
+            "venue_name": Venue.venue_name,
+            "venue_capacity": Venue.venue_capacity,
+            "venue_price_per_day": Venue.venue_price_per_day,
+        })
 
     async def get_venue(self, venue_id: UUID, session: AsyncSession):
-        query = select(Venue).where(Venue.venue_id == venue_id)
+        query = select(Venue).where(Venue.venue_id == venue_id).options(
+            *load_profile("venue.detail"))
         result = await session.exec(query)
         venue = result.first()
         return venue if venue else None
@@ -31,9 +46,12 @@ class VenueService:
     async def create_venue(self, venue_data: CreateVenueModel, session: AsyncSession):
         new_venue = Venue(**venue_data.model_dump())
         session.add(new_venue)
-        await session.commit()
-        await session.refresh(new_venue)
-        return new_venue
+        new_venue.venue_rating_summary = VenueRatingSummary()  # no reviews yet
+        await acquire_image(new_venue.venue_image, session)
+        after_commit(session, lambda: catalog_search_index.put(venue_document(new_venue)))
+        catalog_cache.invalidate_after_commit(session, "venues")
+        await commit(session)
+        return await self.get_venue(new_venue.venue_id, session)
 
     async def delete_venue(self, venue_id: UUID, session: AsyncSession):
 
@@ -42,16 +60,26 @@ class VenueService:
         venue = results.first()
         if not venue:
             return None
-        await delete_image(venue.venue_image)
+        await delete_image(venue.venue_image, session)
         await session.delete(venue)
-        await session.commit()
+        # the venue's bookings are gone with it (on delete cascade)
+        after_commit(
+            session, lambda: venue_availability_index.discard_venue(venue_id))
+        after_commit(session, lambda: catalog_search_index.remove("venue", venue_id))
+        after_commit(session, lambda: component_prices.invalidate("venue", venue_id))
+        catalog_cache.invalidate_after_commit(session, "venues", *BOOKING_NAMESPACES)
+        await commit(session)
         return venue
 
-    async def get_venue_reviews(self, venue_id: UUID, session: AsyncSession):
-        venue = await self.get_venue(venue_id, session)
-        if venue:
-            return venue.venue_reviews
-        return None
+    async def get_venue_reviews(self, venue_id: UUID, page: PageParams, session: AsyncSession):
+        if not await self.get_venue_ids([venue_id], session):
+            return None
+        query = select(VenueReview).where(VenueReview.venue_id == venue_id).options(
+            *load_profile("venue_review.full"))
+        return await paginate(query, page, session, VenueReview.venue_review_id, {
+            "venue_review_created_at": VenueReview.venue_review_created_at,
+            "venue_rating": VenueReview.venue_rating,
+        })
 
     async def create_review(self, venue_id: UUID, user_id: UUID, venue_review_data: CreateVenueReviewModel, session: AsyncSession):
         # Create a new venue review
@@ -59,11 +87,15 @@ class VenueService:
             **venue_review_data.model_dump(), venue_id=venue_id, user_id=user_id)
         # Add the review to the session and commit the transaction
         session.add(new_review)
-        await session.commit()
-        # Refresh the instance to get the updated data
-        await session.refresh(new_review)
-
-        return new_review
+        await session.flush()  # fills in venue_review_created_at
+        await add_rating(new_review, session)
+        catalog_cache.invalidate_after_commit(session, "venues")
+        await commit(session)
+        # Load the review again to get the reviewing user also
+        query = select(VenueReview).where(VenueReview.venue_review_id == new_review.venue_review_id).options(
+            *load_profile("venue_review.full"))
+        result = await session.exec(query)
+        return result.first()
 
     async def delete_review(self, venue_review_id: UUID, session: AsyncSession):
 
@@ -74,5 +106,40 @@ class VenueService:
         if not venue_review:
             return None
         await session.delete(venue_review)
-        await session.commit()
+        await session.flush()
+        await remove_rating(venue_review, session)
+        catalog_cache.invalidate_after_commit(session, "venues")
+        await commit(session)
         return venue_review
+
+    async def get_venue_ids(self, venue_ids: list[UUID] | None, session: AsyncSession):
+        # only the ids, so checking which venues exist doesn't load any venue rows/relationships
+        query = select(Venue.venue_id)
+        if venue_ids:
+            query = query.where(Venue.venue_id.in_(venue_ids))  # type: ignore
+        result = await session.exec(query)
+        return result.all()
+
+    async def get_availability(self, venue_ids: list[UUID], from_date: date, to_date: date, session: AsyncSession):
+        # answered from the in-process occupancy index, no query per venue or per date,
+        # and one query for the holds in the range (short lived, so not mirrored)
+        await venue_availability_index.ensure_fresh(session)
+        held = await hold_service.get_held_days(from_date, to_date, session)
+        all_days = [from_date + timedelta(days=i)
+                    for i in range((to_date - from_date).days + 1)]
+        availability = []
+        for venue_id in venue_ids:
+            reserved = venue_availability_index.reserved_days(
+                venue_id, from_date, to_date)
+            reserved_set = set(reserved)
+            held_set = held.get(venue_id, set()) - reserved_set
+            availability.append(VenueAvailabilityModel(
+                venue_id=venue_id,
+                from_date=from_date,
+                to_date=to_date,
+                reserved_dates=reserved,
+                held_dates=sorted(held_set),
+                available_dates=[
+                    day for day in all_days if day not in reserved_set and day not in held_set],
+            ))
+        return availability
@@ -25,7 +25,7 @@ import SettingsIcon from "@mui/icons-material/Settings";
 import CloseIcon from "@mui/icons-material/Close";
 import AutorenewIcon from "@mui/icons-material/Autorenew";
 import { useQuery, useQueryClient } from "react-query";
-import api from "@/services/apiService";
+import api, { getAllPages } from "@/services/apiService";
 import { AdminBookingModel, CarReservationModel, PaymentModel } from "@/types";
 import AvatarProfile from "@/components/AvatarProfile";
 import PageLoader from "@/components/PageLoader";
@@ -65,7 +65,7 @@ const Bookings = () => {
   const { data: bookings } = useQuery(
     ["bookings", "me"],
     async (): Promise<AdminBookingModel[]> => {
-      const { data } = await api.get("/bookings/me");
+      const data = await getAllPages("/bookings/me");
       const localpayments: { booking_id: string; payment: PaymentModel }[] = [];
       /* eslint-disable @typescript-eslint/no-explicit-any */
       const bookingPromises = data.map(async (booking: any) => {
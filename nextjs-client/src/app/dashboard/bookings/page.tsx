@@ -23,7 +23,7 @@ import DoneIcon from "@mui/icons-material/Done";
 import CloseIcon from "@mui/icons-material/Close";
 import AutorenewIcon from "@mui/icons-material/Autorenew";
 import { useQuery, useQueryClient } from "react-query";
-import api from "@/services/apiService";
+import api, { getAllPages } from "@/services/apiService";
 import { AdminBookingModel, CarReservationModel, PaymentModel } from "@/types";
 
 const paginationModel = { page: 0, pageSize: 5 };
@@ -59,7 +59,7 @@ export default function Bookings() {
   const { data: bookings } = useQuery(
     ["bookings"],
     async (): Promise<AdminBookingModel[]> => {
-      const { data } = await api.get("/bookings");
+      const data = await getAllPages("/bookings");
       const localpayments: { booking_id: string; payment: PaymentModel }[] = [];
       /* eslint-disable @typescript-eslint/no-explicit-any */
       const bookingPromises = data.map(async (booking: any) => {
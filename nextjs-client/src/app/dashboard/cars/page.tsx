@@ -16,14 +16,14 @@ import {
 import AddIcon from "@mui/icons-material/Add";
 
 import Grid from "@mui/material/Grid2";
-import api from "@/services/apiService";
+import api, { getAllPages } from "@/services/apiService";
 import { useMutation, useQuery, useQueryClient } from "react-query";
 import { CarModel } from "@/types";
 import DeleteForeverIcon from "@mui/icons-material/DeleteForever";
 import CreateCarForm from "@/components/CreateCarForm";
 
 const fetchCars = async (): Promise<CarModel[]> => {
-  const { data } = await api.get("/cars");
+  const data = await getAllPages("/cars");
   return data;
 };
 
@@ -113,7 +113,7 @@ const Cars = () => {
                   Rental Price: ${car.car_rental_price} / day
                 </Typography>
                 <Typography variant="body2" color="text.secondary">
-                  Quantity Available: {car.car_quantity}
+                  Quantity: {car.car_quantity}
                 </Typography>
               </CardContent>
             </Card>
@@ -20,7 +20,7 @@ import {
 } from "@mui/material";
 import AddIcon from "@mui/icons-material/Add";
 import Grid from "@mui/material/Grid2";
-import api from "@/services/apiService";
+import api, { getAllPages } from "@/services/apiService";
 import { CateringModel, DishModel } from "@/types"; // Update import to CateringModel
 import DeleteForeverIcon from "@mui/icons-material/DeleteForever";
 import CreateCateringForm from "@/components/CreateCateringForm"; // Update to create catering form
@@ -28,7 +28,7 @@ import { useMutation, useQuery, useQueryClient } from "react-query";
 import RestaurantIcon from "@mui/icons-material/Restaurant";
 
 const fetchCaterings = async (): Promise<CateringModel[]> => {
-  const { data } = await api.get("/caterings"); // Update endpoint to caterings
+  const data = await getAllPages("/caterings"); // Update endpoint to caterings
   return data;
 };
 
@@ -41,7 +41,7 @@ const Caterings = () => {
   };
   const handleDishesOpen = async () => {
     setDishesOpen(true);
-    const { data } = await api.get("/caterings/dishes"); // Update endpoint to caterings
+    const data = await getAllPages("/caterings/dishes"); // Update endpoint to caterings
     setDishes(data);
   };
 
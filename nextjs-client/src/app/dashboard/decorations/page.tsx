@@ -16,14 +16,14 @@ import {
 import AddIcon from "@mui/icons-material/Add";
 
 import Grid from "@mui/material/Grid2";
-import api from "@/services/apiService";
+import api, { getAllPages } from "@/services/apiService";
 import { useMutation, useQuery, useQueryClient } from "react-query";
 import { DecorationModel } from "@/types";
 import DeleteForeverIcon from "@mui/icons-material/DeleteForever";
 import CreateDecorationForm from "@/components/CreateDecorationForm";
 
 const fetchDecorations = async (): Promise<DecorationModel[]> => {
-  const { data } = await api.get("/decorations");
+  const data = await getAllPages("/decorations");
   return data;
 };
 
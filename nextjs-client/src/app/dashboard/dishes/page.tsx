@@ -16,14 +16,14 @@ import {
 } from "@mui/material";
 import Grid from "@mui/material/Grid2";
 import { DishModel } from "@/types";
-import api from "@/services/apiService";
+import api, { getAllPages } from "@/services/apiService";
 import { useMutation, useQuery, useQueryClient } from "react-query";
 import AddIcon from "@mui/icons-material/Add";
 import CreateDishForm from "@/components/CreateDishForm";
 import DeleteForeverIcon from "@mui/icons-material/DeleteForever";
 
 const fetchDishes = async (): Promise<DishModel[]> => {
-  const { data } = await api.get("/caterings/dishes"); // Replace with your API endpoint.
+  const data = await getAllPages("/caterings/dishes"); // Replace with your API endpoint.
   return data;
 };
 
@@ -9,7 +9,7 @@ import TableRow from "@mui/material/TableRow";
 import Paper from "@mui/material/Paper";
 import { User } from "@/stores/authStore";
 import { Box, Chip, Stack, Typography } from "@mui/material";
-import api from "@/services/apiService";
+import { getAllPages } from "@/services/apiService";
 import { BarChart } from "@mui/x-charts/BarChart";
 import { PaymentModel } from "@/types";
 import { PieChart } from "@mui/x-charts";
@@ -22,9 +22,9 @@ export default function Overview() {
 
   React.useEffect(() => {
     (async () => {
-      const { data } = await api.get("/users");
+      const data = await getAllPages("/users");
       setUsers(data);
-      const { data: bookingData } = await api.get("/bookings");
+      const bookingData = await getAllPages("/bookings");
       setBookings(bookingData);
       setPayments([
         ...bookingData.map(({ payment }: { payment: PaymentModel }) => payment),
@@ -14,14 +14,14 @@ import {
 } from "@mui/material";
 import AddIcon from "@mui/icons-material/Add";
 import Grid from "@mui/material/Grid2";
-import api from "@/services/apiService";
+import api, { getAllPages } from "@/services/apiService";
 import { useMutation, useQuery, useQueryClient } from "react-query";
 import { PromoModel } from "@/types"; // Adjust import for PromoModel
 import DeleteForeverIcon from "@mui/icons-material/DeleteForever";
 import CreatePromoForm from "@/components/CreatePromoForm"; // Adjust import for CreatePromoForm
 
 const fetchPromos = async (): Promise<PromoModel[]> => {
-  const { data } = await api.get("/promos");
+  const data = await getAllPages("/promos");
   return data;
 };
 
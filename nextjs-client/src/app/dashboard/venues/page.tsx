@@ -18,14 +18,14 @@ import {
 } from "@mui/material";
 import Grid from "@mui/material/Grid2";
 import { Venue } from "@/types";
-import api from "@/services/apiService";
+import api, { getAllPages } from "@/services/apiService";
 import { useMutation, useQuery, useQueryClient } from "react-query";
 import AddIcon from "@mui/icons-material/Add";
 import CreateVenueForm from "@/components/CreateVenueForm";
 import DeleteForeverIcon from "@mui/icons-material/DeleteForever";
 
 const fetchVenues = async (): Promise<Venue[]> => {
-  const { data } = await api.get("/venues"); // Replace with your API endpoint.
+  const data = await getAllPages("/venues"); // Replace with your API endpoint.
   return data;
 };
 
@@ -78,14 +78,9 @@ const Venues = () => {
         alignItems={"stretch"}
       >
         {venues?.map((venue) => {
-          // Calculate average rating
-          const totalRatings = venue.venue_reviews.reduce(
-            (acc, review) => acc + review.venue_rating,
-            0
+          const averageRating = Math.round(
+            venue.venue_rating_summary?.rating_average ?? 0
           );
-          const averageRating = venue.venue_reviews.length
-            ? Math.round(totalRatings / venue.venue_reviews.length)
-            : 0;
 
           return (
             <Grid size={{ xs: 2, sm: 4, md: 4 }} key={venue.venue_id}>
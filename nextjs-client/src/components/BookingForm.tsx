@@ -7,12 +7,14 @@ import {
   CateringModel,
   PromoModel,
   CarModel,
+  CarAvailabilityModel,
   DecorationModel,
   Venue,
   DishModel,
   BookingModel,
+  QuoteModel,
 } from "@/types";
-import { useMutation, useQueryClient } from "react-query";
+import { useMutation, useQuery, useQueryClient } from "react-query";
 import {
   TextField,
   Button,
@@ -35,7 +37,7 @@ import {
   RadioGroup,
   Radio,
 } from "@mui/material";
-import api from "@/services/apiService";
+import api, { getAllPages } from "@/services/apiService";
 import Grid from "@mui/material/Grid2";
 import CloseIcon from "@mui/icons-material/Close";
 import { AdapterDayjs } from "@mui/x-date-pickers/AdapterDayjs";
@@ -84,11 +86,11 @@ const BookingForm = ({
           promosData,
           carsData,
         ] = await Promise.all([
-          fetchData("/venues"),
-          fetchData("/caterings"),
-          fetchData("/decorations"),
-          fetchData("/promos"),
-          fetchData("/cars"),
+          getAllPages("/venues"),
+          getAllPages("/caterings"),
+          getAllPages("/decorations"),
+          getAllPages("/promos"),
+          getAllPages("/cars"),
         ]);
         setVenues(venuesData);
         setCaterings(cateringsData);
@@ -121,7 +123,7 @@ const BookingForm = ({
           cateringsData.map(async (catering: CateringModel) => {
             return {
               catering_id: catering.catering_id,
-              dishes: await fetchData(`/caterings/dishes`),
+              dishes: await getAllPages(`/caterings/dishes`),
             };
           })
         );
@@ -174,8 +176,6 @@ const BookingForm = ({
         booking: filteredObject,
         payment: {
           payment_method: payment_method,
-          total_amount: totalCost,
-          discount: discountPercentage,
           amount_payed: costAfterDiscount,
         },
       };
@@ -185,15 +185,17 @@ const BookingForm = ({
 
       console.log("sending data: ", response.data);
       //delete old car reservations
-      booking?.car_reservations.forEach(async (reservation) => {
-        await api.delete(
-          `/cars/reservations/${reservation.car_reservation_id}`
-        );
-      });
-      //add new car reservations
-      car_ids.forEach(async (car_id) => {
-        await api.post(`/cars/${car_id}/${response.data.booking_id}`);
-      });
+      await Promise.all(
+        (booking?.car_reservations || []).map((reservation) =>
+          api.delete(`/cars/reservations/${reservation.car_reservation_id}`)
+        )
+      );
+      //add new car reservations, all in one call (all of them or none)
+      if (car_ids.length) {
+        await api.post(`/cars/reservations/${response.data.booking_id}`, {
+          cars: car_ids.map((car_id) => ({ car_id })),
+        });
+      }
       return response.data;
     },
     onSettled: () => {
@@ -208,49 +210,31 @@ const BookingForm = ({
     },
   });
 
-  const calculateTotalCost = () => {
-    const venuePrice =
-      venues.find((v) => v.venue_id === getValues("venue_id"))
-        ?.venue_price_per_day || 0;
-    const decorationPrice =
-      decorations.find((d) => d.decoration_id === getValues("decoration_id"))
-        ?.decoration_price || 0;
-    const carPrices = cars.filter((car) =>
-      getValues("car_ids").includes(car.car_id)
-    );
-    const dishCostPerServing =
-      dishesMappings
-        .find(
-          (dishMapping) => dishMapping.catering_id === getValues("catering_id")
-        )
-        ?.dishes.reduce(
-          (total, dish) =>
-            total +
-            dish.dish_cost_per_serving * getValues("booking_guest_count"),
-          0
-        ) || 0;
-
-    const carRentalPrice = carPrices.reduce(
-      (total, car) => total + car.car_rental_price,
-      0
-    );
-
-    // Calculate total cost
-    const calculatedTotal =
-      venuePrice + decorationPrice + carRentalPrice + dishCostPerServing;
-
-    // Calculate cost after discount
-    const promo_id = getValues("promo_id");
-    const promo = promos.find((p) => p.promo_id === promo_id);
-    const promo_discount = promo?.promo_discount || 0 + loyaltyDiscount;
-    const calculatedCostAfterDiscount = Math.ceil(
-      calculatedTotal * (1 - promo_discount)
-    );
-
-    // Update state
-    setTotalCost(calculatedTotal);
-    setCostAfterDiscount(calculatedCostAfterDiscount);
-    setDiscountPercentage(promo_discount);
+  const calculateTotalCost = async () => {
+    // priced by the server, the booking is stored with the same total
+    const venue_id = getValues("venue_id");
+    if (!venue_id) {
+      setTotalCost(0);
+      setCostAfterDiscount(0);
+      setDiscountPercentage(0);
+      return;
+    }
+    try {
+      const { data: quote }: { data: QuoteModel } = await api.post("/quotes", {
+        venue_id,
+        booking_guest_count: getValues("booking_guest_count"),
+        catering_id: getValues("catering_id") || null,
+        decoration_id: getValues("decoration_id") || null,
+        car_ids: getValues("car_ids"),
+        promo_id: getValues("promo_id") || null,
+      });
+      setTotalCost(quote.total_amount);
+      setCostAfterDiscount(quote.amount_due);
+      setDiscountPercentage(quote.discount);
+    } catch (error) {
+      // eg: guest count above the venue capacity, reported when the booking is submitted
+      console.error("Failed to price the booking:", error);
+    }
   };
 
   useEffect(() => {
@@ -265,6 +249,30 @@ const BookingForm = ({
     getValues("promo_id"),
   ]);
 
+  // cars left on the chosen event day, cars this booking already has count as free for it
+  const eventDay = watch("booking_event_date");
+  const eventDayKey = eventDay ? dayjs(eventDay).format("YYYY-MM-DD") : null;
+  const { data: carAvailability } = useQuery(
+    ["car-availability", eventDayKey],
+    async () => {
+      const response = await api.get("/cars/availability", {
+        params: { date: eventDayKey, limit: 100 },
+      });
+      return response.data as CarAvailabilityModel[];
+    },
+    { enabled: !!eventDayKey }
+  );
+  const carsLeft = (car_id: string) => {
+    const availability = carAvailability?.find((car) => car.car_id === car_id);
+    if (!availability) return null;
+    const own =
+      booking &&
+      eventDayKey === dayjs(booking.booking_event_date).format("YYYY-MM-DD")
+        ? booking.car_reservations.filter((r) => r.car_id === car_id).length
+        : 0;
+    return availability.available + own;
+  };
+
   watch([
     "catering_id",
     "venue_id",
@@ -563,11 +571,22 @@ const BookingForm = ({
                           onChange={(e) => field.onChange(e.target.value)}
                           label="Cars"
                         >
-                          {cars.map((car) => (
-                            <MenuItem key={car.car_id} value={car.car_id}>
-                              {`${car.car_make} ${car.car_model} ${car.car_year}`}
-                            </MenuItem>
-                          ))}
+                          {cars.map((car) => {
+                            const left = carsLeft(car.car_id);
+                            return (
+                              <MenuItem
+                                key={car.car_id}
+                                value={car.car_id}
+                                disabled={
+                                  left === 0 &&
+                                  !(field.value || []).includes(car.car_id)
+                                }
+                              >
+                                {`${car.car_make} ${car.car_model} ${car.car_year}`}
+                                {left !== null && ` (${left} left that day)`}
+                              </MenuItem>
+                            );
+                          })}
                         </Select>
                         {errors.car_ids && (
                           <Typography color="error" variant="body2">
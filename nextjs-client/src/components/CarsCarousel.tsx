@@ -9,7 +9,7 @@ import {
   Typography,
   IconButton,
 } from "@mui/material";
-import api from "@/services/apiService"; // Ensure this is set up for your car API
+import { getAllPages } from "@/services/apiService"; // Ensure this is set up for your car API
 import { CarModel } from "@/types"; // Assuming your types are already imported
 import { useQuery } from "react-query";
 import ChevronLeftIcon from "@mui/icons-material/ChevronLeft";
@@ -17,7 +17,7 @@ import ChevronRightIcon from "@mui/icons-material/ChevronRight";
 
 // Fetch car data
 const fetchCars = async (): Promise<CarModel[]> => {
-  const { data } = await api.get("/cars"); // Replace with your API endpoint for cars
+  const data = await getAllPages("/cars"); // Replace with your API endpoint for cars
   return data;
 };
 
@@ -102,7 +102,7 @@ const CarsCarousel = () => {
                       Rental Price: {car.car_rental_price} PKR / day
                     </Typography>
                     <Typography variant="body2" color="text.secondary">
-                      Available Quantity: {car.car_quantity}
+                      Quantity: {car.car_quantity}
                     </Typography>
                   </CardContent>
                 </Card>
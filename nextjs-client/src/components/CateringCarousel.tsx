@@ -9,7 +9,7 @@ import {
   IconButton,
   Typography,
 } from "@mui/material";
-import api from "@/services/apiService";
+import api, { getAllPages } from "@/services/apiService";
 import { CateringModel, DishModel } from "@/types"; // Import the appropriate types
 import { useQuery } from "react-query";
 import ChevronLeftIcon from "@mui/icons-material/ChevronLeft";
@@ -22,7 +22,7 @@ const fetchCateringsAndDishes = async (): Promise<
     dishes: DishModel[];
   }[]
 > => {
-  const { data } = await api.get("/caterings"); // Replace with your API endpoint
+  const data = await getAllPages("/caterings"); // Replace with your API endpoint
   const cateringPromises = data.map(async (catering: CateringModel) => {
     const dishPromises = catering.catering_menu_items.map(
       async (item) => {
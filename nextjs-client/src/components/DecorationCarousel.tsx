@@ -9,7 +9,7 @@ import {
   IconButton,
   Typography,
 } from "@mui/material";
-import api from "@/services/apiService"; // Ensure this is set up for your decoration API
+import { getAllPages } from "@/services/apiService"; // Ensure this is set up for your decoration API
 import { DecorationModel } from "@/types"; // Assuming your types are already imported
 import { useQuery } from "react-query";
 import ChevronLeftIcon from "@mui/icons-material/ChevronLeft";
@@ -17,7 +17,7 @@ import ChevronRightIcon from "@mui/icons-material/ChevronRight";
 
 // Fetch decoration data
 const fetchDecorations = async (): Promise<DecorationModel[]> => {
-  const { data } = await api.get("/decorations"); // Replace with your API endpoint for decorations
+  const data = await getAllPages("/decorations"); // Replace with your API endpoint for decorations
   return data;
 };
 
@@ -9,7 +9,7 @@ import {
   IconButton,
   Typography,
 } from "@mui/material";
-import api from "@/services/apiService"; // Ensure this is set up for your dish API
+import { getAllPages } from "@/services/apiService"; // Ensure this is set up for your dish API
 import { DishModel } from "@/types"; // Assuming your types are already imported
 import { useQuery } from "react-query";
 import ChevronLeftIcon from "@mui/icons-material/ChevronLeft";
@@ -17,7 +17,7 @@ import ChevronRightIcon from "@mui/icons-material/ChevronRight";
 
 // Fetch dish data
 const fetchDishes = async (): Promise<DishModel[]> => {
-  const { data } = await api.get("/caterings/dishes"); // Replace with your API endpoint for dishes
+  const data = await getAllPages("/caterings/dishes"); // Replace with your API endpoint for dishes
   return data;
 };
 
@@ -1,4 +1,4 @@
-import { Venue } from "@/types";
+import { Venue, VenueReview } from "@/types";
 import { useState } from "react";
 
 import {
@@ -20,7 +20,13 @@ import AccordionSummary from "@mui/material/AccordionSummary";
 import AccordionDetails from "@mui/material/AccordionDetails";
 import ExpandMoreIcon from "@mui/icons-material/ExpandMore";
 import api from "@/services/apiService";
-import { useQueryClient } from "react-query";
+import { useQuery, useQueryClient } from "react-query";
+
+// Fetch the latest reviews of a venue, only once its dialog is opened
+const fetchVenueReviews = async (venueId: string): Promise<VenueReview[]> => {
+  const { data } = await api.get("/venues/reviews/" + venueId);
+  return data;
+};
 
 const VenueCard = ({
   venue,
@@ -37,6 +43,11 @@ const VenueCard = ({
     setComment(event.target.value);
   };
   const queryClient = useQueryClient();
+  const { data: reviews } = useQuery(
+    ["venue-reviews", venue.venue_id],
+    () => fetchVenueReviews(venue.venue_id),
+    { enabled: open }
+  );
 
   const handleClose = () => {
     setOpen(false);
@@ -117,6 +128,7 @@ const VenueCard = ({
                 venue_review_text: comment,
               });
               queryClient.invalidateQueries(["venues"]);
+              queryClient.invalidateQueries(["venue-reviews", venue.venue_id]);
             }}
           >
             {/* Text Input */}
@@ -171,7 +183,7 @@ const VenueCard = ({
             >
               Reviews
             </AccordionSummary>
-            {venue.venue_reviews.map((review) => (
+            {reviews?.map((review) => (
               <AccordionDetails key={review.venue_review_id}>
                 <Stack
                   direction="row"
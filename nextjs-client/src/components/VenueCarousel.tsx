@@ -4,14 +4,14 @@ import { Box, Typography, IconButton } from "@mui/material";
 import ChevronLeftIcon from "@mui/icons-material/ChevronLeft";
 import ChevronRightIcon from "@mui/icons-material/ChevronRight";
 
-import api from "@/services/apiService";
+import { getAllPages } from "@/services/apiService";
 import { Venue } from "@/types";
 import { useQuery } from "react-query";
 import VenueCard from "./VenueCard";
 
 // Fetch venues
 const fetchVenues = async (): Promise<Venue[]> => {
-  const { data } = await api.get("/venues");
+  const data = await getAllPages("/venues");
   return data;
 };
 
@@ -46,14 +46,9 @@ const VenueCarousel = () => {
         >
           <Box sx={{ display: "flex", gap: 2 }} className="embla__container">
             {venues?.map((venue) => {
-              // Calculate average rating
-              const totalRatings = venue.venue_reviews.reduce(
-                (acc, review) => acc + review.venue_rating,
-                0
+              const averageRating = Math.round(
+                venue.venue_rating_summary?.rating_average ?? 0
               );
-              const averageRating = venue.venue_reviews.length
-                ? Math.round(totalRatings / venue.venue_reviews.length)
-                : 0;
               return (
                 <VenueCard
                   key={venue.venue_id}
@@ -27,4 +27,23 @@ export const logout = async () => {
   return response.data;
 };
 
+// List endpoints return one page at a time, the next page's cursor comes in the X-Next-Cursor header
+const PAGE_LIMIT = 500;
+
+export const getAllPages = async <T = any>(
+  url: string,
+  params: Record<string, unknown> = {}
+): Promise<T[]> => {
+  const rows: T[] = [];
+  let cursor: string | undefined;
+  do {
+    const response = await api.get(url, {
+      params: { ...params, limit: PAGE_LIMIT, cursor },
+    });
+    rows.push(...response.data);
+    cursor = response.headers["x-next-cursor"];
+  } while (cursor);
+  return rows;
+};
+
 export default api;
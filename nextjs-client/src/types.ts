@@ -10,6 +10,13 @@ export interface VenueReview {
   venue_review_created_at: string;
 }
 
+export interface VenueRatingSummary {
+  rating_count: number;
+  rating_average: number | null; // null until the first review
+  rating_histogram: Record<string, number>; // star ("1"-"5") -> number of reviews
+  latest_review_at: string | null;
+}
+
 export interface Venue {
   venue_id: string;
   venue_name: string;
@@ -17,7 +24,7 @@ export interface Venue {
   venue_capacity: number;
   venue_price_per_day: number;
   venue_image?: string;
-  venue_reviews: VenueReview[];
+  venue_rating_summary: VenueRatingSummary | null; // reviews are fetched from /venues/reviews/{venue_id}
 }
 
 export interface CreateVenueModel {
@@ -65,6 +72,18 @@ export interface CarModel {
   car_quantity: number;
 }
 
+// GET /cars/availability?date=, what is left of every car on that day
+export interface CarAvailabilityModel {
+  car_id: string;
+  car_make: string;
+  car_model: string;
+  car_year: number;
+  car_rental_price: number;
+  car_quantity: number;
+  reserved: number;
+  available: number;
+}
+
 export const createCarSchema = z.object({
   car_make: z.string().min(1, "Car make is required"),
   car_model: z.string().min(1, "Car model is required"),
@@ -137,7 +156,6 @@ export interface CateringModel {
   catering_description: string;
   catering_image: string | null;
   catering_menu_items: CateringMenuItemModel[];
-  bookings: [];
 }
 
 export const createCateringSchema = z.object({
@@ -172,6 +190,7 @@ export interface CarReservationModel {
   car_reservation_id: string;
   car_id: string;
   booking_id: string;
+  reservation_day: string;
 }
 
 export interface AdminBookingModel {
@@ -251,6 +270,18 @@ enum PaymentMethod {
   other = "other",
 }
 
+export interface QuoteModel {
+  venue_cost: number;
+  catering_cost_per_guest: number;
+  catering_cost: number;
+  decoration_cost: number;
+  car_cost: number;
+  total_amount: number;
+  discount: number;
+  amount_due: number;
+  errors: string[];
+}
+
 export interface PaymentModel {
   payment_id: string;
   amount_payed: number;